@@ -0,0 +1,130 @@
+import os
+import json
+import threading
+import numpy as np
+import cv2
+
+# Bundle produced by build_assets.py: one flat uint8 blob plus a JSON manifest of array views into it
+BUNDLE_DATA_PATH = 'asset_bundle.npy'
+BUNDLE_MANIFEST_PATH = 'asset_bundle.json'
+
+# Byte alignment of each array inside the blob
+BUNDLE_ALIGNMENT = 64
+
+# Stop generating mipmap levels once the smaller side would drop below this many pixels
+MIN_MIP_SIZE = 16
+
+_bundle = None
+_bundle_loaded = False
+# Effects warm up on several threads at once, and each asks for the bundle
+_bundle_lock = threading.Lock()
+
+def premultiply_alpha(image):
+    """Return a BGRA copy of the sprite with its color channels multiplied by alpha."""
+    if image.shape[2] == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2BGRA)
+    premultiplied = image.copy()
+    alpha = image[:, :, 3:4].astype(np.uint16)
+    premultiplied[:, :, :3] = (image[:, :, :3].astype(np.uint16) * alpha // 255).astype(np.uint8)
+    return premultiplied
+
+def build_mipmaps(image):
+    """Return [image, image/2, image/4, ...] down to MIN_MIP_SIZE."""
+    levels = [image]
+    while min(levels[-1].shape[:2]) // 2 >= MIN_MIP_SIZE:
+        h, w = levels[-1].shape[:2]
+        levels.append(cv2.resize(levels[-1], (w // 2, h // 2), interpolation=cv2.INTER_AREA))
+    return levels
+
+def select_mip_level(levels, width, height):
+    """Pick the smallest mipmap level that is still at least width x height."""
+    for level in reversed(levels):
+        if level.shape[1] >= width and level.shape[0] >= height:
+            return level
+    return levels[0]
+
+class AssetBundle:
+    """Read-only view of a memory-mapped asset bundle."""
+
+    def __init__(self, data, manifest):
+        self.data = data
+        self.manifest = manifest
+
+    def _view(self, entry):
+        size = int(np.prod(entry['shape'])) * np.dtype(entry['dtype']).itemsize
+        raw = self.data[entry['offset']:entry['offset'] + size]
+        return raw.view(entry['dtype']).reshape(entry['shape'])
+
+    def has_sprite(self, name):
+        return name in self.manifest['sprites']
+
+    def sprite_levels(self, name):
+        """Premultiplied BGRA mipmap levels for a sprite, largest first."""
+        return [self._view(entry) for entry in self.manifest['sprites'][name]]
+
+    def has_background(self, name):
+        return name in self.manifest['backgrounds']
+
+    def backgrounds(self, name):
+        """Pre-scaled BGR backgrounds keyed by (width, height)."""
+        return {
+            (entry['shape'][1], entry['shape'][0]): self._view(entry)
+            for entry in self.manifest['backgrounds'][name]
+        }
+
+def load_asset_bundle(data_path=BUNDLE_DATA_PATH, manifest_path=BUNDLE_MANIFEST_PATH):
+    """Memory-map an asset bundle. Returns None if it hasn't been built."""
+    if not os.path.exists(data_path) or not os.path.exists(manifest_path):
+        return None
+    try:
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+        data = np.load(data_path, mmap_mode='r')
+        return AssetBundle(data, manifest)
+    except Exception as e:
+        print(f"Error loading asset bundle: {str(e)}")
+        return None
+
+def get_asset_bundle():
+    """Return the shared asset bundle, loading it on first use. None if it hasn't been built."""
+    global _bundle, _bundle_loaded
+    with _bundle_lock:
+        if not _bundle_loaded:
+            _bundle = load_asset_bundle()
+            _bundle_loaded = True
+            if _bundle is None:
+                print("Asset bundle not found, decoding sprites at runtime. Run build_assets.py to build it.")
+        return _bundle
+
+def write_asset_bundle(sprites, backgrounds, data_path=BUNDLE_DATA_PATH, manifest_path=BUNDLE_MANIFEST_PATH):
+    """
+    Write a bundle.
+    Args:
+        sprites (dict): name -> list of mipmap levels (premultiplied BGRA uint8)
+        backgrounds (dict): name -> list of BGR uint8 images
+    """
+    manifest = {'sprites': {}, 'backgrounds': {}}
+    chunks = []
+    offset = 0
+
+    def add_array(array):
+        nonlocal offset
+        array = np.ascontiguousarray(array)
+        padding = (-offset) % BUNDLE_ALIGNMENT
+        if padding:
+            chunks.append(np.zeros(padding, dtype=np.uint8))
+            offset += padding
+        entry = {'offset': offset, 'shape': list(array.shape), 'dtype': array.dtype.str}
+        chunks.append(array.reshape(-1).view(np.uint8))
+        offset += array.nbytes
+        return entry
+
+    for name, levels in sprites.items():
+        manifest['sprites'][name] = [add_array(level) for level in levels]
+    for name, images in backgrounds.items():
+        manifest['backgrounds'][name] = [add_array(image) for image in images]
+
+    np.save(data_path, np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.uint8))
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return offset
@@ -0,0 +1,172 @@
+import os
+import sys
+import argparse
+import tracemalloc
+import multiprocessing
+from collections import deque
+import numpy as np
+import cv2
+from strip_layout import build_strip_panel, STRIP_LENGTH
+from session_frames import SessionFrameStore
+
+# Photo sizes benchmarked by default: the webcam preview and a higher-resolution still
+DEFAULT_SIZES = ((1280, 720), (3840, 2160))
+
+# Sessions whose panels are still held by consumers while the next one is captured:
+# the booth lets this many sheets queue on the spooler (printing.max_pending_sheets)
+DEFAULT_IN_FLIGHT = 4
+
+MB = 1024 * 1024
+
+def current_rss():
+    """Resident set size of this process in bytes, or None where it can't be read."""
+    if sys.platform == 'win32':
+        return _windows_memory_info().WorkingSetSize
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        return None
+
+def peak_rss():
+    """Highest resident set size this process has reached, in bytes."""
+    if sys.platform == 'win32':
+        return _windows_memory_info().PeakWorkingSetSize
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def _windows_memory_info():
+    import ctypes
+    from ctypes import wintypes
+
+    class ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [
+            ('cb', wintypes.DWORD),
+            ('PageFaultCount', wintypes.DWORD),
+            ('PeakWorkingSetSize', ctypes.c_size_t),
+            ('WorkingSetSize', ctypes.c_size_t),
+            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+            ('PagefileUsage', ctypes.c_size_t),
+            ('PeakPagefileUsage', ctypes.c_size_t),
+        ]
+
+    counters = ProcessMemoryCounters()
+    counters.cb = ctypes.sizeof(counters)
+    ctypes.windll.psapi.GetProcessMemoryInfo(
+        ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb)
+    return counters
+
+def capture(width, height, seed):
+    """A new camera frame, as cap.read() returns one."""
+    return np.full((height, width, 3), 16 * seed, dtype=np.uint8)
+
+def composite(frame):
+    """Stand-in for the effects: background replacement returns a new frame, sprites draw in place."""
+    frame = cv2.addWeighted(frame, 0.5, frame, 0.5, 0)
+    cv2.rectangle(frame, (0, 0), (frame.shape[1] // 4, frame.shape[0] // 4), (255, 255, 255), -1)
+    return frame
+
+def session_with_lists(width, height):
+    """
+    The old path: a copy of every photo composited and kept in a list, then a new panel built from them.
+    Returns what consumers keep until they are done with the session, and the function that lets it go.
+    """
+    raw_frames = []
+    captured_frames = []
+    for i in range(STRIP_LENGTH):
+        frame = capture(width, height, i)
+        captured_frames.append(composite(frame.copy()))
+        raw_frames.append(frame)
+    held = [build_strip_panel(captured_frames), raw_frames]
+    return held, held.clear
+
+def session_with_store(store, width, height):
+    """The frame store path: photos composited into the panel they are printed on, held like the booth holds it."""
+    store.begin()
+    raw_frames = []
+    for i in range(STRIP_LENGTH):
+        frame = capture(width, height, i)
+        slot = store.next_slot(frame.shape)
+        np.copyto(slot, frame)
+        store.add(composite(slot))
+        raw_frames.append(frame)
+    held = [store.finish(), raw_frames]
+    release = store.retain()
+
+    def let_go():
+        held.clear()
+        release()
+    return held, let_go
+
+def run_variant(variant, width, height, sessions, in_flight, results):
+    """
+    Run sessions of one variant in this (fresh) process and report its memory use.
+    The last in_flight sessions stay held, as the encoder, spooler, share server and
+    journal hold them in the booth, so panels are only reused when the booth could reuse them.
+    """
+    store = SessionFrameStore()
+    # Warm up OpenCV and numpy so their own allocations aren't counted
+    composite(capture(64, 64, 0))
+    baseline = current_rss()
+    tracemalloc.start()
+    traced_peaks = []
+    consumers = deque()
+    for _ in range(sessions):
+        tracemalloc.reset_peak()
+        if variant == 'lists':
+            held, let_go = session_with_lists(width, height)
+        else:
+            held, let_go = session_with_store(store, width, height)
+        consumers.append(let_go)
+        # The oldest session's sheet has printed and its consumers are done with it
+        if len(consumers) > in_flight:
+            consumers.popleft()()
+        del held
+        traced_peaks.append(tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+    results.put({
+        'traced_peak': max(traced_peaks),
+        'rss_peak': peak_rss() - baseline if baseline is not None else None,
+    })
+
+def measure(variant, width, height, sessions, in_flight):
+    # A fresh process per variant, so peak RSS belongs to that variant alone
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    process = context.Process(target=run_variant, args=(variant, width, height, sessions, in_flight, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+def format_mb(value):
+    return "n/a" if value is None else f"{value / MB:.1f} MB"
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure peak memory per photo session, from capture to the print panel."
+    )
+    parser.add_argument('--size', action='append', metavar='WIDTHxHEIGHT',
+                        help="photo size to benchmark (repeatable; default 1280x720 and 3840x2160)")
+    parser.add_argument('--sessions', type=int, default=10, help="sessions per measurement")
+    parser.add_argument('--in-flight', type=int, default=DEFAULT_IN_FLIGHT,
+                        help="earlier sessions still held by consumers while one is captured")
+    args = parser.parse_args()
+
+    sizes = [tuple(int(v) for v in size.lower().split('x')) for size in args.size] if args.size else DEFAULT_SIZES
+    print(f"{args.sessions} sessions per run, {args.in_flight} earlier sessions held while each is captured")
+    print(f"{'photo size':>12}  {'variant':>12}  {'peak traced':>12}  {'peak RSS':>12}")
+    for width, height in sizes:
+        for variant in ('lists', 'store'):
+            result = measure(variant, width, height, args.sessions, args.in_flight)
+            print(f"{f'{width}x{height}':>12}  {variant:>12}  "
+                  f"{format_mb(result['traced_peak']):>12}  {format_mb(result['rss_peak']):>12}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
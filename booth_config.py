@@ -0,0 +1,229 @@
+import os
+import json
+import threading
+import traceback
+import dataclasses
+from dataclasses import dataclass, field
+
+# Settings for the current event. Missing settings (or a missing file) use the defaults below.
+CONFIG_PATH = 'booth_config.json'
+
+# How often the config file is checked for changes (seconds)
+CONFIG_POLL_INTERVAL = 1.0
+
+@dataclass(frozen=True)
+class CameraConfig:
+    # Camera used when a booth isn't given one explicitly
+    video_source: int = 1
+
+@dataclass(frozen=True)
+class EffectsConfig:
+    mustache: bool = True
+    bolo_tie: bool = True
+    cowboy_hat: bool = True
+    background: bool = True
+    # Give each person one body effect, cycling by tracked identity, instead of all of them
+    per_person_effects: bool = False
+
+    def is_enabled(self, name):
+        return getattr(self, name)
+
+@dataclass(frozen=True)
+class PrintConfig:
+    gsprint_path: str = r"C:\Program Files\Ghostgum\gsview\gsprint.exe"
+    ghostscript_path: str = r"C:\Program Files\gs\gs10.05.1\bin\gswin64.exe"
+    # Fraction of the printer's media size the strips are scaled to
+    scale_factor: float = 0.6
+    dpi: int = 600
+    # Text printed at the bottom of each strip, under the QR code
+    footer_lines: tuple = ("Law and Disorder", "Big Stick 2025")
+    # QR code printed above the footer (relative to the app directory unless absolute)
+    qr_code_path: str = "qr-code.png"
+    # When the printer is busy, print one strip each of two sessions on a sheet
+    # (either side of the DNP's 2 inch cut) instead of two copies of one session
+    batching: bool = False
+    # How long a strip waits for a second session to share its sheet (seconds)
+    batch_hold_seconds: float = 20.0
+    # Print time per sheet assumed until the printer monitor has measured one (seconds)
+    sheet_seconds: float = 13.0
+    # New sessions wait while this many sheets are queued or printing
+    max_pending_sheets: int = 4
+    # Print to a simulated printer (no Windows printer needed, e.g. for testing the flow)
+    simulated: bool = False
+
+@dataclass(frozen=True)
+class BoothConfig:
+    """
+    One immutable snapshot of the booth settings. Code that needs several settings to
+    agree (e.g. one print job) should take a snapshot once and read from it, so a reload
+    part way through can't mix old and new values.
+    """
+    camera: CameraConfig = field(default_factory=CameraConfig)
+    effects: EffectsConfig = field(default_factory=EffectsConfig)
+    printing: PrintConfig = field(default_factory=PrintConfig)
+
+    def with_changes(self, section, **changes):
+        """A new snapshot with some settings of one section changed, e.g. with_changes('effects', mustache=False)."""
+        return dataclasses.replace(self, **{section: dataclasses.replace(getattr(self, section), **changes)})
+
+    def to_dict(self):
+        return dataclasses.asdict(self)
+
+def _parse_section(section_class, values, section_name):
+    if not isinstance(values, dict):
+        raise ValueError(f"'{section_name}' must be an object")
+    defaults = section_class()
+    parsed = {}
+    for name, value in values.items():
+        if not hasattr(defaults, name):
+            print(f"Ignoring unknown setting {section_name}.{name}")
+            continue
+        expected = type(getattr(defaults, name))
+        if expected is tuple and isinstance(value, list):
+            value = tuple(value)
+        elif expected is float and isinstance(value, int) and not isinstance(value, bool):
+            value = float(value)
+        if not isinstance(value, expected) or (expected is int and isinstance(value, bool)):
+            raise ValueError(f"{section_name}.{name} must be {expected.__name__}, not {type(value).__name__}")
+        parsed[name] = value
+    return section_class(**parsed)
+
+def parse_config(data):
+    """Build a BoothConfig from a dict such as the JSON config file. Raises ValueError if invalid."""
+    sections = {f.name: f.default_factory for f in dataclasses.fields(BoothConfig)}
+    parsed = {}
+    for name, values in data.items():
+        if name not in sections:
+            print(f"Ignoring unknown config section {name}")
+            continue
+        parsed[name] = _parse_section(sections[name], values, name)
+    return BoothConfig(**parsed)
+
+def load_config(path=CONFIG_PATH):
+    """Read a config file; the defaults if it doesn't exist. Raises ValueError if it is invalid."""
+    if not os.path.exists(path):
+        return BoothConfig()
+    with open(path, 'r', encoding='utf-8') as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path} is not valid JSON: {str(e)}")
+    if not isinstance(data, dict):
+        raise ValueError(f"{path} must contain a JSON object")
+    return parse_config(data)
+
+class ConfigStore:
+    """
+    Holds the current config snapshot and swaps in a new one when the config file
+    changes, without restarting the booth or reloading models.
+    Readers call snapshot (a plain attribute read, safe from any thread); subscribers
+    are called with (old, new) after every swap, on the thread that made it.
+    An invalid file is reported and the previous snapshot kept.
+    """
+
+    def __init__(self, path=CONFIG_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.subscribers = []
+        self.mtime = self._file_mtime()
+        try:
+            self.snapshot = load_config(path)
+        except Exception as e:
+            print(f"Error loading {path}, using defaults: {str(e)}")
+            self.snapshot = BoothConfig()
+        self.watch_thread = None
+        self.watch_stop = threading.Event()
+
+    def _file_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def subscribe(self, callback):
+        with self.lock:
+            self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        with self.lock:
+            if callback in self.subscribers:
+                self.subscribers.remove(callback)
+
+    def publish(self, config):
+        """Swap in a new snapshot and notify subscribers."""
+        with self.lock:
+            old = self.snapshot
+            self.snapshot = config
+            subscribers = list(self.subscribers)
+        if config == old:
+            return
+        for callback in subscribers:
+            try:
+                callback(old, config)
+            except Exception as e:
+                print(f"Error applying config change: {str(e)}")
+                print(traceback.format_exc())
+
+    def reload(self):
+        """Re-read the config file and publish it. Returns False if it was invalid."""
+        try:
+            config = load_config(self.path)
+        except Exception as e:
+            print(f"Error reloading {self.path}, keeping current settings: {str(e)}")
+            return False
+        print(f"Reloaded settings from {self.path}")
+        self.publish(config)
+        return True
+
+    def start_watching(self, interval=CONFIG_POLL_INTERVAL):
+        """Reload whenever the config file changes (safe to call more than once)."""
+        if self.watch_thread is not None:
+            return
+        self.watch_thread = threading.Thread(target=self._watch, args=(interval,), name='config-watcher', daemon=True)
+        self.watch_thread.start()
+
+    def _watch(self, interval):
+        # Polling the modification time works the same on every platform and file system
+        while not self.watch_stop.wait(interval):
+            mtime = self._file_mtime()
+            if mtime != self.mtime:
+                self.mtime = mtime
+                self.reload()
+
+    def stop_watching(self):
+        self.watch_stop.set()
+
+_store = None
+
+def get_config_store():
+    """The process-wide config store, loaded from CONFIG_PATH on first use."""
+    global _store
+    if _store is None:
+        _store = ConfigStore()
+    return _store
+
+def use_config_file(path):
+    """Load the process-wide config store from a different file (call before anything reads the config)."""
+    global _store
+    _store = ConfigStore(path)
+    return _store
+
+def get_config():
+    """The current config snapshot."""
+    return get_config_store().snapshot
+
+def set_config(config):
+    """Publish a snapshot, e.g. one handed to a worker process by its parent."""
+    get_config_store().publish(config)
+
+def write_default_config(path=CONFIG_PATH):
+    """Write the default settings as a starting point for an event's config file."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(BoothConfig().to_dict(), f, indent=2)
+
+if __name__ == '__main__':
+    if os.path.exists(CONFIG_PATH):
+        print(json.dumps(load_config().to_dict(), indent=2))
+    else:
+        write_default_config()
+        print(f"Wrote default settings to {CONFIG_PATH}")
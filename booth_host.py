@@ -0,0 +1,82 @@
+import os
+import sys
+import argparse
+from PyQt6.QtWidgets import QApplication
+from booth_window import CowboyBooth, create_startup, USE_EFFECTS_ENGINE, SHARE_SERVER_ENABLED, SHARE_SERVER_PORT, PREVIEW_STREAM_PORT
+from effects_engine import InferenceScheduler
+from print_spooler import PrintSpooler
+from printer_monitor import PrinterMonitor
+from booth_config import CONFIG_PATH, use_config_file
+
+class BoothHost:
+    """
+    Runs several booths from one process.
+    All booths share one set of models (one effects engine), one inference scheduler
+    that round-robins their frames, and one print spooler with a queue per booth,
+    so adding a booth only adds a camera, a window and its frames.
+    """
+
+    def __init__(self, video_sources, photos_dir="photos"):
+        self.startup = create_startup()
+        self.scheduler = InferenceScheduler(self.startup)
+        self.print_spooler = PrintSpooler(self.startup)
+        self.print_spooler.start()
+        self.printer_monitor = PrinterMonitor(self.startup, self.print_spooler)
+        self.printer_monitor.start()
+        self.share_server = None
+        if SHARE_SERVER_ENABLED:
+            from share_server import ShareServer
+            self.share_server = ShareServer(photos_dir, port=SHARE_SERVER_PORT).start()
+
+        screens = QApplication.screens()
+        self.booths = []
+        for i, video_source in enumerate(video_sources):
+            booth_id = f"booth{i + 1}"
+            booth = CowboyBooth(
+                video_source=video_source,
+                booth_id=booth_id,
+                photos_dir=os.path.join(photos_dir, booth_id),
+                startup=self.startup,
+                scheduler=self.scheduler,
+                print_spooler=self.print_spooler,
+                printer_monitor=self.printer_monitor,
+                share_server=self.share_server,
+                # One display per booth; extra booths share the last screen
+                screen=screens[min(i, len(screens) - 1)],
+                # Each booth's preview stream gets its own port
+                preview_stream_port=PREVIEW_STREAM_PORT + i
+            )
+            booth.setWindowTitle(f"Yeehaw Booth {i + 1}")
+            self.booths.append(booth)
+            print(f"{booth_id}: camera {video_source}")
+
+    def show(self):
+        for booth in self.booths:
+            booth.show()
+
+    def stop(self):
+        """Stop the shared spooler and inference workers."""
+        self.print_spooler.stop()
+        self.printer_monitor.stop()
+        if self.share_server is not None:
+            self.share_server.stop()
+        engine = self.startup.get('engine')
+        if USE_EFFECTS_ENGINE and engine is not None:
+            engine.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Run several photo booths from one process")
+    parser.add_argument('video_sources', nargs='+', type=int, help="camera index for each booth")
+    parser.add_argument('--photos-dir', default="photos", help="base directory; each booth saves to a subdirectory")
+    parser.add_argument('--config', default=CONFIG_PATH, help="event settings file, reloaded when it changes")
+    args = parser.parse_args()
+    use_config_file(args.config)
+
+    app = QApplication(sys.argv)
+    host = BoothHost(args.video_sources, photos_dir=args.photos_dir)
+    host.show()
+    app.aboutToQuit.connect(host.stop)
+    sys.exit(app.exec())
+
+if __name__ == '__main__':
+    main()
@@ -1,21 +1,156 @@
 import cv2
 import os
+import time
 import datetime
+import threading
 import numpy as np
 from PyQt6.QtWidgets import QMainWindow, QLabel, QPushButton, QVBoxLayout, QWidget, QMessageBox, QHBoxLayout, QProgressBar
-from PyQt6.QtCore import Qt, QTimer, QObject, QEvent
+from PyQt6.QtCore import Qt, QTimer, QObject, QEvent, pyqtSignal
 from PyQt6.QtGui import QImage, QPixmap, QFont, QKeyEvent, QMouseEvent
 from photo_capture_thread import PhotoCaptureThread
-from photo_effects import MustacheEffect, BoloTieEffect, CowboyHatEffect, BackgroundReplacementEffect, EFFECT_CONFIG
-from printer import DNPPrinter
-
-VIDEO_SOURCE_INDEX = 1
+from booth_config import get_config, get_config_store
+from startup import StartupOrchestrator
+from effects_engine import InferenceScheduler
+from print_spooler import PrintSpooler
+from printer_monitor import PrinterMonitor
+from session_archive import SessionArchive
+from session_catalog import SessionCatalog, write_thumbnail, PRINT_PRINTED, PRINT_FAILED
+from session_gallery import SessionGallery
+from strip_layout import build_strip_panel, STRIP_LENGTH
+from session_frames import SessionFrameStore
+from encoder_pool import EncoderPool
+from session_journal import SessionJournal
+from calibration_thread import CalibrationThread
+from pose_tracker import PoseTracker
+from overlay_layer import OverlayLayer
+from profiler import ProfileCapture, profile_dir_for, profile_stamp, DEFAULT_PROFILE_SECONDS
+
+# Run segmentation and pose inference in worker processes (effects_engine) instead of the GUI process
+USE_EFFECTS_ENGINE = True
+
+# Run live preview inference on every Nth frame. Frames in between are drawn with the
+# last mask and landmarks predicted by the smoothing filter (see pose_tracker).
+LIVE_INFERENCE_INTERVAL = 2
+
+# Serve each session's strip to guests' phones over the booth LAN/hotspot (share_server)
+SHARE_SERVER_ENABLED = False
+SHARE_SERVER_PORT = 8080
+
+# Record a short burst around each flash and save it as a looping animation (burst_capture)
+BURST_CAPTURE_ENABLED = False
+
+# Mirror the processed preview to other screens over MJPEG/HTTP (preview_stream)
+PREVIEW_STREAM_ENABLED = False
+PREVIEW_STREAM_PORT = 8081
+
+PRINTING_TEXT = "Printing photos...\nCollect photos below"
+# Size of the download QR code shown while printing (pixels)
+LOADING_QR_SIZE = 240
+
+# Shortest time the printing notice stays up after the job reaches the printer (seconds)
+MIN_PRINT_NOTICE_SECONDS = 3.0
+
+def format_wait(seconds):
+    seconds = max(0, int(round(seconds)))
+    if seconds < 60:
+        return f"{seconds} seconds"
+    return f"{(seconds + 59) // 60} minutes"
+
+# Effects in the order they are applied to a frame: (startup component name, photo_effects class name)
+EFFECT_COMPONENTS = [
+    ('background', 'BackgroundReplacementEffect'),
+    ('mustache', 'MustacheEffect'),
+    ('bolo_tie', 'BoloTieEffect'),
+    ('cowboy_hat', 'CowboyHatEffect'),
+]
+
+# Effects that place sprites using detected poses (they all share one pose detection)
+BODY_EFFECT_NAMES = ['mustache', 'bolo_tie', 'cowboy_hat']
+
+def assign_body_effects(person_id):
+    """With per-person effects on, each tracked person gets one body effect, in turn."""
+    if not get_config().effects.per_person_effects:
+        return None
+    return {BODY_EFFECT_NAMES[(person_id - 1) % len(BODY_EFFECT_NAMES)]}
+
+def make_effect_loader(class_name, load_model=True):
+    """Return a loader that imports photo_effects (and mediapipe) lazily, off the GUI thread."""
+    def load_effect():
+        import photo_effects
+        return getattr(photo_effects, class_name)(load_model=load_model)
+    return load_effect
+
+def load_effects_engine():
+    """Start the inference worker processes and wait for their models to warm up."""
+    from effects_engine import EffectsEngine
+    return EffectsEngine().start()
+
+def load_printer():
+    """Import the win32 printer backend and discover printers off the GUI thread."""
+    if get_config().printing.simulated:
+        from simulated_printer import SimulatedPrinter
+        return SimulatedPrinter()
+    from printer import DNPPrinter
+    return DNPPrinter()
+
+def create_startup():
+    """
+    Start loading models and the printer backend in the background so the camera feed shows immediately.
+    The returned orchestrator can be shared by several booths (see booth_host.py).
+    """
+    startup = StartupOrchestrator()
+    for name, class_name in EFFECT_COMPONENTS:
+        # With the effects engine the GUI process only composites, so its effects don't load models
+        loader = make_effect_loader(class_name, load_model=not USE_EFFECTS_ENGINE)
+        startup.add_component(name, loader, warm_up=lambda effect: effect.warm_up())
+    if USE_EFFECTS_ENGINE:
+        startup.add_component('engine', load_effects_engine)
+    startup.add_component('printer', load_printer)
+    startup.start()
+    return startup
 
 class CowboyBooth(QMainWindow):
-    def __init__(self):
+    # New config snapshot, delivered on the GUI thread
+    config_changed = pyqtSignal(object, object)
+
+    def __init__(self, video_source=None, booth_id='booth', photos_dir="photos",
+                 startup=None, scheduler=None, print_spooler=None, share_server=None, screen=None,
+                 preview_stream_port=PREVIEW_STREAM_PORT, printer_monitor=None):
+        """
+        Args:
+            video_source: camera index for cv2.VideoCapture; None to use (and follow) the configured camera
+            booth_id (str): name used to route inference results and print jobs
+            photos_dir (str): directory strips are saved to
+            startup, scheduler, print_spooler, share_server, printer_monitor: shared resources
+                when several booths run in one process. A standalone booth creates its own.
+            screen (QScreen): display to show the booth on full screen
+            preview_stream_port (int): port for this booth's preview stream, if enabled
+        """
         super().__init__()
         self.setWindowTitle("Yeehaw Booth")
+        if screen is not None:
+            self.setScreen(screen)
+            self.move(screen.geometry().topLeft())
         self.showFullScreen()
+
+        # Shared resources are only stopped by whoever created them
+        self.owns_shared_resources = startup is None
+        self.booth_id = booth_id
+        self.startup = startup if startup is not None else create_startup()
+        self.scheduler = scheduler if scheduler is not None else InferenceScheduler(self.startup)
+        self.scheduler.register(self.booth_id)
+        if print_spooler is None:
+            print_spooler = PrintSpooler(self.startup)
+            print_spooler.start()
+        self.print_spooler = print_spooler
+        self.print_spooler.job_finished.connect(self.on_print_finished)
+        # Journal print outcomes on the spooler thread, so jobs drained at shutdown are recorded too
+        self.print_spooler.job_finished.connect(self.journal_print_finished, Qt.ConnectionType.DirectConnection)
+        # Print time estimates and back-pressure when the printer falls behind
+        if printer_monitor is None:
+            printer_monitor = PrinterMonitor(self.startup, self.print_spooler)
+            printer_monitor.start()
+        self.printer_monitor = printer_monitor
         
         # Add dev mode state
         self.dev_mode = False
@@ -44,7 +179,7 @@ class CowboyBooth(QMainWindow):
         """)
         loading_layout = QVBoxLayout(self.loading_widget)
         
-        self.loading_label = QLabel("Printing photos...\nCollect photos below", self)
+        self.loading_label = QLabel(PRINTING_TEXT, self)
         self.loading_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.loading_label.setStyleSheet("""
             QLabel {
@@ -56,6 +191,13 @@ class CowboyBooth(QMainWindow):
             }
         """)
         loading_layout.addWidget(self.loading_label)
+
+        # The session's download QR code, when the share server is on
+        self.loading_qr = QLabel(self)
+        self.loading_qr.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.loading_qr.setStyleSheet("QLabel { background-color: white; padding: 10px; }")
+        self.loading_qr.hide()
+        loading_layout.addWidget(self.loading_qr, alignment=Qt.AlignmentFlag.AlignCenter)
         
         self.loading_progress = QProgressBar(self)
         self.loading_progress.setRange(0, 0)  # Indeterminate progress
@@ -86,27 +228,27 @@ class CowboyBooth(QMainWindow):
 
         # Create buttons to toggle effects
         self.mustache_button = QPushButton("Mustache", self)
-        self.mustache_button.clicked.connect(lambda: self.toggle_effect('mustache_enabled'))
+        self.mustache_button.clicked.connect(lambda: self.toggle_effect('mustache'))
         self.mustache_button.setCheckable(True)
-        self.mustache_button.setChecked(EFFECT_CONFIG['mustache_enabled'])
+        self.mustache_button.setChecked(get_config().effects.mustache)
         button_layout.addWidget(self.mustache_button)
 
         self.bolo_tie_button = QPushButton("Bolo Tie", self)
-        self.bolo_tie_button.clicked.connect(lambda: self.toggle_effect('bolo_tie_enabled'))
+        self.bolo_tie_button.clicked.connect(lambda: self.toggle_effect('bolo_tie'))
         self.bolo_tie_button.setCheckable(True)
-        self.bolo_tie_button.setChecked(EFFECT_CONFIG['bolo_tie_enabled'])
+        self.bolo_tie_button.setChecked(get_config().effects.bolo_tie)
         button_layout.addWidget(self.bolo_tie_button)
 
         self.cowboy_hat_button = QPushButton("Cowboy Hat", self)
-        self.cowboy_hat_button.clicked.connect(lambda: self.toggle_effect('cowboy_hat_enabled'))
+        self.cowboy_hat_button.clicked.connect(lambda: self.toggle_effect('cowboy_hat'))
         self.cowboy_hat_button.setCheckable(True)
-        self.cowboy_hat_button.setChecked(EFFECT_CONFIG['cowboy_hat_enabled'])
+        self.cowboy_hat_button.setChecked(get_config().effects.cowboy_hat)
         button_layout.addWidget(self.cowboy_hat_button)
 
         self.background_button = QPushButton("Background", self)
-        self.background_button.clicked.connect(lambda: self.toggle_effect('background_enabled'))
+        self.background_button.clicked.connect(lambda: self.toggle_effect('background'))
         self.background_button.setCheckable(True)
-        self.background_button.setChecked(EFFECT_CONFIG['background_enabled'])
+        self.background_button.setChecked(get_config().effects.background)
         button_layout.addWidget(self.background_button)
 
         # Add live effects toggle button
@@ -116,6 +258,26 @@ class CowboyBooth(QMainWindow):
         self.live_effects_button.setChecked(False)  # Off by default
         button_layout.addWidget(self.live_effects_button)
 
+        # Session gallery with reprint (dev mode only)
+        self.gallery_button = QPushButton("Gallery", self)
+        self.gallery_button.clicked.connect(self.open_gallery)
+        button_layout.addWidget(self.gallery_button)
+
+        # Re-time the models on this machine (dev mode only)
+        self.calibrate_button = QPushButton("Calibrate", self)
+        self.calibrate_button.clicked.connect(self.start_calibration)
+        button_layout.addWidget(self.calibrate_button)
+        self.calibration_thread = None
+
+        # Sample stacks and allocations here and in the effects workers (dev mode only)
+        self.profile_button = QPushButton(f"Profile {DEFAULT_PROFILE_SECONDS:.0f}s", self)
+        self.profile_button.clicked.connect(self.toggle_profiling)
+        button_layout.addWidget(self.profile_button)
+        self.profile_capture = None
+        self.profile_timer = QTimer()
+        self.profile_timer.setSingleShot(True)
+        self.profile_timer.timeout.connect(self.stop_profiling)
+
         layout.addLayout(button_layout)
 
         # Hide all control buttons by default
@@ -125,22 +287,26 @@ class CowboyBooth(QMainWindow):
         self.cowboy_hat_button.hide()
         self.background_button.hide()
         self.live_effects_button.hide()
-
-        # Initialize effects
-        self.mustache_effect = MustacheEffect()
-        self.bolo_tie_effect = BoloTieEffect()
-        self.cowboy_hat_effect = CowboyHatEffect()
-        self.background_effect = BackgroundReplacementEffect()
-
-        # Initialize printer
-        self.printer = DNPPrinter()
+        self.gallery_button.hide()
+        self.calibrate_button.hide()
+        self.profile_button.hide()
 
         # Initialize webcam
-        self.cap = cv2.VideoCapture(VIDEO_SOURCE_INDEX)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
+        self.video_source_from_config = video_source is None
+        self.cap = None
+        # A camera change published mid-session, applied once the session is over
+        self.pending_video_source = None
+        self.open_camera(get_config().camera.video_source if video_source is None else video_source)
+
+        # Apply settings changed in the config file while the booth is running
+        self.config_store = get_config_store()
+        self.config_changed.connect(self.on_config_changed)
+        self.config_store.subscribe(self.emit_config_changed)
+        self.config_store.start_watching()
 
         # Set up timer for webcam updates
+        # Countdown, counter and banner text, pre-rendered and blended into the preview
+        self.overlay_layer = OverlayLayer()
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_frame)
         self.timer.start(30)  # 30ms = ~33fps
@@ -149,7 +315,18 @@ class CowboyBooth(QMainWindow):
         self.countdown_timer = QTimer()
         self.countdown_timer.timeout.connect(self.update_countdown)
         self.countdown = 0
-        self.captured_frames = []
+        # The session's photos, kept in place in the panel they are printed on
+        self.frame_store = SessionFrameStore()
+        # Session ID -> release for the panel the print spooler holds
+        self.print_releases = {}
+        self.raw_frames = []
+        self.frame_masks = []
+        self.frame_poses = []
+        # Follows and smooths people across frames so their sprite placements can be reused
+        self.pose_tracker = PoseTracker(assign_effects=assign_body_effects)
+        # Mask from the last inference, for preview frames drawn without inference
+        self.last_mask = None
+        self.live_frame_count = 0
         self.photo_capture_thread = None
         self.flash_timer = QTimer()
         self.flash_timer.timeout.connect(self.end_flash)
@@ -158,28 +335,205 @@ class CowboyBooth(QMainWindow):
 
         # Loading timer for printing indicator
         self.loading_timer = QTimer()
+        self.loading_timer.setSingleShot(True)
         self.loading_timer.timeout.connect(self.hide_loading_indicator)
+        # Counts down the estimated print wait on the loading indicator
+        self.print_ready_at = None
+        self.loading_text = PRINTING_TEXT
+        self.print_wait_timer = QTimer()
+        self.print_wait_timer.timeout.connect(self.update_print_wait)
 
         # Create photos directory if it doesn't exist
-        self.photos_dir = "photos"
+        self.photos_dir = photos_dir
         if not os.path.exists(self.photos_dir):
             os.makedirs(self.photos_dir)
+        self.session_archive = SessionArchive(self.photos_dir)
+        self.encoder_pool = EncoderPool()
+        self.burst_recorder = None
+        if BURST_CAPTURE_ENABLED:
+            from burst_capture import BurstRecorder, BurstEncoder
+            burst_encoder = BurstEncoder()
+            burst_encoder.start()
+            self.burst_recorder = BurstRecorder(burst_encoder)
+        self.preview_tap = None
+        self.preview_stream_server = None
+        if PREVIEW_STREAM_ENABLED:
+            from preview_stream import PreviewTap, PreviewStreamServer
+            self.preview_tap = PreviewTap()
+            self.preview_stream_server = PreviewStreamServer(self.preview_tap, preview_stream_port).start()
+        if share_server is None and SHARE_SERVER_ENABLED and self.owns_shared_resources:
+            from share_server import ShareServer
+            share_server = ShareServer(self.photos_dir, port=SHARE_SERVER_PORT).start()
+        self.share_server = share_server
+        self.catalog = SessionCatalog(self.photos_dir)
+        # Index strips from before the catalog existed without holding up startup
+        threading.Thread(target=self.catalog.backfill, daemon=True).start()
+        # Crash-safe record of each session; finish what a crashed run left undone in the background
+        self.session_journal = SessionJournal(self.photos_dir)
+        threading.Thread(target=self.recover_sessions, daemon=True).start()
+
+    def open_camera(self, video_source):
+        if self.cap is not None:
+            self.cap.release()
+        self.cap = cv2.VideoCapture(video_source)
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
+
+    def emit_config_changed(self, old, new):
+        # Called on whichever thread published the snapshot
+        self.config_changed.emit(old, new)
+
+    def on_config_changed(self, old, config):
+        """Bring the buttons and camera in line with a new config snapshot."""
+        for name in ('mustache', 'bolo_tie', 'cowboy_hat', 'background'):
+            getattr(self, f'{name}_button').setChecked(config.effects.is_enabled(name))
+        if self.video_source_from_config and old.camera.video_source != config.camera.video_source:
+            # Don't switch cameras in the middle of a session
+            self.pending_video_source = config.camera.video_source
+            if not self.session_in_progress():
+                self.apply_pending_camera()
+
+    def session_in_progress(self):
+        capturing = self.photo_capture_thread is not None and self.photo_capture_thread.isRunning()
+        return self.countdown_timer.isActive() or self.flash_active or capturing
+
+    def apply_pending_camera(self):
+        if self.pending_video_source is not None:
+            print(f"Switching to camera {self.pending_video_source}")
+            self.open_camera(self.pending_video_source)
+            self.pending_video_source = None
 
     def toggle_effect(self, effect_name):
-        """Toggle an effect on/off and update the button state."""
-        EFFECT_CONFIG[effect_name] = not EFFECT_CONFIG[effect_name]
-        # Convert effect_name to button name (e.g., 'cowboy_hat_enabled' -> 'cowboy_hat_button')
-        button_name = effect_name.replace('_enabled', '_button')
-        button = getattr(self, button_name)
-        button.setChecked(EFFECT_CONFIG[effect_name])
+        """Toggle an effect on/off by publishing a new config snapshot."""
+        config = get_config()
+        self.config_store.publish(config.with_changes('effects', **{effect_name: not config.effects.is_enabled(effect_name)}))
+        getattr(self, f'{effect_name}_button').setChecked(get_config().effects.is_enabled(effect_name))
+
+    def run_inference(self, frame):
+        """
+        Compute the person mask and poses the enabled effects need.
+        Returns (mask, poses); either is None if it wasn't needed or its model isn't loaded.
+        """
+        request = self.engine_request()
+        if USE_EFFECTS_ENGINE:
+            result = self.scheduler.process(self.booth_id, frame, **request)
+            if result is None:
+                return None, None
+            return result.mask, (result.poses if request['pose'] else None)
+
+        mask = None
+        poses = None
+        background_effect = self.startup.get('background')
+        pose_effect = None
+        if request['pose']:
+            # All body effects use the same model, so detect once and share the poses
+            for name in BODY_EFFECT_NAMES:
+                pose_effect = self.startup.get(name)
+                if pose_effect is not None:
+                    break
+        if (request['segmentation'] and background_effect is not None) or pose_effect is not None:
+            # Already imported by the effect loaders
+            from photo_effects import to_mp_image
+            # Both models take the same RGB image, so convert the frame once
+            mp_image = to_mp_image(frame)
+            if request['segmentation'] and background_effect is not None:
+                mask = background_effect.get_person_mask(frame, mp_image)
+            if pose_effect is not None:
+                poses = pose_effect.detect(frame, mp_image)
+        return mask, poses
+
+    def apply_effects(self, frame):
+        """Apply every effect that has finished loading, in order."""
+        timestamp = time.perf_counter()
+        mask, poses = self.run_inference(frame)
+        return self.composite_effects(frame, mask, poses, timestamp)
+
+    def apply_live_effects(self, frame):
+        """
+        Apply effects to the preview. With the effects engine this submits the new frame
+        and draws on it with the newest finished results, the poses predicted forward from
+        the frame they were detected in, so inference runs in parallel with the GUI and the
+        preview never steps back to an older frame.
+        """
+        self.live_frame_count += 1
+        run_inference = self.live_frame_count % LIVE_INFERENCE_INTERVAL == 0
+        if not USE_EFFECTS_ENGINE:
+            if run_inference:
+                return self.apply_effects(frame)
+            return self.composite_predicted(frame)
+        if run_inference:
+            self.scheduler.submit(self.booth_id, frame, **self.engine_request())
+            # The submitted frame now belongs to the scheduler, so draw on a copy
+            frame = frame.copy()
+        result = self.scheduler.collect_latest(self.booth_id)
+        if result is not None:
+            # Fit the tracker at the time the result's frame was submitted, not when it came back
+            if result.poses is not None:
+                self.pose_tracker.update(result.poses, result.frame.shape[:2], result.timestamp)
+            self.last_mask = result.mask
+        return self.composite_predicted(frame)
+
+    def engine_request(self):
+        """Only ask the engine for the inference the enabled effects need."""
+        effects = get_config().effects
+        return {
+            'segmentation': effects.background,
+            'pose': effects.mustache or effects.bolo_tie or effects.cowboy_hat,
+        }
+
+    def composite_effects(self, frame, mask, poses, timestamp):
+        """Apply effects using a mask and poses that have already been computed for a frame taken at timestamp."""
+        people = None
+        if poses is not None:
+            people = self.pose_tracker.update(poses, frame.shape[:2], timestamp)
+        self.last_mask = mask
+        return self.composite_people(frame, mask, people)
+
+    def composite_predicted(self, frame):
+        """Apply effects to a frame inference skipped, using the last mask and predicted poses."""
+        mask = self.last_mask
+        if mask is not None and mask.shape != frame.shape[:2]:
+            mask = None
+        people = None
+        if self.engine_request()['pose']:
+            people = self.pose_tracker.predict(frame.shape[:2], time.perf_counter())
+        return self.composite_people(frame, mask, people)
+
+    def composite_people(self, frame, mask, people):
+        """Apply effects with a person mask and tracked people (either may be None)."""
+        for name, _ in EFFECT_COMPONENTS:
+            effect = self.startup.get(name)
+            if effect is None:
+                continue
+            if hasattr(effect, 'apply_with_mask'):
+                if mask is not None:
+                    frame = effect.apply_with_mask(frame, mask)
+            elif people is not None:
+                frame = effect.apply_with_people(frame, people)
+        return frame
 
     def start_photo_capture(self):
+        # Don't start a session until models and printer have finished loading
+        if not self.startup.is_finished():
+            print(f"Still loading: {', '.join(self.startup.pending_names())}")
+            return
+        # Don't add to the print queue while the printer is behind or needs attention
+        if self.printer_monitor.is_throttled():
+            print(f"Printer busy, {self.printer_monitor.pending_sheets()} sheets pending")
+            return
+        self.apply_pending_camera()
         self.capture_button.setEnabled(False)
         self.countdown = 3
-        self.captured_frames = []
+        self.frame_store.begin()
+        self.raw_frames = []
+        self.frame_masks = []
+        self.frame_poses = []
         self.photo_count = 0
         # Store the timestamp for this set
         self.photo_set_timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.session_journal.session_started(self.photo_set_timestamp, self.booth_id)
+        if self.burst_recorder is not None:
+            self.burst_recorder.start_session(self.photo_set_timestamp)
         self.countdown_timer.start(1000)  # 1 second intervals
 
     def update_countdown(self):
@@ -197,12 +551,21 @@ class CowboyBooth(QMainWindow):
         ret, frame = self.cap.read()
         if ret:
             # Apply all effects to the saved photo
-            frame_with_effects = frame.copy()
-            frame_with_effects = self.background_effect.apply_effect(frame_with_effects)
-            frame_with_effects = self.mustache_effect.apply_effect(frame_with_effects)
-            frame_with_effects = self.bolo_tie_effect.apply_effect(frame_with_effects)
-            frame_with_effects = self.cowboy_hat_effect.apply_effect(frame_with_effects)
-            self.captured_frames.append(frame_with_effects)
+            mask, poses = self.run_inference(frame)
+            # Composite straight into the session's panel rather than a copy of the frame
+            slot = self.frame_store.next_slot(frame.shape)
+            np.copyto(slot, frame)
+            # Place sprites from the raw poses, not the preview's smoothed and cached ones
+            people = self.pose_tracker.identify(poses) if poses is not None else None
+            frame_with_effects = self.frame_store.add(self.composite_people(slot, mask, people))
+            self.session_journal.frame_captured(self.photo_set_timestamp, self.photo_count, frame_with_effects,
+                                                on_written=self.frame_store.retain())
+            # Keep the raw frame and inference results so the session can be re-rendered later
+            self.raw_frames.append(frame)
+            self.frame_masks.append(mask)
+            self.frame_poses.append(poses)
+            if self.burst_recorder is not None:
+                self.burst_recorder.mark_flash()
             self.photo_count += 1
             # Start flash, but do NOT start the next countdown here
             self.start_flash()
@@ -216,21 +579,23 @@ class CowboyBooth(QMainWindow):
         self.flash_active = False
         self.flash_timer.stop()
         # Now start the next countdown or save photos
-        if len(self.captured_frames) < 4:
+        if self.frame_store.count < STRIP_LENGTH:
             self.countdown = 3
             self.countdown_timer.start(1000)
         else:
             self.save_photos()
 
     def save_photos(self):
-        self.photo_capture_thread = PhotoCaptureThread(self.captured_frames)
+        self.photo_capture_thread = PhotoCaptureThread(self.frame_store.frames)
         self.photo_capture_thread.finished.connect(self.on_photos_saved)
         self.photo_capture_thread.start()
 
     def show_loading_indicator(self):
         """Show the loading indicator overlay."""
         # Position the loading widget in the center of the main window
-        self.loading_widget.resize(300, 150)
+        # At least 300x150, larger if the text needs it (e.g. with a download link)
+        hint = self.loading_widget.sizeHint()
+        self.loading_widget.resize(max(300, hint.width()), max(150, hint.height()))
         self.loading_widget.move(
             (self.width() - self.loading_widget.width()) // 2,
             (self.height() - self.loading_widget.height()) // 2
@@ -241,47 +606,232 @@ class CowboyBooth(QMainWindow):
     def hide_loading_indicator(self):
         """Hide the loading indicator overlay."""
         self.loading_widget.hide()
+        self.loading_qr.hide()
         self.loading_timer.stop()
+        self.print_wait_timer.stop()
+        self.print_ready_at = None
+
+    def set_loading_qr(self, png):
+        """Show a QR code (PNG bytes) under the printing notice, or hide it for None."""
+        pixmap = QPixmap()
+        if png is None or not pixmap.loadFromData(png):
+            self.loading_qr.hide()
+            return
+        self.loading_qr.setPixmap(pixmap.scaled(
+            LOADING_QR_SIZE, LOADING_QR_SIZE, Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.FastTransformation))
+        self.loading_qr.show()
+
+    def show_print_wait(self, text, wait):
+        """Show the printing notice with a countdown of the estimated wait."""
+        self.loading_text = text
+        self.print_ready_at = time.monotonic() + wait
+        self.update_print_wait()
+        self.show_loading_indicator()
+        self.print_wait_timer.start(1000)
+
+    def update_print_wait(self):
+        if self.print_ready_at is None:
+            return
+        remaining = self.print_ready_at - time.monotonic()
+        if remaining >= 1:
+            self.loading_label.setText(f"{self.loading_text}\n\nReady in about {format_wait(remaining)}")
+        else:
+            self.loading_label.setText(self.loading_text)
 
     def on_photos_saved(self, frames):
-        # Create vertical strip of 4 photos
-        # Assuming all frames are the same size
-        h, w = frames[0].shape[:2]
+        # Create a panel of two identical vertical strips of 4 photos, in place around the photos
+        panel = self.frame_store.finish()
         
-        # Create a panel that's 4 photos tall and 2 photos wide (for two identical strips)
-        panel = np.zeros((h * 4, w * 2, 3), dtype=np.uint8)
-        
-        # Create the first strip (left side)
-        panel[0:h, 0:w] = frames[0]  # Top
-        panel[h:h*2, 0:w] = frames[1]  # Second
-        panel[h*2:h*3, 0:w] = frames[2]  # Third
-        panel[h*3:h*4, 0:w] = frames[3]  # Bottom
-        
-        # Duplicate the strip for the right side
-        panel[0:h, w:w*2] = frames[0]  # Top
-        panel[h:h*2, w:w*2] = frames[1]  # Second
-        panel[h*2:h*3, w:w*2] = frames[2]  # Third
-        panel[h*3:h*4, w:w*2] = frames[3]  # Bottom
-        
-        # Save the panel
+        # Save the panel on the encoder pool; printing uses the in-memory panel in parallel
         panel_filename = f"strip_{self.photo_set_timestamp}.jpg"
         panel_path = os.path.join(self.photos_dir, panel_filename)
-        cv2.imwrite(panel_path, panel)
+        strip_futures = self.encoder_pool.submit(panel, panel_path)
+        strip_futures[0].add_done_callback(
+            lambda future, session_id=self.photo_set_timestamp: self.journal_strip(session_id, future))
+        # Each consumer of the panel holds it until done, so later sessions can't overwrite it;
+        # every format is encoded from the panel, so each encode holds it
+        for future in strip_futures:
+            release = self.frame_store.retain()
+            future.add_done_callback(lambda future, release=release: release())
+
+        self.catalog.add_session(self.photo_set_timestamp, self.booth_id, len(frames), panel_path)
+        if self.burst_recorder is not None:
+            self.burst_recorder.finish_session(os.path.join(self.photos_dir, f"burst_{self.photo_set_timestamp}.gif"))
+
+        # Archive the raw frames and inference results in the background for re-rendering
+        threading.Thread(
+            target=self.archive_session,
+            args=(self.photo_set_timestamp, panel, panel_path, self.raw_frames, self.frame_masks, self.frame_poses,
+                  self.frame_store.retain()),
+            daemon=True
+        ).start()
         
-        # Show loading indicator and start printing
-        self.show_loading_indicator()
+        # Let guests download the strip over the LAN
+        loading_text = PRINTING_TEXT
+        if self.share_server is not None:
+            share_url = self.share_server.publish(self.photo_set_timestamp, panel, on_done=self.frame_store.retain())
+            loading_text += f"\n\nScan to download, or go to:\n{share_url}"
+            from share_server import make_qr_png
+            self.set_loading_qr(make_qr_png(share_url))
+
+        # Show loading indicator with the wait for this sheet and the ones ahead of it
+        self.show_print_wait(loading_text, self.printer_monitor.estimate_wait(extra_sheets=1))
+        
+        # Queue the strip on the print spooler; on_print_finished handles the result
+        self.print_releases[self.photo_set_timestamp] = self.frame_store.retain()
+        self.print_spooler.submit(self.booth_id, self.photo_set_timestamp, panel_path, image=panel, shareable=True)
+        self.session_journal.print_queued(self.photo_set_timestamp)
         
-        # Print the strip
-        if self.printer.print_strip(panel_path):
-            # Start timer to hide loading indicator after 10 seconds
-            self.loading_timer.start(10000)  # 10 seconds
+        self.capture_button.setText("Take Photos")
+        self.capture_button.setEnabled(True)
+        self.apply_pending_camera()
+
+    def journal_strip(self, session_id, future):
+        """Record a strip in the journal once the encoder pool has it safely on disk."""
+        result = future.result()
+        if result.success:
+            self.session_journal.strip_completed(session_id, result.path)
+
+    def journal_print_finished(self, booth_id, session_id, success, artifact_path):
+        # Called on the spooler thread
+        if booth_id == self.booth_id:
+            self.session_journal.print_finished(session_id, success)
+            # The spooler is done with the session's panel
+            release = self.print_releases.pop(session_id, None)
+            if release is not None:
+                release()
+
+    def recover_sessions(self):
+        """Rebuild and reprint sessions a crashed run didn't finish. Runs in a background thread."""
+        def rebuild_strip(session_id, frames):
+            panel = build_strip_panel(frames)
+            strip_path = os.path.join(self.photos_dir, f"strip_{session_id}.jpg")
+            if not self.encoder_pool.submit(panel, strip_path)[0].result().success:
+                return None
+            self.catalog.add_session(session_id, self.booth_id, len(frames), strip_path)
+            return strip_path
+
+        def requeue_print(session_id, strip_path):
+            self.catalog.add_session(session_id, self.booth_id, strip_path=strip_path)
+            self.print_spooler.submit(self.booth_id, session_id, strip_path, shareable=True)
+
+        recovered = self.session_journal.recover(rebuild_strip, requeue_print)
+        if recovered:
+            print(f"Recovered {recovered} unfinished sessions")
+
+    def archive_session(self, session_id, panel, panel_path, raw_frames, masks, poses, release_panel):
+        """Archive a session and cache its thumbnail. Runs in a background thread."""
+        try:
+            metadata = {'strip_path': panel_path, 'booth_id': self.booth_id, 'effects': get_config().to_dict()['effects']}
+            archive_path = self.session_archive.save_session(session_id, raw_frames, masks, poses, metadata)
+
+            # The panel is still in memory, so the thumbnail doesn't need a decode
+            thumbnail_path = self.catalog.thumbnail_path(session_id)
+            if not write_thumbnail(panel, thumbnail_path):
+                thumbnail_path = None
+            self.catalog.add_session(session_id, archive_path=archive_path, thumbnail_path=thumbnail_path)
+        finally:
+            release_panel()
+
+    def reprint_session(self, session_id):
+        """Reprint a catalogued session, sending its cached print artifact straight to the spooler if there is one."""
+        session = self.catalog.get_session(session_id)
+        if session is None:
+            print(f"Session {session_id} not found in catalog")
+            return
+        artifact_path = session['print_artifact_path']
+        if artifact_path and os.path.exists(artifact_path):
+            self.print_spooler.submit(self.booth_id, session_id, artifact_path, prepared=True)
+        elif session['strip_path'] and os.path.exists(session['strip_path']):
+            self.print_spooler.submit(self.booth_id, session_id, session['strip_path'])
+        else:
+            QMessageBox.warning(self, "Reprint Error", f"No strip found for session {session_id}.")
+            return
+        self.set_loading_qr(None)
+        self.show_print_wait(PRINTING_TEXT, self.printer_monitor.estimate_wait(extra_sheets=1))
+
+    def open_gallery(self):
+        gallery = SessionGallery(self.catalog, self.reprint_session, self)
+        gallery.show()
+
+    def start_calibration(self):
+        """Benchmark the pose and segmentation models in the background and save the best fit."""
+        if self.calibration_thread is not None and self.calibration_thread.isRunning():
+            return
+        self.calibrate_button.setEnabled(False)
+        self.calibrate_button.setText("Calibrating...")
+        self.calibration_thread = CalibrationThread(
+            parallel=USE_EFFECTS_ENGINE, inference_interval=LIVE_INFERENCE_INTERVAL, photos_dir=self.photos_dir)
+        self.calibration_thread.finished.connect(self.on_calibration_finished)
+        self.calibration_thread.start()
+
+    def toggle_profiling(self):
+        if self.profile_capture is not None:
+            self.stop_profiling()
+        else:
+            self.start_profiling()
+
+    def start_profiling(self, duration=DEFAULT_PROFILE_SECONDS):
+        """
+        Profile this process (GUI and worker threads) and the effects workers for duration
+        seconds, writing timestamped profiles next to the photos directory.
+        """
+        output_dir = profile_dir_for(self.photos_dir)
+        prefix = profile_stamp()
+        capture = ProfileCapture(output_dir, prefix, self.booth_id, duration)
+        if not capture.start():
+            QMessageBox.warning(self, "Profiling", "Another booth is already profiling.")
+            return
+        self.profile_capture = capture
+        engine = self.startup.get('engine') if USE_EFFECTS_ENGINE else None
+        if engine is not None:
+            engine.start_profiling(output_dir, prefix, duration)
+        print(f"Profiling for {duration:.0f}s into {output_dir}")
+        self.profile_button.setText("Stop Profiling")
+        self.profile_timer.start(int(duration * 1000))
+
+    def stop_profiling(self):
+        """End the capture early (or tidy up once it has run its course); profiles are written in the background."""
+        if self.profile_capture is None:
+            return
+        self.profile_timer.stop()
+        self.profile_capture.stop()
+        engine = self.startup.get('engine') if USE_EFFECTS_ENGINE else None
+        if engine is not None:
+            engine.stop_profiling()
+        self.profile_capture = None
+        self.profile_button.setText(f"Profile {DEFAULT_PROFILE_SECONDS:.0f}s")
+
+    def on_calibration_finished(self, success, result):
+        self.calibrate_button.setEnabled(True)
+        self.calibrate_button.setText("Calibrate")
+        if not success:
+            QMessageBox.warning(self, "Calibration Error", f"Calibration failed: {result}")
+            return
+        QMessageBox.information(
+            self, "Calibration",
+            f"Pose model: {result['pose_model']}\n"
+            f"Segmentation model: {result['segmentation_model']}\n"
+            f"Inference: {result['latency'] * 1000:.0f} ms per frame\n\n"
+            "Restart the booth to use the new models."
+        )
+
+    def on_print_finished(self, booth_id, session_id, success, artifact_path):
+        # The spooler may be shared, so ignore other booths' jobs
+        if booth_id != self.booth_id:
+            return
+        self.catalog.update_print_status(session_id, PRINT_PRINTED if success else PRINT_FAILED, artifact_path)
+        if success:
+            # Hide the loading indicator once the printer should have finished the sheet
+            remaining = MIN_PRINT_NOTICE_SECONDS
+            if self.print_ready_at is not None:
+                remaining = max(remaining, self.print_ready_at - time.monotonic())
+            self.loading_timer.start(int(remaining * 1000))
         else:
             # Hide loading indicator immediately and show error
             self.hide_loading_indicator()
             QMessageBox.warning(self, "Print Error", "Failed to print photo strips. Please check printer connection.")
-        
-        self.capture_button.setText("Take Photos")
-        self.capture_button.setEnabled(True)
 
     def update_frame(self):
         ret, frame = self.cap.read()
@@ -290,74 +840,35 @@ class CowboyBooth(QMainWindow):
 
         # Only apply effects if live preview is enabled
         if self.live_effects_enabled:
-            frame = self.background_effect.apply_effect(frame)
-            frame = self.mustache_effect.apply_effect(frame)
-            frame = self.bolo_tie_effect.apply_effect(frame)
-            frame = self.cowboy_hat_effect.apply_effect(frame)
+            frame = self.apply_live_effects(frame)
+
+        # Keep a downscaled copy for burst animations, before any overlays are drawn
+        if self.burst_recorder is not None:
+            self.burst_recorder.add_frame(frame)
 
         # Display countdown and photo count on the frame
         if self.countdown > 0:
-            # Photo count in top-right corner
-            cv2.putText(
-                frame,
-                f"{self.photo_count + 1}/4",
-                (frame.shape[1] - 180, 80),  # Top-right, with some padding
-                cv2.FONT_HERSHEY_SIMPLEX,
-                2,  # Smaller font
-                (255, 255, 255),
-                3,
-                cv2.LINE_AA
-            )
-            # Countdown in the center
-            cv2.putText(
-                frame,
-                str(self.countdown),
-                (frame.shape[1] // 2 - 40, frame.shape[0] // 2 + 40),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                5,  # Large font
-                (255, 255, 255),
-                8,
-                cv2.LINE_AA
-            )
+            self.overlay_layer.draw_countdown(frame, self.countdown, f"{self.photo_count + 1}/4")
         elif not self.flash_active and self.photo_count == 0 and not self.countdown_timer.isActive():
-            # Display tap instruction when idle
-            text = "Tap anywhere to start taking photos"
-            font_scale = 1.5
-            thickness = 3
-            font = cv2.FONT_HERSHEY_SIMPLEX
-            
-            # Get text size to center it
-            (text_width, text_height), _ = cv2.getTextSize(text, font, font_scale, thickness)
-            text_x = (frame.shape[1] - text_width) // 2
-            text_y = (frame.shape[0] + text_height) // 2
-            
-            # Add a semi-transparent background for better readability
-            overlay = frame.copy()
-            cv2.rectangle(overlay, 
-                         (text_x - 20, text_y - text_height - 20),
-                         (text_x + text_width + 20, text_y + 20),
-                         (0, 0, 0),
-                         -1)
-            cv2.addWeighted(overlay, 0.5, frame, 0.5, 0, frame)
-            
-            # Draw the text
-            cv2.putText(
-                frame,
-                text,
-                (text_x, text_y),
-                font,
-                font_scale,
-                (255, 255, 255),
-                thickness,
-                cv2.LINE_AA
-            )
+            # Display tap instruction when idle (or a loading notice while models warm up)
+            printer_status = self.printer_monitor.current_status()
+            if not self.startup.is_finished():
+                text = "Getting ready..."
+            elif printer_status.needs_attention:
+                text = f"{printer_status.message} - please find a staff member"
+            elif self.printer_monitor.is_throttled():
+                text = f"Printer catching up - ready in about {format_wait(self.printer_monitor.seconds_until_unthrottled())}"
+            else:
+                text = "Tap anywhere to start taking photos"
+            self.overlay_layer.draw_banner(frame, text)
 
         # Apply flash effect
         if self.flash_active:
-            # Create a white overlay
-            white_overlay = np.ones_like(frame) * 255
-            # Blend with high alpha for a more intense flash
-            frame = cv2.addWeighted(frame, 0.3, white_overlay, 0.7, 0)
+            self.overlay_layer.draw_flash(frame)
+
+        # Mirror the finished preview frame to external displays
+        if self.preview_tap is not None:
+            self.preview_tap.publish(frame)
 
         # Convert frame to QImage and display
         rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
@@ -366,6 +877,7 @@ class CowboyBooth(QMainWindow):
         qt_image = QImage(rgb_frame.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
         self.image_label.setPixmap(QPixmap.fromImage(qt_image).scaled(
             self.image_label.size(), Qt.AspectRatioMode.KeepAspectRatio))
+        self.startup.mark_first_frame()
 
     def resizeEvent(self, event):
         """Handle window resize to reposition loading indicator."""
@@ -379,6 +891,27 @@ class CowboyBooth(QMainWindow):
 
     def closeEvent(self, event):
         self.cap.release()
+        # Write out a profile that is still running
+        capture = self.profile_capture
+        if capture is not None:
+            self.stop_profiling()
+            capture.wait()
+        self.config_store.unsubscribe(self.emit_config_changed)
+        # Let queued archive writes finish
+        self.encoder_pool.shutdown()
+        if self.burst_recorder is not None:
+            self.burst_recorder.encoder.stop()
+        if self.preview_tap is not None:
+            self.preview_stream_server.stop()
+            self.preview_tap.stop()
+        if self.owns_shared_resources:
+            self.print_spooler.stop()
+            self.printer_monitor.stop()
+            if self.share_server is not None:
+                self.share_server.stop()
+            if USE_EFFECTS_ENGINE and self.startup.get('engine') is not None:
+                self.startup.get('engine').stop()
+        self.session_journal.flush()
         event.accept()
 
     def eventFilter(self, obj: QObject, event: QEvent) -> bool:
@@ -409,6 +942,9 @@ class CowboyBooth(QMainWindow):
         self.cowboy_hat_button.setVisible(self.dev_mode)
         self.background_button.setVisible(self.dev_mode)
         self.live_effects_button.setVisible(self.dev_mode)
+        self.gallery_button.setVisible(self.dev_mode)
+        self.calibrate_button.setVisible(self.dev_mode)
+        self.profile_button.setVisible(self.dev_mode)
 
     def toggle_live_effects(self):
         """Toggle live effects preview on/off."""
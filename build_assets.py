@@ -0,0 +1,68 @@
+import os
+import sys
+import time
+import cv2
+from asset_bundle import premultiply_alpha, build_mipmaps, write_asset_bundle, BUNDLE_DATA_PATH, BUNDLE_MANIFEST_PATH
+from create_mustache import draw_mustache
+from create_bolo_tie import draw_bolo_tie
+from create_cowboy_hat import draw_cowboy_hat
+
+# Sprite name -> function that draws it if there is no designed PNG on disk
+SPRITES = {
+    'mustache': draw_mustache,
+    'bolo_tie': draw_bolo_tie,
+    'cowboy_hat': draw_cowboy_hat,
+}
+
+# Backgrounds to bundle
+BACKGROUNDS = ['background']
+
+# Common camera resolutions (width, height) to pre-scale backgrounds to
+BACKGROUND_RESOLUTIONS = [
+    (640, 480),
+    (1280, 720),
+    (1920, 1080),
+]
+
+def load_sprite(name, draw_function):
+    """Load a sprite PNG if one exists, otherwise draw it."""
+    path = f'{name}.png'
+    if os.path.exists(path):
+        image = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+        if image is not None:
+            print(f"Sprite {name}: loaded {path} {image.shape[1]}x{image.shape[0]}")
+            return image
+    print(f"Sprite {name}: {path} not found, drawing it")
+    return draw_function()
+
+def build_assets():
+    sprites = {}
+    for name, draw_function in SPRITES.items():
+        levels = build_mipmaps(premultiply_alpha(load_sprite(name, draw_function)))
+        sprites[name] = levels
+        print(f"Sprite {name}: {len(levels)} mipmap levels")
+
+    backgrounds = {}
+    for name in BACKGROUNDS:
+        image = cv2.imread(f'{name}.png')
+        if image is None:
+            raise FileNotFoundError(f"{name}.png not found. Please ensure the file exists.")
+        # Keep the native image for unusual resolutions, plus pre-scaled copies for common ones
+        images = [image]
+        for width, height in BACKGROUND_RESOLUTIONS:
+            if (width, height) != (image.shape[1], image.shape[0]):
+                images.append(cv2.resize(image, (width, height)))
+        backgrounds[name] = images
+        print(f"Background {name}: {', '.join(f'{i.shape[1]}x{i.shape[0]}' for i in images)}")
+
+    return write_asset_bundle(sprites, backgrounds)
+
+if __name__ == '__main__':
+    start = time.perf_counter()
+    try:
+        size = build_assets()
+    except Exception as e:
+        print(f"Error building asset bundle: {str(e)}")
+        sys.exit(1)
+    print(f"Wrote {BUNDLE_DATA_PATH} ({size / (1024 * 1024):.1f} MB) and {BUNDLE_MANIFEST_PATH} "
+          f"in {time.perf_counter() - start:.2f}s")
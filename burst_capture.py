@@ -0,0 +1,200 @@
+import queue
+import threading
+import traceback
+import numpy as np
+import cv2
+from PIL import Image
+
+# Preview frames kept from just before each flash
+BURST_PRE_FRAMES = 16
+# Preview frames recorded after each flash
+BURST_POST_FRAMES = 16
+# Burst frames are downscaled to this width as they are recorded
+BURST_WIDTH = 480
+# Keep every Nth recorded frame in the animation
+BURST_FRAME_STEP = 2
+# Delay between animation frames (ms)
+BURST_FRAME_DURATION = 66
+# Animation formats to write: 'gif' and/or 'mp4'
+BURST_OUTPUT_FORMATS = ('gif',)
+
+class BurstRecorder:
+    """
+    Records a short window of preview frames around each flash.
+    Frames are downscaled on arrival into a preallocated ring buffer, so memory stays
+    fixed no matter how long the booth runs. When a burst is complete it is handed to
+    the BurstEncoder, which builds the animation in the background.
+    """
+
+    def __init__(self, encoder, pre_frames=BURST_PRE_FRAMES, post_frames=BURST_POST_FRAMES, width=BURST_WIDTH):
+        self.encoder = encoder
+        self.pre_frames = pre_frames
+        self.post_frames = post_frames
+        self.width = width
+        self.ring = None
+        self.ring_count = 0
+        self.ring_next = 0
+        self.session_id = None
+        self.burst = None
+        self.burst_post_remaining = 0
+        self.burst_count = 0
+        self.finish_path = None
+
+    def add_frame(self, frame):
+        """Record a preview frame (called for every displayed frame)."""
+        h, w = frame.shape[:2]
+        height = max(1, int(h * self.width / w))
+        if self.ring is None or self.ring.shape[1:3] != (height, self.width):
+            self.ring = np.zeros((self.pre_frames, height, self.width, 3), dtype=np.uint8)
+            self.ring_count = 0
+            self.ring_next = 0
+
+        if self.burst is not None:
+            # Collecting frames after a flash
+            self.burst.append(cv2.resize(frame, (self.width, height), interpolation=cv2.INTER_AREA))
+            self.burst_post_remaining -= 1
+            if self.burst_post_remaining <= 0:
+                self._end_burst()
+            return
+
+        # Resize straight into the ring slot, without an intermediate copy
+        cv2.resize(frame, (self.width, height), dst=self.ring[self.ring_next], interpolation=cv2.INTER_AREA)
+        self.ring_next = (self.ring_next + 1) % self.pre_frames
+        self.ring_count = min(self.ring_count + 1, self.pre_frames)
+
+    def start_session(self, session_id):
+        # Send the previous session's open burst, which writes it if it was finishing
+        if self.burst is not None:
+            self._end_burst()
+        if self.session_id is not None:
+            # The previous session never finished: drop it
+            self.encoder.discard_session(self.session_id)
+        self.session_id = session_id
+        self.burst = None
+        self.burst_count = 0
+        self.finish_path = None
+        self.encoder.start_session(session_id)
+
+    def mark_flash(self):
+        """Start a burst: the frames before the flash, then the next post_frames."""
+        if self.session_id is None or self.ring is None:
+            return
+        if self.burst is not None:
+            self._end_burst()
+        # Oldest first
+        order = [(self.ring_next - self.ring_count + i) % self.pre_frames for i in range(self.ring_count)]
+        self.burst = [self.ring[i].copy() for i in order]
+        self.burst_post_remaining = self.post_frames
+        self.burst_count += 1
+
+    def _end_burst(self):
+        self.encoder.add_burst(self.session_id, self.burst)
+        self.burst = None
+        self.ring_count = 0
+        if self.finish_path is not None:
+            self._finish()
+
+    def finish_session(self, output_path):
+        """Write the animation once the last burst has finished recording."""
+        self.finish_path = output_path
+        if self.burst is None:
+            self._finish()
+
+    def _finish(self):
+        if self.burst_count:
+            self.encoder.finish_session(self.session_id, self.finish_path)
+        else:
+            self.encoder.discard_session(self.session_id)
+        self.session_id = None
+        self.finish_path = None
+
+class BurstEncoder(threading.Thread):
+    """
+    Background thread that turns bursts into a looping animation as they arrive.
+    Each frame is palette-quantized when its burst comes in, against one palette per
+    session so colors don't flicker, leaving only the file write for the end.
+    """
+
+    def __init__(self, frame_step=BURST_FRAME_STEP, frame_duration=BURST_FRAME_DURATION,
+                 output_formats=BURST_OUTPUT_FORMATS, boomerang=True):
+        super().__init__(name='burst-encoder', daemon=True)
+        self.frame_step = frame_step
+        self.frame_duration = frame_duration
+        self.output_formats = output_formats
+        self.boomerang = boomerang
+        self.jobs = queue.Queue()
+        # session_id -> {'palette': P image, 'frames': [P images]}
+        self.sessions = {}
+
+    def start_session(self, session_id):
+        self.jobs.put(('start', session_id, None))
+
+    def add_burst(self, session_id, frames):
+        self.jobs.put(('burst', session_id, frames))
+
+    def finish_session(self, session_id, output_path):
+        self.jobs.put(('finish', session_id, output_path))
+
+    def discard_session(self, session_id):
+        """Drop a session without writing it, freeing its quantized frames."""
+        self.jobs.put(('discard', session_id, None))
+
+    def stop(self):
+        self.jobs.put(None)
+
+    def run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            kind, session_id, payload = job
+            try:
+                if kind == 'start':
+                    self.sessions[session_id] = {'palette': None, 'frames': []}
+                elif kind == 'burst':
+                    self._quantize_burst(self.sessions[session_id], payload)
+                elif kind == 'finish':
+                    self._write(self.sessions.pop(session_id), payload)
+                elif kind == 'discard':
+                    self.sessions.pop(session_id, None)
+            except Exception as e:
+                print(f"Error encoding burst for session {session_id}: {str(e)}")
+                print(traceback.format_exc())
+
+    def _quantize_burst(self, session, frames):
+        for frame in frames[::self.frame_step]:
+            image = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            if session['palette'] is None:
+                session['palette'] = image.quantize(colors=256, method=Image.Quantize.MEDIANCUT)
+                session['frames'].append(session['palette'])
+            else:
+                session['frames'].append(image.quantize(palette=session['palette'], dither=Image.Dither.NONE))
+
+    def _write(self, session, output_path):
+        frames = session['frames']
+        if not frames:
+            return
+        if self.boomerang and len(frames) > 2:
+            # Play forwards then backwards, without repeating the end frames
+            frames = frames + frames[-2:0:-1]
+
+        base_path = output_path.rsplit('.', 1)[0]
+        if 'gif' in self.output_formats:
+            frames[0].save(
+                base_path + '.gif',
+                save_all=True,
+                append_images=frames[1:],
+                duration=self.frame_duration,
+                loop=0
+            )
+            print(f"Saved burst animation: {base_path}.gif ({len(frames)} frames)")
+        if 'mp4' in self.output_formats:
+            width, height = frames[0].size
+            fps = 1000.0 / self.frame_duration
+            writer = cv2.VideoWriter(base_path + '.mp4', cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+            try:
+                for frame in frames:
+                    writer.write(cv2.cvtColor(np.asarray(frame.convert('RGB')), cv2.COLOR_RGB2BGR))
+            finally:
+                writer.release()
+            print(f"Saved burst animation: {base_path}.mp4 ({len(frames)} frames)")
@@ -0,0 +1,212 @@
+import os
+import sys
+import json
+import time
+import platform
+import datetime
+import statistics
+import traceback
+
+# Per-machine model choices, keyed by host name
+CALIBRATION_PATH = 'calibration.json'
+
+# Frame to benchmark with: a photo with several people in it, e.g. taken on the booth camera.
+# Without it, the archived photo of this booth with the most people is used.
+CALIBRATION_SAMPLE_PATH = 'calibration_sample.jpg'
+CALIBRATION_FRAME_SIZE = (1280, 720)
+# Most recent archived sessions searched for a sample frame
+CALIBRATION_ARCHIVE_SESSIONS = 20
+
+# Time between live preview frames (seconds): the booth's 30 ms preview timer
+PREVIEW_FRAME_SECONDS = 0.030
+# Preview frames per inference run when calibrating outside a booth (see booth_window.LIVE_INFERENCE_INTERVAL)
+DEFAULT_INFERENCE_INTERVAL = 2
+
+# Timed runs per model, after one warm-up run
+CALIBRATION_RUNS = 10
+
+# Highest quality first
+POSE_MODELS = ['heavy', 'full', 'lite']
+# Selfie segmentation: 0 is the general model, 1 the faster landscape model
+SEGMENTATION_MODELS = [0, 1]
+SEGMENTATION_MODEL_FILES = {
+    0: 'selfie_segmenter.tflite',
+    1: 'selfie_segmenter_landscape.tflite',
+}
+
+DEFAULT_MODEL_SETTINGS = {
+    'pose_model': 'lite',
+    'segmentation_model': 1,
+}
+
+_model_settings = None
+
+def pose_model_path(model_variant):
+    return f'./pose_landmarker_{model_variant}.task'
+
+def segmentation_model_path(model_selection):
+    return f'./{SEGMENTATION_MODEL_FILES[model_selection]}'
+
+def machine_id():
+    return platform.node() or 'default'
+
+def load_calibrations(path=CALIBRATION_PATH):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Error reading {path}: {str(e)}")
+        return {}
+
+def get_model_settings():
+    """Model choices calibrated for this machine, or the defaults if it hasn't been calibrated."""
+    global _model_settings
+    if _model_settings is None:
+        calibration = load_calibrations().get(machine_id())
+        _model_settings = dict(DEFAULT_MODEL_SETTINGS)
+        if calibration:
+            _model_settings['pose_model'] = calibration['pose_model']
+            _model_settings['segmentation_model'] = calibration['segmentation_model']
+    return _model_settings
+
+def archived_sample_frame(photos_dir):
+    """The raw frame with the most detected people among the booth's recent archived sessions, or None."""
+    from session_archive import SessionArchive, load_session
+    best, best_people = None, 0
+    for path in SessionArchive(photos_dir).list_sessions()[-CALIBRATION_ARCHIVE_SESSIONS:]:
+        try:
+            session = load_session(path)
+        except Exception as e:
+            print(f"Calibration: could not read {path}: {str(e)}")
+            continue
+        for frame, poses in zip(session['frames'], session['poses']):
+            if poses is not None and len(poses) > best_people:
+                best, best_people = frame, len(poses)
+    return best
+
+def load_sample_frame(photos_dir=None):
+    """
+    A frame with people in it to time the models on. Pose timings only mean something
+    with people in view: with nobody detected the landmark network never runs, and
+    every pose model times the same detector pass.
+    """
+    import cv2
+    frame = cv2.imread(CALIBRATION_SAMPLE_PATH)
+    if frame is None and photos_dir is not None:
+        frame = archived_sample_frame(photos_dir)
+    if frame is None:
+        raise FileNotFoundError(
+            f"Calibration needs a photo of people: add {CALIBRATION_SAMPLE_PATH} or take a photo session first")
+    return cv2.resize(frame, CALIBRATION_FRAME_SIZE)
+
+def time_call(function, runs=CALIBRATION_RUNS):
+    """Median time of a call, after one untimed warm-up call."""
+    function()
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+def inference_latency(pose_time, segmentation_time, parallel):
+    """Per-frame latency: the effects engine runs both models at once, in-process they run back to back."""
+    return max(pose_time, segmentation_time) if parallel else pose_time + segmentation_time
+
+def run_calibration(parallel=True, inference_interval=DEFAULT_INFERENCE_INTERVAL, runs=CALIBRATION_RUNS,
+                    save=True, photos_dir=None):
+    """
+    Time every available pose and segmentation model on this machine, pick the highest
+    quality combination that keeps up with the live preview, and save it for this machine.
+    Live inference runs on every inference_interval-th preview frame, so it has that many
+    frame times per run. Stills run the same models on one frame, so a combination that
+    keeps up with the preview is also quick enough for capture and isn't budgeted separately.
+    Returns the calibration record.
+    """
+    preview_budget = inference_interval * PREVIEW_FRAME_SECONDS
+    from photo_effects import create_pose_landmarker, detect_poses, BackgroundReplacementEffect
+
+    frame = load_sample_frame(photos_dir)
+    pose_times = {}
+    for variant in POSE_MODELS:
+        if not os.path.exists(pose_model_path(variant)):
+            print(f"Calibration: {pose_model_path(variant)} not found, skipping")
+            continue
+        landmarker = create_pose_landmarker(variant)
+        try:
+            if not detect_poses(landmarker, frame):
+                raise RuntimeError("No people detected in the calibration frame, so pose timings would be meaningless")
+            pose_times[variant] = time_call(lambda: detect_poses(landmarker, frame), runs)
+        finally:
+            landmarker.close()
+        print(f"Calibration: pose {variant} {pose_times[variant] * 1000:.1f} ms")
+
+    segmentation_times = {}
+    for model_selection in SEGMENTATION_MODELS:
+        if not os.path.exists(segmentation_model_path(model_selection)):
+            print(f"Calibration: {segmentation_model_path(model_selection)} not found, skipping")
+            continue
+        effect = BackgroundReplacementEffect(model_selection=model_selection)
+        try:
+            segmentation_times[model_selection] = time_call(lambda: effect.get_person_mask(frame), runs)
+        finally:
+            effect.segmenter.close()
+        print(f"Calibration: segmentation {model_selection} {segmentation_times[model_selection] * 1000:.1f} ms")
+
+    if not pose_times:
+        raise FileNotFoundError("No pose models found")
+    if not segmentation_times:
+        raise FileNotFoundError("No segmentation models found")
+
+    # Prefer pose quality, then segmentation quality; fall back to the fastest combination
+    choice = None
+    for variant in [v for v in POSE_MODELS if v in pose_times]:
+        for model_selection in [m for m in SEGMENTATION_MODELS if m in segmentation_times]:
+            latency = inference_latency(pose_times[variant], segmentation_times[model_selection], parallel)
+            if latency <= preview_budget:
+                choice = (variant, model_selection, latency)
+                break
+        if choice:
+            break
+    if choice is None:
+        variant = min(pose_times, key=pose_times.get)
+        model_selection = min(segmentation_times, key=segmentation_times.get)
+        choice = (variant, model_selection, inference_latency(pose_times[variant], segmentation_times[model_selection], parallel))
+        print("Calibration: no combination meets the latency budget, using the fastest")
+
+    record = {
+        'pose_model': choice[0],
+        'segmentation_model': choice[1],
+        'latency': choice[2],
+        'parallel': parallel,
+        'inference_interval': inference_interval,
+        'preview_budget': preview_budget,
+        'pose_times': pose_times,
+        'segmentation_times': {str(k): v for k, v in segmentation_times.items()},
+        'calibrated_at': datetime.datetime.now().isoformat(timespec='seconds'),
+    }
+    print(f"Calibration: using pose {record['pose_model']}, segmentation {record['segmentation_model']} "
+          f"({record['latency'] * 1000:.1f} ms per frame)")
+    if save:
+        save_calibration(record)
+    return record
+
+def save_calibration(record, path=CALIBRATION_PATH):
+    """Store a calibration for this machine, keeping other machines' entries."""
+    global _model_settings
+    calibrations = load_calibrations(path)
+    calibrations[machine_id()] = record
+    with open(path + '.tmp', 'w') as f:
+        json.dump(calibrations, f, indent=2)
+    os.replace(path + '.tmp', path)
+    _model_settings = None
+
+if __name__ == '__main__':
+    try:
+        run_calibration(parallel='--in-process' not in sys.argv, photos_dir='photos')
+    except Exception as e:
+        print(f"Calibration failed: {str(e)}")
+        print(traceback.format_exc())
+        sys.exit(1)
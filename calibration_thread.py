@@ -0,0 +1,22 @@
+import traceback
+from PyQt6.QtCore import QThread, pyqtSignal
+from calibration import run_calibration
+
+class CalibrationThread(QThread):
+    # (success, calibration record or error message)
+    finished = pyqtSignal(bool, object)
+
+    def __init__(self, parallel=True, inference_interval=1, photos_dir=None):
+        super().__init__()
+        self.parallel = parallel
+        self.inference_interval = inference_interval
+        self.photos_dir = photos_dir
+
+    def run(self):
+        try:
+            self.finished.emit(True, run_calibration(parallel=self.parallel, inference_interval=self.inference_interval,
+                                                   photos_dir=self.photos_dir))
+        except Exception as e:
+            print(f"Calibration failed: {str(e)}")
+            print(traceback.format_exc())
+            self.finished.emit(False, str(e))
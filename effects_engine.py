@@ -0,0 +1,466 @@
+import queue
+import time
+import traceback
+import multiprocessing
+from collections import namedtuple
+from multiprocessing import shared_memory
+import numpy as np
+from profiler import handle_profile_request, PROFILE_START, PROFILE_STOP
+
+# Largest frame the engine accepts; smaller frames use the top-left corner of a slot
+MAX_FRAME_SHAPE = (1080, 1920, 3)
+
+# Number of frames that can be in flight at once
+RING_SLOTS = 4
+
+# How long to wait for the worker processes to load and warm up their models
+WORKER_START_TIMEOUT = 60.0
+
+# Landmark as sent back by the pose worker (same attribute names as MediaPipe's)
+Landmark = namedtuple('Landmark', ['x', 'y', 'z', 'visibility'])
+
+# Per-slot header: sequence number, frame height, frame width
+HEADER_FIELDS = 3
+HEADER_ALIGNMENT = 64
+
+
+class SharedFrameRing:
+    """
+    Fixed set of frame slots in one shared memory block.
+    Frame seq lives in slot seq % slots, and each slot's header records the sequence
+    number and frame size, so any process that attaches can read the frame as a
+    numpy view without pickling or copying it.
+    """
+
+    def __init__(self, max_shape, dtype=np.uint8, slots=RING_SLOTS, name=None):
+        self.max_shape = tuple(max_shape)
+        self.dtype = np.dtype(dtype)
+        self.slots = slots
+
+        header_bytes = slots * HEADER_FIELDS * 8
+        header_bytes += (-header_bytes) % HEADER_ALIGNMENT
+        slot_bytes = int(np.prod(self.max_shape)) * self.dtype.itemsize
+        create = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=header_bytes + slot_bytes * slots if create else 0)
+
+        self.headers = np.ndarray((slots, HEADER_FIELDS), dtype=np.int64, buffer=self.shm.buf)
+        self.frames = np.ndarray((slots,) + self.max_shape, dtype=self.dtype, buffer=self.shm.buf, offset=header_bytes)
+        if create:
+            self.headers[:, 0] = -1
+
+    def spec(self):
+        """Picklable description used to attach to the ring from another process."""
+        return (self.shm.name, self.max_shape, self.dtype.str, self.slots)
+
+    @classmethod
+    def attach(cls, spec):
+        name, max_shape, dtype, slots = spec
+        return cls(max_shape, dtype, slots, name=name)
+
+    def fits(self, shape):
+        return len(shape) == len(self.max_shape) and all(s <= m for s, m in zip(shape, self.max_shape))
+
+    def slot_for(self, seq):
+        return seq % self.slots
+
+    def write(self, seq, frame):
+        """Copy a frame into its slot and tag it with the sequence number."""
+        slot = self.slot_for(seq)
+        h, w = frame.shape[:2]
+        self.headers[slot, 0] = -1
+        self.frames[slot, :h, :w] = frame
+        self.headers[slot, 1] = h
+        self.headers[slot, 2] = w
+        self.headers[slot, 0] = seq
+
+    def view(self, seq):
+        """Return a view of frame seq, or None if its slot holds a different frame."""
+        slot = self.slot_for(seq)
+        if self.headers[slot, 0] != seq:
+            return None
+        h, w = self.headers[slot, 1], self.headers[slot, 2]
+        return self.frames[slot, :h, :w]
+
+    def close(self):
+        # Views into the buffer must be released before the shared memory can be closed
+        del self.headers
+        del self.frames
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+def _segmentation_worker(frame_spec, mask_spec, requests, results):
+    """Worker process: segment frames from the frame ring and write masks into the mask ring."""
+    try:
+        from photo_effects import BackgroundReplacementEffect
+        frame_ring = SharedFrameRing.attach(frame_spec)
+        mask_ring = SharedFrameRing.attach(mask_spec)
+        effect = BackgroundReplacementEffect()
+        effect.warm_up()
+        results.put(('ready', 'segmentation', None))
+    except Exception as e:
+        results.put(('error', 'segmentation', f"{str(e)}\n{traceback.format_exc()}"))
+        return
+
+    capture = None
+    while True:
+        seq = requests.get()
+        if seq is None:
+            break
+        if isinstance(seq, tuple):
+            capture = handle_profile_request(seq, 'segmentation', capture)
+            continue
+        frame = frame_ring.view(seq)
+        if frame is None:
+            results.put(('dropped', seq, None))
+            continue
+        mask_ring.write(seq, effect.get_person_mask(frame))
+        results.put(('mask', seq, None))
+
+    frame_ring.close()
+    mask_ring.close()
+
+
+def _pose_worker(frame_spec, requests, results):
+    """Worker process: detect poses in frames from the frame ring and send back the landmarks."""
+    try:
+        from photo_effects import create_pose_landmarker, detect_poses, WARM_UP_FRAME_SHAPE
+        frame_ring = SharedFrameRing.attach(frame_spec)
+        landmarker = create_pose_landmarker()
+        detect_poses(landmarker, np.zeros(WARM_UP_FRAME_SHAPE, dtype=np.uint8))
+        results.put(('ready', 'pose', None))
+    except Exception as e:
+        results.put(('error', 'pose', f"{str(e)}\n{traceback.format_exc()}"))
+        return
+
+    capture = None
+    while True:
+        seq = requests.get()
+        if seq is None:
+            break
+        if isinstance(seq, tuple):
+            capture = handle_profile_request(seq, 'pose', capture)
+            continue
+        frame = frame_ring.view(seq)
+        if frame is None:
+            results.put(('dropped', seq, None))
+            continue
+        poses = [
+            [(lm.x, lm.y, lm.z, lm.visibility) for lm in pose_landmarks]
+            for pose_landmarks in detect_poses(landmarker, frame)
+        ]
+        results.put(('poses', seq, poses))
+
+    frame_ring.close()
+
+
+class EngineResult:
+    """
+    Inference results for one submitted frame. frame and mask are views into shared memory.
+    timestamp is when the frame was submitted (time.perf_counter()), where it is known.
+    """
+
+    def __init__(self, seq, frame, mask, poses, timestamp=None):
+        self.seq = seq
+        self.frame = frame
+        self.mask = mask
+        self.poses = poses
+        self.timestamp = timestamp
+
+
+class EffectsEngine:
+    """
+    Runs segmentation and pose inference in separate worker processes.
+    The GUI process writes each frame once into a shared memory ring, the workers
+    read it in place, and only sequence numbers and landmark tuples cross the queues.
+    Result views stay valid until the next call to submit().
+    """
+
+    def __init__(self, max_frame_shape=MAX_FRAME_SHAPE, slots=RING_SLOTS):
+        self.context = multiprocessing.get_context('spawn')
+        self.frame_ring = SharedFrameRing(max_frame_shape, slots=slots)
+        self.mask_ring = SharedFrameRing(max_frame_shape[:2], dtype=np.uint8, slots=slots)
+        self.segmentation_requests = self.context.Queue()
+        self.pose_requests = self.context.Queue()
+        self.results = self.context.Queue()
+        self.workers = []
+        self.next_seq = 0
+        # seq -> {'expected': set of result kinds, 'mask': whether the mask was written, 'poses': list}
+        self.in_flight = {}
+        # Frame shapes already reported as too large for the rings
+        self.oversized_shapes = set()
+
+    def start(self, timeout=WORKER_START_TIMEOUT):
+        """Start the worker processes and wait until their models are warmed up."""
+        self.workers = [
+            self.context.Process(
+                target=_segmentation_worker,
+                args=(self.frame_ring.spec(), self.mask_ring.spec(), self.segmentation_requests, self.results),
+                name='effects-segmentation',
+                daemon=True
+            ),
+            self.context.Process(
+                target=_pose_worker,
+                args=(self.frame_ring.spec(), self.pose_requests, self.results),
+                name='effects-pose',
+                daemon=True
+            ),
+        ]
+        for worker in self.workers:
+            worker.start()
+
+        waiting = {'segmentation', 'pose'}
+        deadline = time.perf_counter() + timeout
+        while waiting:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                self.stop()
+                raise TimeoutError(f"Effects workers not ready: {', '.join(sorted(waiting))}")
+            kind, name, payload = self.results.get(timeout=remaining)
+            if kind == 'error':
+                self.stop()
+                raise RuntimeError(f"Effects {name} worker failed to start: {payload}")
+            if kind == 'ready':
+                waiting.discard(name)
+        print("Effects engine ready")
+        return self
+
+    def _slot_free(self, seq):
+        return (seq - self.frame_ring.slots) not in self.in_flight
+
+    def submit(self, frame, segmentation=True, pose=True):
+        """
+        Queue a frame for inference.
+        Returns its sequence number, or None if every slot is still in flight (the frame is dropped).
+        """
+        if not self.frame_ring.fits(frame.shape):
+            # Every preview frame would hit this, so report each size once
+            if frame.shape not in self.oversized_shapes:
+                self.oversized_shapes.add(frame.shape)
+                print(f"Frame {frame.shape} too large for effects engine ({self.frame_ring.max_shape}), "
+                      f"frames this size get no effects")
+            return None
+        seq = self.next_seq
+        if not self._slot_free(seq):
+            return None
+        self.next_seq += 1
+
+        expected = set()
+        if segmentation:
+            expected.add('mask')
+        if pose:
+            expected.add('poses')
+        self.in_flight[seq] = {'expected': expected, 'mask': False, 'poses': []}
+
+        self.frame_ring.write(seq, frame)
+        if segmentation:
+            self.segmentation_requests.put(seq)
+        if pose:
+            self.pose_requests.put(seq)
+        return seq
+
+    def _handle_result(self, kind, seq, payload):
+        entry = self.in_flight.get(seq)
+        if entry is None:
+            return
+        if kind == 'mask':
+            entry['mask'] = True
+        elif kind == 'poses':
+            entry['poses'] = [[Landmark(*lm) for lm in pose] for pose in payload]
+        elif kind == 'dropped':
+            # The slot was overwritten before the worker got to it
+            del self.in_flight[seq]
+            return
+        entry['expected'].discard(kind)
+
+    def poll(self, timeout=None):
+        """Handle queued worker results. Blocks up to timeout for the first one if timeout is given."""
+        try:
+            if timeout is not None:
+                self._handle_result(*self.results.get(timeout=timeout))
+            while True:
+                self._handle_result(*self.results.get_nowait())
+        except queue.Empty:
+            pass
+
+    def take_result(self, seq):
+        entry = self.in_flight.pop(seq)
+        frame = self.frame_ring.view(seq)
+        mask = self.mask_ring.view(seq) if entry['mask'] else None
+        return EngineResult(seq, frame, mask, entry['poses'])
+
+    def is_complete(self, seq):
+        return seq in self.in_flight and not self.in_flight[seq]['expected']
+
+    def take_completed(self):
+        """Remove and return every completed result, oldest first."""
+        complete = sorted(seq for seq in self.in_flight if self.is_complete(seq))
+        return [self.take_result(seq) for seq in complete]
+
+    def collect_latest(self):
+        """Return the newest completed result without blocking, discarding older completed ones."""
+        self.poll()
+        completed = self.take_completed()
+        return completed[-1] if completed else None
+
+    def process(self, frame, segmentation=True, pose=True, timeout=5.0):
+        """Run inference on one frame and wait for the result. Returns None on timeout."""
+        deadline = time.perf_counter() + timeout
+        seq = None
+        while seq is None:
+            seq = self.submit(frame, segmentation, pose)
+            if seq is None:
+                if not self.frame_ring.fits(frame.shape) or time.perf_counter() >= deadline:
+                    return None
+                # Wait for an in-flight frame to finish so its slot frees up
+                self.poll(timeout=0.05)
+                self.take_completed()
+
+        while not self.is_complete(seq):
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0 or seq not in self.in_flight:
+                self.in_flight.pop(seq, None)
+                return None
+            self.poll(timeout=remaining)
+        return self.take_result(seq)
+
+    def start_profiling(self, output_dir, prefix, duration):
+        """Profile the worker processes too (see profiler.ProfileCapture); each writes its own files."""
+        for requests in (self.segmentation_requests, self.pose_requests):
+            requests.put((PROFILE_START, output_dir, prefix, duration))
+
+    def stop_profiling(self):
+        for requests in (self.segmentation_requests, self.pose_requests):
+            requests.put((PROFILE_STOP,))
+
+    def stop(self):
+        """Stop the workers and release the shared memory."""
+        for requests in (self.segmentation_requests, self.pose_requests):
+            requests.put(None)
+        for worker in self.workers:
+            if worker.is_alive():
+                worker.join(timeout=2.0)
+            if worker.is_alive():
+                worker.terminate()
+        self.workers = []
+        for ring in (self.frame_ring, self.mask_ring):
+            try:
+                ring.close()
+                ring.unlink()
+            except Exception as e:
+                print(f"Error releasing shared memory: {str(e)}")
+
+
+class InferenceScheduler:
+    """
+    Shares one EffectsEngine between several booths in the same process.
+    Each booth keeps only its newest live frame waiting; waiting frames are submitted
+    round-robin across booths as engine slots free up, and results are routed back to
+    the booth that submitted them. MediaPipe runs one image per call, so booths are
+    batched by interleaving them through the engine's pipeline.
+    The engine is looked up from the startup orchestrator, so booths can be created
+    before it has finished loading.
+    """
+
+    def __init__(self, startup):
+        self.startup = startup
+        self.booth_ids = []
+        self.next_booth = 0
+        # booth_id -> (frame, request, timestamp) waiting to be submitted
+        self.waiting = {}
+        # seq -> (booth_id, frame, timestamp) submitted to the engine
+        self.submitted = {}
+        # booth_id -> newest routed EngineResult
+        self.latest = {}
+
+    @property
+    def engine(self):
+        return self.startup.get('engine')
+
+    def register(self, booth_id):
+        if booth_id not in self.booth_ids:
+            self.booth_ids.append(booth_id)
+
+    def submit(self, booth_id, frame, segmentation=True, pose=True):
+        """
+        Queue a live frame for a booth, replacing any frame of that booth still waiting.
+        The booth must not modify the frame afterwards; it comes back as the result's frame,
+        stamped with the time it was submitted here.
+        """
+        self.register(booth_id)
+        self.waiting[booth_id] = (frame, {'segmentation': segmentation, 'pose': pose}, time.perf_counter())
+        self.dispatch()
+
+    def dispatch(self):
+        """Submit waiting frames round-robin across booths until the engine is full."""
+        engine = self.engine
+        if engine is None or not self.booth_ids:
+            return
+        for _ in range(len(self.booth_ids)):
+            booth_id = self.booth_ids[self.next_booth % len(self.booth_ids)]
+            if booth_id in self.waiting:
+                frame, request, timestamp = self.waiting[booth_id]
+                seq = engine.submit(frame, **request)
+                if seq is None:
+                    return
+                del self.waiting[booth_id]
+                self.submitted[seq] = (booth_id, frame, timestamp)
+            self.next_booth += 1
+
+    def _route(self, results):
+        for result in results:
+            booth_id, frame, timestamp = self.submitted.pop(result.seq, (None, None, None))
+            if booth_id is None:
+                continue
+            # The engine's mask view is reused by later frames, so keep a copy.
+            # The frame is the booth's own submitted array, so no copy is needed.
+            mask = result.mask.copy() if result.mask is not None else None
+            self.latest[booth_id] = EngineResult(result.seq, frame, mask, result.poses, timestamp)
+
+    def _forget_dropped(self):
+        # Frames the engine dropped never produce a result
+        engine = self.engine
+        for seq in [seq for seq in self.submitted if seq not in engine.in_flight]:
+            del self.submitted[seq]
+
+    def collect_latest(self, booth_id):
+        """Return the newest finished live result for a booth without blocking, or None."""
+        engine = self.engine
+        if engine is None:
+            return None
+        engine.poll()
+        self._route(engine.take_completed())
+        self._forget_dropped()
+        self.dispatch()
+        return self.latest.pop(booth_id, None)
+
+    def process(self, booth_id, frame, segmentation=True, pose=True, timeout=5.0):
+        """Run inference on one frame for a booth and wait for it, routing other booths' results meanwhile."""
+        engine = self.engine
+        if engine is None:
+            return None
+        self.register(booth_id)
+        timestamp = time.perf_counter()
+        deadline = timestamp + timeout
+
+        seq = engine.submit(frame, segmentation, pose)
+        while seq is None:
+            if time.perf_counter() >= deadline or not engine.frame_ring.fits(frame.shape):
+                return None
+            engine.poll(timeout=0.05)
+            self._route(engine.take_completed())
+            seq = engine.submit(frame, segmentation, pose)
+
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0 or seq not in engine.in_flight:
+                engine.in_flight.pop(seq, None)
+                return None
+            engine.poll(timeout=remaining)
+            if engine.is_complete(seq):
+                result = engine.take_result(seq)
+                mask = result.mask.copy() if result.mask is not None else None
+                self._route(engine.take_completed())
+                return EngineResult(seq, frame, mask, result.poses, timestamp)
@@ -0,0 +1,122 @@
+import os
+import time
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+
+# Quality of archived JPEG strips (OpenCV's default is 95)
+ARCHIVE_JPEG_QUALITY = 95
+
+# Extra lossless copies to archive next to each JPEG: 'png' and/or 'webp'
+ARCHIVE_EXTRA_FORMATS = ()
+
+# PNG compression level, 0-9 (higher is smaller but slower)
+PNG_COMPRESSION = 3
+
+ENCODER_WORKERS = 2
+
+def encode_params(image_format, jpeg_quality=ARCHIVE_JPEG_QUALITY):
+    """OpenCV extension and encode parameters for an archive format."""
+    if image_format == 'jpg':
+        return '.jpg', [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality]
+    if image_format == 'png':
+        return '.png', [cv2.IMWRITE_PNG_COMPRESSION, PNG_COMPRESSION]
+    if image_format == 'webp':
+        # A WebP quality above 100 selects lossless compression
+        return '.webp', [cv2.IMWRITE_WEBP_QUALITY, 101]
+    raise ValueError(f"Unsupported archive format: {image_format}")
+
+def write_file_atomic(path, data):
+    """
+    Write data so that path holds either the old contents or all of the new ones, even
+    after a crash or power loss: write a temporary file, fsync it, then rename it over path.
+    """
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    # Make the rename itself durable (directories can't be opened on Windows)
+    if os.name != 'nt':
+        dir_fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+class EncodeResult:
+    def __init__(self, path, image_format):
+        self.path = path
+        self.format = image_format
+        self.success = False
+        self.bytes = 0
+        self.encode_time = 0.0
+        self.write_time = 0.0
+        self.error = None
+
+class EncoderPool:
+    """
+    Encodes and writes archival copies of strips on a thread pool, so encoding and slow
+    or full disks never hold up the GUI thread. Failures are reported, never raised.
+    """
+
+    def __init__(self, max_workers=ENCODER_WORKERS, jpeg_quality=ARCHIVE_JPEG_QUALITY,
+                 extra_formats=ARCHIVE_EXTRA_FORMATS):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='encoder')
+        self.jpeg_quality = jpeg_quality
+        self.extra_formats = tuple(extra_formats)
+        self.lock = threading.Lock()
+        self.totals = {'files': 0, 'failures': 0, 'bytes': 0, 'encode_time': 0.0, 'write_time': 0.0}
+
+    def submit(self, image, path):
+        """
+        Archive an image at path (a .jpg), plus any extra lossless formats next to it.
+        The image must not be modified until every returned future is done.
+        Returns the futures of each format's EncodeResult, the JPEG's first.
+        """
+        base_path = os.path.splitext(path)[0]
+        futures = [self.executor.submit(self._encode, image, base_path, 'jpg')]
+        for image_format in self.extra_formats:
+            futures.append(self.executor.submit(self._encode, image, base_path, image_format))
+        return futures
+
+    def _encode(self, image, base_path, image_format):
+        extension, params = encode_params(image_format, self.jpeg_quality)
+        result = EncodeResult(base_path + extension, image_format)
+        try:
+            start = time.perf_counter()
+            ok, encoded = cv2.imencode(extension, image, params)
+            if not ok:
+                raise Exception(f"Could not encode {extension}")
+            result.encode_time = time.perf_counter() - start
+            result.bytes = encoded.nbytes
+
+            start = time.perf_counter()
+            write_file_atomic(result.path, encoded.tobytes())
+            result.write_time = time.perf_counter() - start
+            result.success = True
+            print(f"Archived {result.path}: {result.bytes / 1024:.0f} KB, "
+                  f"encode {result.encode_time * 1000:.0f} ms, write {result.write_time * 1000:.0f} ms")
+        except Exception as e:
+            # e.g. a full SD card: report it and carry on
+            result.error = e
+            print(f"Error archiving {result.path}: {str(e)}")
+            print(traceback.format_exc())
+
+        with self.lock:
+            self.totals['files'] += 1
+            self.totals['failures'] += 0 if result.success else 1
+            self.totals['bytes'] += result.bytes
+            self.totals['encode_time'] += result.encode_time
+            self.totals['write_time'] += result.write_time
+        return result
+
+    def stats(self):
+        """Totals over every encode so far."""
+        with self.lock:
+            return dict(self.totals)
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,47 @@
+import os
+import sys
+import urllib.request
+from calibration import POSE_MODELS, SEGMENTATION_MODELS, pose_model_path, segmentation_model_path
+
+# MediaPipe's published model files
+MODEL_BASE_URL = 'https://storage.googleapis.com/mediapipe-models'
+
+def model_downloads():
+    """(local path, URL) of every model the booth can use."""
+    downloads = []
+    for variant in POSE_MODELS:
+        name = f'pose_landmarker_{variant}'
+        downloads.append((pose_model_path(variant), f'{MODEL_BASE_URL}/pose_landmarker/{name}/float16/latest/{name}.task'))
+    for model_selection in SEGMENTATION_MODELS:
+        path = segmentation_model_path(model_selection)
+        name = os.path.splitext(os.path.basename(path))[0]
+        downloads.append((path, f'{MODEL_BASE_URL}/image_segmenter/{name}/float16/latest/{name}.tflite'))
+    return downloads
+
+def fetch_model(path, url):
+    print(f"Downloading {url}")
+    with urllib.request.urlopen(url, timeout=60) as response:
+        data = response.read()
+    # Never leave a truncated model where the booth would load it
+    with open(path + '.tmp', 'wb') as f:
+        f.write(data)
+    os.replace(path + '.tmp', path)
+    print(f"Saved {path} ({len(data) / (1024 * 1024):.1f} MB)")
+
+def main():
+    """Download the model files that aren't here yet (all of them again with --force)."""
+    force = '--force' in sys.argv
+    failures = 0
+    for path, url in model_downloads():
+        if os.path.exists(path) and not force:
+            print(f"{path} already present")
+            continue
+        try:
+            fetch_model(path, url)
+        except Exception as e:
+            failures += 1
+            print(f"Error downloading {path}: {str(e)}")
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,56 @@
+import math
+import numpy as np
+
+# One Euro filter settings for normalized landmark coordinates. Lower min_cutoff smooths
+# more when still; higher beta follows fast movement with less lag.
+FILTER_MIN_CUTOFF = 1.0
+FILTER_BETA = 10.0
+FILTER_DERIVATIVE_CUTOFF = 1.0
+# Predictions extrapolate the filtered velocity at most this far (seconds), then hold
+MAX_PREDICTION_TIME = 0.2
+
+def smoothing_factor(cutoff, dt):
+    tau = 1.0 / (2 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+class OneEuroFilter:
+    """
+    One Euro filter (Casiez et al.) over an array of values, e.g. every landmark of a
+    person at once: an exponential smoother whose cutoff rises with speed, so still
+    landmarks stop jittering while moving ones don't lag. It also keeps a filtered
+    velocity, used to predict positions for frames that skipped inference.
+    """
+
+    def __init__(self, min_cutoff=FILTER_MIN_CUTOFF, beta=FILTER_BETA, derivative_cutoff=FILTER_DERIVATIVE_CUTOFF,
+                 max_prediction=MAX_PREDICTION_TIME):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.derivative_cutoff = derivative_cutoff
+        self.max_prediction = max_prediction
+        self.value = None
+        self.velocity = None
+        self.timestamp = None
+
+    def filter(self, value, timestamp):
+        """Add a measurement taken at timestamp (seconds) and return the filtered value."""
+        if self.value is None or value.shape != self.value.shape:
+            self.value = value.astype(np.float32)
+            self.velocity = np.zeros_like(self.value)
+            self.timestamp = timestamp
+            return self.value
+
+        dt = max(timestamp - self.timestamp, 1e-3)
+        velocity = (value - self.value) / dt
+        self.velocity += smoothing_factor(self.derivative_cutoff, dt) * (velocity - self.velocity)
+
+        cutoff = self.min_cutoff + self.beta * np.abs(self.velocity)
+        tau = 1.0 / (2 * math.pi * cutoff)
+        alpha = 1.0 / (1.0 + tau / dt)
+        self.value = self.value + alpha * (value - self.value)
+        self.timestamp = timestamp
+        return self.value
+
+    def predict(self, timestamp):
+        """Extrapolate the filtered value to timestamp without a new measurement."""
+        dt = min(max(timestamp - self.timestamp, 0.0), self.max_prediction)
+        return self.value + self.velocity * dt
@@ -0,0 +1,118 @@
+import cv2
+import numpy as np
+
+OVERLAY_FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+# Overlay sizes below are in pixels of a preview this tall, and scale with the real one
+OVERLAY_REFERENCE_HEIGHT = 720
+
+# Rendered tiles kept before the cache is emptied (the idle banner text changes as wait estimates tick down)
+OVERLAY_CACHE_SIZE = 64
+
+# Darkening behind the idle banner (0-255)
+BANNER_BOX_ALPHA = 128
+BANNER_PADDING = 20
+
+# Flash brightness: the frame is blended with white at this weight
+FLASH_WEIGHT = 0.7
+
+class OverlayTile:
+    """
+    White text, optionally on a translucent box, as a premultiplied BGRA tile.
+    origin is where the text baseline starts inside the tile, as cv2.putText expects.
+    """
+
+    def __init__(self, image, origin):
+        self.image = image
+        self.origin = origin
+        # Split once here so blending is just a multiply and an add
+        self.color = np.ascontiguousarray(image[:, :, :3])
+        self.inverse_alpha = cv2.merge([255 - image[:, :, 3]] * 3)
+
+    @property
+    def size(self):
+        return self.image.shape[1], self.image.shape[0]
+
+def render_text_tile(text, font_scale, thickness, padding=None, box_alpha=0):
+    """Render text once into a tile, antialiased against transparency rather than a particular frame."""
+    (text_width, text_height), baseline = cv2.getTextSize(text, OVERLAY_FONT, font_scale, thickness)
+    if padding is None:
+        padding = thickness
+    origin = (padding, padding + text_height)
+    coverage = np.zeros((text_height + baseline + 2 * padding, text_width + 2 * padding), dtype=np.uint8)
+    cv2.putText(coverage, text, origin, OVERLAY_FONT, font_scale, 255, thickness, cv2.LINE_AA)
+
+    tile = np.empty((*coverage.shape, 4), dtype=np.uint8)
+    # White premultiplied by coverage is the coverage itself
+    tile[:, :, :3] = coverage[:, :, None]
+    tile[:, :, 3] = box_alpha + coverage.astype(np.uint16) * (255 - box_alpha) // 255
+    return OverlayTile(tile, origin)
+
+def blend_tile(frame, tile, x, y):
+    """Blend a tile into the frame in place with its text origin at (x, y), touching only the tile's region."""
+    width, height = tile.size
+    left, top = x - tile.origin[0], y - tile.origin[1]
+    x0, y0 = max(left, 0), max(top, 0)
+    x1, y1 = min(left + width, frame.shape[1]), min(top + height, frame.shape[0])
+    if x0 >= x1 or y0 >= y1:
+        return frame
+    rows = slice(y0 - top, y1 - top)
+    cols = slice(x0 - left, x1 - left)
+    roi = frame[y0:y1, x0:x1]
+    roi[:] = cv2.add(cv2.multiply(roi, tile.inverse_alpha[rows, cols], scale=1 / 255), tile.color[rows, cols])
+    return frame
+
+class OverlayLayer:
+    """
+    Countdown, photo counter and idle banner for the live preview. Each text is rendered
+    once per preview size and then blended into just its own region of the frame, so
+    the overlays cost the same at any camera resolution.
+    """
+
+    def __init__(self):
+        self.tiles = {}
+        self.frame_height = None
+
+    def _scale(self, frame):
+        height = frame.shape[0]
+        if height != self.frame_height:
+            # Tiles are sized for the preview, so a new resolution needs new ones
+            self.tiles.clear()
+            self.frame_height = height
+        return height / OVERLAY_REFERENCE_HEIGHT
+
+    def _tile(self, key, text, font_scale, thickness, **kwargs):
+        tile = self.tiles.get(key)
+        if tile is None:
+            if len(self.tiles) >= OVERLAY_CACHE_SIZE:
+                self.tiles.clear()
+            tile = self.tiles[key] = render_text_tile(text, font_scale, max(1, round(thickness)), **kwargs)
+        return tile
+
+    def draw_countdown(self, frame, count, photo_label):
+        """The countdown digit in the center and the photo counter (e.g. '2/4') in the top-right corner."""
+        scale = self._scale(frame)
+        height, width = frame.shape[:2]
+        counter = self._tile(('counter', photo_label), photo_label, 2 * scale, 3 * scale)
+        blend_tile(frame, counter, width - round(180 * scale), round(80 * scale))
+        digit = self._tile(('countdown', count), str(count), 5 * scale, 8 * scale)
+        # Center the digit itself rather than its baseline origin
+        digit_width, digit_height = digit.size
+        blend_tile(frame, digit, (width - digit_width) // 2 + digit.origin[0],
+                   (height - digit_height) // 2 + digit.origin[1])
+        return frame
+
+    def draw_banner(self, frame, text):
+        """Text centered on a translucent dark box."""
+        scale = self._scale(frame)
+        height, width = frame.shape[:2]
+        banner = self._tile(('banner', text), text, 1.5 * scale, 3 * scale,
+                            padding=round(BANNER_PADDING * scale), box_alpha=BANNER_BOX_ALPHA)
+        banner_width, banner_height = banner.size
+        blend_tile(frame, banner, (width - banner_width) // 2 + banner.origin[0],
+                   (height - banner_height) // 2 + banner.origin[1])
+        return frame
+
+    def draw_flash(self, frame):
+        """Wash the frame out towards white, in place."""
+        return cv2.convertScaleAbs(frame, frame, alpha=1 - FLASH_WEIGHT, beta=255 * FLASH_WEIGHT)
@@ -2,38 +2,131 @@ import cv2
 import mediapipe as mp
 import numpy as np
 from abc import ABC, abstractmethod
+import os
 import math
+import time
 from mediapipe.tasks import python
 from mediapipe.tasks.python import vision
+from booth_config import get_config
+from asset_bundle import get_asset_bundle, premultiply_alpha, build_mipmaps, select_mip_level
+from calibration import get_model_settings, pose_model_path, segmentation_model_path, SEGMENTATION_MODELS
 
-# Effect configuration
-EFFECT_CONFIG = {
-    'mustache_enabled': True,
-    'bolo_tie_enabled': True,
-    'cowboy_hat_enabled': True,
-    'background_enabled': True
-}
+# Shape of the dummy frame used to warm up models (matches the webcam resolution)
+WARM_UP_FRAME_SHAPE = (720, 1280, 3)
+
+# Person confidence (0-255) below which a pixel is all background, and above which it is
+# all person; pixels in between are blended to soften the mask edge
+MASK_BACKGROUND_LEVEL = 20
+MASK_PERSON_LEVEL = 60
+
+def build_mask_lut(low=MASK_BACKGROUND_LEVEL, high=MASK_PERSON_LEVEL):
+    """Lookup table mapping a uint8 person confidence to a uint8 blend weight."""
+    levels = np.arange(256, dtype=np.float32)
+    return np.clip((levels - low) * 255.0 / (high - low), 0, 255).astype(np.uint8)
+
+def to_mp_image(frame):
+    """
+    Convert a BGR frame to a MediaPipe image once, so the pose and segmentation
+    stages can share it instead of each converting the frame.
+    """
+    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    return mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
+
+def create_pose_landmarker(model_variant=None):
+    """
+    Create the MediaPipe pose landmarker used by the body effects.
+    model_variant is 'lite', 'full' or 'heavy'; by default the one calibrated for this machine.
+    """
+    if model_variant is None:
+        model_variant = get_model_settings()['pose_model']
+    model_path = pose_model_path(model_variant)
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"Pose model {model_path} not found; run 'python fetch_models.py' to download the models")
+
+    BaseOptions = mp.tasks.BaseOptions
+    PoseLandmarker = mp.tasks.vision.PoseLandmarker
+    PoseLandmarkerOptions = mp.tasks.vision.PoseLandmarkerOptions
+    VisionRunningMode = mp.tasks.vision.RunningMode
+    options = PoseLandmarkerOptions(
+        base_options=BaseOptions(model_asset_path=model_path),
+        running_mode=VisionRunningMode.IMAGE,
+        num_poses=10)
+
+    return PoseLandmarker.create_from_options(options)
+
+def detect_poses(landmarker, frame, mp_image=None):
+    """
+    Run pose detection on a BGR frame and return the list of per-person landmark lists.
+    Pass mp_image (from to_mp_image) to reuse a conversion shared with segmentation.
+    """
+    if mp_image is None:
+        mp_image = to_mp_image(frame)
+    results = landmarker.detect(mp_image)
+    return results.pose_landmarks
+
+def create_image_segmenter(model_selection=None):
+    """
+    Create the MediaPipe person segmenter used for background replacement.
+    model_selection 0 is the general model, 1 the faster landscape model; by default
+    the one calibrated for this machine. The segmenter runs in video mode, so frames
+    must be passed with increasing timestamps (see BackgroundReplacementEffect).
+    """
+    if model_selection is None:
+        model_selection = get_model_settings()['segmentation_model']
+    model_path = segmentation_model_path(model_selection)
+    if not os.path.exists(model_path):
+        # Any segmentation model beats failing to start
+        available = [m for m in SEGMENTATION_MODELS if os.path.exists(segmentation_model_path(m))]
+        if not available:
+            raise FileNotFoundError(
+                f"Segmentation model {model_path} not found; run 'python fetch_models.py' to download the models")
+        print(f"Segmentation model {model_path} not found, using {segmentation_model_path(available[0])}")
+        model_path = segmentation_model_path(available[0])
+
+    BaseOptions = mp.tasks.BaseOptions
+    ImageSegmenter = mp.tasks.vision.ImageSegmenter
+    ImageSegmenterOptions = mp.tasks.vision.ImageSegmenterOptions
+    VisionRunningMode = mp.tasks.vision.RunningMode
+    options = ImageSegmenterOptions(
+        base_options=BaseOptions(model_asset_path=model_path),
+        running_mode=VisionRunningMode.VIDEO,
+        output_confidence_masks=True,
+        output_category_mask=False)
+
+    return ImageSegmenter.create_from_options(options)
 
 class BodyEffect(ABC):
-    def __init__(self):
-        model_path = './pose_landmarker_lite.task'
-
-        BaseOptions = mp.tasks.BaseOptions
-        PoseLandmarker = mp.tasks.vision.PoseLandmarker
-        PoseLandmarkerOptions = mp.tasks.vision.PoseLandmarkerOptions
-        VisionRunningMode = mp.tasks.vision.RunningMode
-        options = PoseLandmarkerOptions(
-            base_options=BaseOptions(model_asset_path=model_path),
-            running_mode=VisionRunningMode.IMAGE,
-            num_poses=10)
-
-        self.landmarker = PoseLandmarker.create_from_options(options)
+    # Sprite name in the asset bundle (and <name>.png on disk). Set by subclasses.
+    sprite_name = None
+
+    def __init__(self, load_model=True):
+        # Without a model the effect can only composite poses detected elsewhere (see effects_engine)
+        self.landmarker = create_pose_landmarker() if load_model else None
         self.effect_image = None
+        self.effect_mipmaps = None
         self.load_effect_image()
 
-    @abstractmethod
+    def warm_up(self, frame_shape=WARM_UP_FRAME_SHAPE):
+        """Run one inference on a dummy frame so the first real photo doesn't pay first-call latency."""
+        if self.landmarker is None:
+            return
+        detect_poses(self.landmarker, np.zeros(frame_shape, dtype=np.uint8))
+
     def load_effect_image(self):
-        """Load the effect image. Should be implemented by subclasses."""
+        """Load the premultiplied sprite mipmaps, from the asset bundle if it has been built."""
+        bundle = get_asset_bundle()
+        if bundle is not None and bundle.has_sprite(self.sprite_name):
+            self.effect_mipmaps = bundle.sprite_levels(self.sprite_name)
+        else:
+            image = cv2.imread(f'{self.sprite_name}.png', cv2.IMREAD_UNCHANGED)
+            if image is None:
+                image = self.create_fallback_image()
+            self.effect_mipmaps = build_mipmaps(premultiply_alpha(image))
+        self.effect_image = self.effect_mipmaps[0]
+
+    @abstractmethod
+    def create_fallback_image(self):
+        """Draw a simple BGRA sprite if no image is available. Should be implemented by subclasses."""
         pass
 
     @abstractmethod
@@ -50,53 +143,95 @@ class BodyEffect(ABC):
         """Overlay the effect image on the frame at the specified position."""
         if width <= 0 or height <= 0:
             return frame
+        return self.blend_sprite(frame, x, y, self.render_sprite(width, height, angle))
 
-        resized_effect = cv2.resize(self.effect_image, (width, height), interpolation=cv2.INTER_AREA)
-        rot_mat = cv2.getRotationMatrix2D((width // 2, height // 2), angle, 1.0)
-        rotated_effect = cv2.warpAffine(resized_effect, rot_mat, (width, height), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT, borderValue=(0,0,0,0))
-        alpha = rotated_effect[:, :, 3] / 255.0
-        
-        for c in range(3):
-            frame[y:y + height, x:x + width, c] = \
-                frame[y:y + height, x:x + width, c] * (1 - alpha) + \
-                rotated_effect[:, :, c] * alpha
+    def render_sprite(self, width, height, angle=0):
+        """The sprite scaled (and rotated) to a placement, as (color, inverse alpha) ready to blend."""
+        # Resize from the nearest mipmap level rather than the full-size sprite
+        source = select_mip_level(self.effect_mipmaps, width, height)
+        resized_effect = cv2.resize(source, (width, height), interpolation=cv2.INTER_AREA)
+        if angle:
+            rot_mat = cv2.getRotationMatrix2D((width // 2, height // 2), angle, 1.0)
+            resized_effect = cv2.warpAffine(resized_effect, rot_mat, (width, height), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT, borderValue=(0,0,0,0))
+        return resized_effect[:, :, :3], 1 - resized_effect[:, :, 3:4] / 255.0
+
+    def blend_sprite(self, frame, x, y, sprite):
+        color, inverse_alpha = sprite
+        height, width = color.shape[:2]
+        # The sprite is premultiplied, so its color channels are added as-is
+        roi = frame[y:y + height, x:x + width]
+        roi[:] = roi * inverse_alpha + color
         return frame
 
+    def detect(self, frame, mp_image=None):
+        """Detect poses in a BGR frame with this effect's model."""
+        return detect_poses(self.landmarker, frame, mp_image)
+
     def apply_effect(self, frame):
         """Apply the effect to detected pose in the frame."""
         if not self.is_enabled():
             return frame
-            
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        # Convert the frame received from OpenCV to a MediaPipe’s Image object.
-        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
-        results = self.landmarker.detect(mp_image)
-        pose_landmarks_list = results.pose_landmarks
+        return self.apply_with_poses(frame, self.detect(frame))
+
+    def apply_with_poses(self, frame, pose_landmarks_list):
+        """Apply the effect using poses that have already been detected."""
+        if not self.is_enabled():
+            return frame
 
         # Loop through the detected poses to visualize.
         for idx in range(len(pose_landmarks_list)):
-            pose_landmarks = pose_landmarks_list[idx]
-
-            h, w, _ = frame.shape
-            x, y, width, height, angle = self.get_effect_position(pose_landmarks, (h, w))
-            
-            # Ensure coordinates are within frame bounds
-            x = max(0, min(x, w - width))
-            y = max(0, min(y, h - height))
-            
-            frame = self.overlay_effect(frame, x, y, width, height, angle)
+            placement = self.place(pose_landmarks_list[idx], frame.shape[:2])
+            frame = self.overlay_effect(frame, *placement)
         return frame
 
+    def apply_with_people(self, frame, people):
+        """
+        Apply the effect to people tracked by a PoseTracker, reusing each person's cached
+        placement until they move far enough for the tracker to clear it, and the sprite
+        scaled to that placement for as long as its size stays the same.
+        """
+        if not self.is_enabled():
+            return frame
+
+        for person in people:
+            if not person.wants(self.sprite_name):
+                continue
+            placement = person.placements.get(self.sprite_name)
+            if placement is None:
+                placement = self.place(person.landmarks, frame.shape[:2])
+                person.placements[self.sprite_name] = placement
+            x, y, width, height, angle = placement
+            if width <= 0 or height <= 0:
+                continue
+            size = (width, height, angle)
+            cached = person.state.get(('sprite', self.sprite_name))
+            if cached is None or cached[0] != size:
+                cached = (size, self.render_sprite(width, height, angle))
+                person.state[('sprite', self.sprite_name)] = cached
+            frame = self.blend_sprite(frame, x, y, cached[1])
+        return frame
+
+    def place(self, pose_landmarks, frame_shape):
+        """Sprite position and size for one pose, kept within the frame: (x, y, width, height, angle)."""
+        h, w = frame_shape
+        x, y, width, height, angle = self.get_effect_position(pose_landmarks, (h, w))
+
+        # Ensure coordinates are within frame bounds
+        x = max(0, min(x, w - width))
+        y = max(0, min(y, h - height))
+        return x, y, width, height, angle
+
 class MustacheEffect(BodyEffect):
+    sprite_name = 'mustache'
+
     def is_enabled(self):
-        return EFFECT_CONFIG['mustache_enabled']
+        return get_config().effects.mustache
 
-    def load_effect_image(self):
-        self.effect_image = cv2.imread('mustache.png', cv2.IMREAD_UNCHANGED)
-        if self.effect_image is None:
-            # Create a simple mustache if image not found
-            self.effect_image = np.zeros((50, 100, 4), dtype=np.uint8)
-            cv2.ellipse(self.effect_image, (50, 25), (40, 20), 0, 0, 180, (0, 0, 0, 255), -1)
+    def create_fallback_image(self):
+        # Create a simple mustache if image not found
+        image = np.zeros((50, 100, 4), dtype=np.uint8)
+        cv2.ellipse(image, (50, 25), (40, 20), 0, 0, 180, (0, 0, 0, 255), -1)
+        return image
 
     def get_effect_position(self, pose_landmarks, frame_shape):
         h, w = frame_shape
@@ -130,16 +265,17 @@ class MustacheEffect(BodyEffect):
         return x, y, width, height, angle
 
 class BoloTieEffect(BodyEffect):
+    sprite_name = 'bolo_tie'
+
     def is_enabled(self):
-        return EFFECT_CONFIG['bolo_tie_enabled']
+        return get_config().effects.bolo_tie
 
-    def load_effect_image(self):
-        self.effect_image = cv2.imread('bolo_tie.png', cv2.IMREAD_UNCHANGED)
-        if self.effect_image is None:
-            # Create a simple bolo tie if image not found
-            self.effect_image = np.zeros((100, 50, 4), dtype=np.uint8)
-            cv2.rectangle(self.effect_image, (20, 0), (30, 100), (0, 0, 0, 255), -1)
-            cv2.circle(self.effect_image, (25, 50), 15, (0, 0, 0, 255), -1)
+    def create_fallback_image(self):
+        # Create a simple bolo tie if image not found
+        image = np.zeros((100, 50, 4), dtype=np.uint8)
+        cv2.rectangle(image, (20, 0), (30, 100), (0, 0, 0, 255), -1)
+        cv2.circle(image, (25, 50), 15, (0, 0, 0, 255), -1)
+        return image
 
     def get_effect_position(self, pose_landmarks, frame_shape):
         h, w = frame_shape
@@ -170,16 +306,17 @@ class BoloTieEffect(BodyEffect):
         return x, y, width, height, angle
 
 class CowboyHatEffect(BodyEffect):
+    sprite_name = 'cowboy_hat'
+
     def is_enabled(self):
-        return EFFECT_CONFIG['cowboy_hat_enabled']
+        return get_config().effects.cowboy_hat
 
-    def load_effect_image(self):
-        self.effect_image = cv2.imread('cowboy_hat.png', cv2.IMREAD_UNCHANGED)
-        if self.effect_image is None:
-            # Create a simple cowboy hat if image not found
-            self.effect_image = np.zeros((100, 150, 4), dtype=np.uint8)
-            cv2.ellipse(self.effect_image, (75, 50), (60, 30), 0, 0, 180, (0, 0, 0, 255), -1)
-            cv2.rectangle(self.effect_image, (50, 50), (100, 100), (0, 0, 0, 255), -1)
+    def create_fallback_image(self):
+        # Create a simple cowboy hat if image not found
+        image = np.zeros((100, 150, 4), dtype=np.uint8)
+        cv2.ellipse(image, (75, 50), (60, 30), 0, 0, 180, (0, 0, 0, 255), -1)
+        cv2.rectangle(image, (50, 50), (100, 100), (0, 0, 0, 255), -1)
+        return image
 
     def get_effect_position(self, pose_landmarks, frame_shape):
         h, w = frame_shape
@@ -220,43 +357,86 @@ class CowboyHatEffect(BodyEffect):
         return x, y, width, height, angle
 
 class BackgroundReplacementEffect:
-    def __init__(self):
-        # Initialize MediaPipe Selfie Segmentation
-        self.mp_selfie_segmentation = mp.solutions.selfie_segmentation
-        self.selfie_segmentation = self.mp_selfie_segmentation.SelfieSegmentation(model_selection=1)
+    def __init__(self, load_model=True, model_selection=None):
+        # Without a model the effect can only composite masks computed elsewhere (see effects_engine)
+        self.segmenter = create_image_segmenter(model_selection) if load_model else None
+        # Video mode needs strictly increasing timestamps
+        self.last_timestamp_ms = -1
+        self.mask_lut = build_mask_lut()
         self.background_image = None
+        # Backgrounds already scaled to a frame size, keyed by (width, height)
+        self.scaled_backgrounds = {}
         self.load_effect_image()
 
     def is_enabled(self):
-        return EFFECT_CONFIG['background_enabled']
+        return get_config().effects.background
 
     def load_effect_image(self):
-        """Load the background image."""
+        """Load the background image, using the pre-scaled copies from the asset bundle if it has been built."""
+        bundle = get_asset_bundle()
+        if bundle is not None and bundle.has_background('background'):
+            self.scaled_backgrounds = bundle.backgrounds('background')
+            # Rescale from the largest copy for resolutions that weren't pre-scaled
+            self.background_image = max(self.scaled_backgrounds.values(), key=lambda image: image.shape[0] * image.shape[1])
+            return
+
         self.background_image = cv2.imread('background.png')
         if self.background_image is None:
             raise FileNotFoundError("background.png not found. Please ensure the file exists.")
 
+    def get_background(self, width, height):
+        """Return the background scaled to width x height, scaling it only once per size."""
+        background = self.scaled_backgrounds.get((width, height))
+        if background is None:
+            background = cv2.resize(self.background_image, (width, height))
+            self.scaled_backgrounds[(width, height)] = background
+        return background
+
+    def warm_up(self, frame_shape=WARM_UP_FRAME_SHAPE):
+        """Run one segmentation pass on a dummy frame so the first real photo doesn't pay first-call latency."""
+        if self.segmenter is not None:
+            self.get_person_mask(np.zeros(frame_shape, dtype=np.uint8))
+        self.get_background(frame_shape[1], frame_shape[0])
+
+    def get_person_mask(self, frame, mp_image=None):
+        """
+        Segment a BGR frame and return a uint8 mask of person confidence (0-255).
+        Pass mp_image (from to_mp_image) to reuse a conversion shared with pose detection.
+        """
+        if mp_image is None:
+            mp_image = to_mp_image(frame)
+        timestamp_ms = max(int(time.monotonic() * 1000), self.last_timestamp_ms + 1)
+        self.last_timestamp_ms = timestamp_ms
+        results = self.segmenter.segment_for_video(mp_image, timestamp_ms)
+
+        # The last confidence mask is the person category
+        confidence = results.confidence_masks[-1].numpy_view()
+        return cv2.convertScaleAbs(confidence, alpha=255)
+
     def apply_effect(self, frame):
         """Replace the background with the loaded background image."""
         if not self.is_enabled():
             return frame
-            
-        # Convert frame to RGB for processing
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
-        # Get segmentation results
-        results = self.selfie_segmentation.process(rgb_frame)
-        
-        # Create a mask from the segmentation results
-        mask = results.segmentation_mask > 0.1
-        
-        # Resize background to match frame size
-        background = cv2.resize(self.background_image, (frame.shape[1], frame.shape[0]))
-        
-        # Create a 3-channel mask
-        mask_3d = np.stack([mask] * 3, axis=-1)
-        
-        # Combine the frame and background using the mask
-        output = np.where(mask_3d, frame, background)
-        
-        return output.astype(np.uint8) 
\ No newline at end of file
+        return self.apply_with_mask(frame, self.get_person_mask(frame))
+
+    def apply_with_mask(self, frame, mask):
+        """
+        Replace the background using a person mask that has already been computed:
+        a uint8 confidence mask, or a boolean mask from older session archives.
+        """
+        if not self.is_enabled():
+            return frame
+
+        # Background scaled to match frame size
+        background = self.get_background(frame.shape[1], frame.shape[0])
+
+        if mask.dtype == np.bool_:
+            mask_3d = np.stack([mask] * 3, axis=-1)
+            return np.where(mask_3d, frame, background).astype(np.uint8)
+
+        # Map confidence to blend weight, then blend: background + (frame - background) * weight
+        weight = cv2.LUT(mask, self.mask_lut)
+        weight = cv2.merge([weight, weight, weight])
+        person = cv2.multiply(frame, weight, scale=1 / 255.0)
+        scenery = cv2.multiply(background, cv2.bitwise_not(weight), scale=1 / 255.0)
+        return cv2.add(person, scenery) 
\ No newline at end of file
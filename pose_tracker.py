@@ -0,0 +1,201 @@
+import itertools
+import numpy as np
+from effects_engine import Landmark
+from landmark_filter import OneEuroFilter
+
+# Minimum landmark bounding box overlap for a pose to continue a track
+TRACK_MIN_IOU = 0.3
+# Failing that, maximum mean landmark distance, as a fraction of the track's box diagonal
+TRACK_MAX_DISTANCE = 0.5
+# Frames a person can go undetected before their track (and cached state) is dropped
+TRACK_MAX_MISSED = 15
+# Mean landmark movement (pixels) before a person's sprite placements are recomputed
+PLACEMENT_MOVE_THRESHOLD = 4.0
+
+def landmarks_to_array(pose_landmarks):
+    """(landmarks, 2) array of normalized x, y."""
+    return np.array([(lm.x, lm.y) for lm in pose_landmarks], dtype=np.float32)
+
+def smoothed_landmarks(pose_landmarks, points):
+    """Landmarks with filtered x, y and the detected depth and visibility."""
+    return [
+        Landmark(float(x), float(y), lm.z, lm.visibility)
+        for (x, y), lm in zip(points, pose_landmarks)
+    ]
+
+def bounding_box(points):
+    return (*points.min(axis=0), *points.max(axis=0))
+
+def box_iou(a, b):
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    intersection = max(0.0, x2 - x1) * max(0.0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - intersection
+    return intersection / union if union > 0 else 0.0
+
+class TrackedPerson:
+    """
+    One person followed across frames, with state the effects cache against them.
+    landmarks are the smoothed landmarks effects should place sprites with.
+    placements holds each effect's (x, y, width, height, angle), keyed by sprite name,
+    and is cleared whenever the person moves more than the placement threshold.
+    state is free for other per-person data.
+    """
+
+    def __init__(self, person_id, landmarks, points, landmark_filter=None):
+        self.id = person_id
+        self.landmarks = landmarks
+        self.points = points
+        # Filters the landmark x, y between detection and placement (None to place raw)
+        self.filter = landmark_filter
+        self.box = bounding_box(points)
+        self.missed = 0
+        # Landmarks the cached placements were computed from
+        self.reference_points = points
+        self.placements = {}
+        self.state = {}
+        # Sprite names of the body effects this person gets; None for all of them
+        self.effects = None
+
+    def wants(self, sprite_name):
+        return self.effects is None or sprite_name in self.effects
+
+class PoseTracker:
+    """
+    Gives detected poses stable IDs across frames, so per-person work (sprite sizing and
+    placement, smoothing) can be cached and only redone for people who actually moved.
+    Poses are matched to tracks greedily by landmark bounding box overlap, then by mean
+    landmark distance for people whose boxes changed too much to overlap.
+    Each person's landmarks are smoothed (see landmark_filter), and between inference
+    runs predict() extrapolates them, so inference can run less often than the preview.
+    """
+
+    def __init__(self, assign_effects=None, smoothing=True, min_iou=TRACK_MIN_IOU, max_distance=TRACK_MAX_DISTANCE,
+                 max_missed=TRACK_MAX_MISSED, move_threshold=PLACEMENT_MOVE_THRESHOLD):
+        # Optional function person ID -> set of sprite names (or None for all)
+        self.assign_effects = assign_effects
+        self.smoothing = smoothing
+        self.min_iou = min_iou
+        self.max_distance = max_distance
+        self.max_missed = max_missed
+        self.move_threshold = move_threshold
+        self.tracks = []
+        self.frame_shape = None
+        self.ids = itertools.count(1)
+
+    def update(self, poses, frame_shape, timestamp):
+        """
+        Match the poses detected in a frame taken at timestamp (seconds) to tracks.
+        Returns the TrackedPerson for each pose, in the same order.
+        """
+        self._set_frame_shape(frame_shape)
+
+        points = [landmarks_to_array(pose_landmarks) for pose_landmarks in poses]
+        boxes = [bounding_box(p) for p in points]
+        matches = self._associate(points, boxes)
+
+        people = []
+        matched_tracks = set()
+        for i, pose_landmarks in enumerate(poses):
+            track = matches.get(i)
+            if track is None:
+                track = TrackedPerson(next(self.ids), pose_landmarks, points[i],
+                                      OneEuroFilter() if self.smoothing else None)
+                self.tracks.append(track)
+            track.box = boxes[i]
+            track.missed = 0
+            track.points = points[i]
+            if track.filter is not None:
+                track.points = track.filter.filter(points[i], timestamp)
+                pose_landmarks = smoothed_landmarks(pose_landmarks, track.points)
+            track.landmarks = pose_landmarks
+            self._check_moved(track)
+            if self.assign_effects is not None:
+                track.effects = self.assign_effects(track.id)
+            matched_tracks.add(track.id)
+            people.append(track)
+
+        for track in self.tracks:
+            if track.id not in matched_tracks:
+                track.missed += 1
+        self.tracks = [track for track in self.tracks if track.missed <= self.max_missed]
+        return people
+
+    def identify(self, poses):
+        """
+        People for a still photo: each pose with its raw detected landmarks and no cached
+        placements, carrying the ID (and so the effects) of the track it matches.
+        Tracks aren't updated, so stills neither lag behind the guest nor disturb the preview.
+        """
+        points = [landmarks_to_array(pose_landmarks) for pose_landmarks in poses]
+        matches = self._associate(points, [bounding_box(p) for p in points])
+        people = []
+        for i, pose_landmarks in enumerate(poses):
+            track = matches.get(i)
+            person = TrackedPerson(track.id if track is not None else next(self.ids), pose_landmarks, points[i])
+            if self.assign_effects is not None:
+                person.effects = self.assign_effects(person.id)
+            people.append(person)
+        return people
+
+    def predict(self, frame_shape, timestamp):
+        """
+        People visible in the last update, with landmarks extrapolated to timestamp,
+        for preview frames that inference skipped.
+        """
+        self._set_frame_shape(frame_shape)
+        people = []
+        for track in self.tracks:
+            if track.missed:
+                continue
+            if track.filter is not None:
+                points = track.filter.predict(timestamp)
+                track.landmarks = smoothed_landmarks(track.landmarks, points)
+                track.points = points
+                self._check_moved(track)
+            people.append(track)
+        return people
+
+    def _set_frame_shape(self, frame_shape):
+        if frame_shape != self.frame_shape:
+            # Pixel placements don't carry over to another resolution
+            for track in self.tracks:
+                track.placements.clear()
+            self.frame_shape = frame_shape
+
+    def _associate(self, points, boxes):
+        """Greedy association: pose index -> track."""
+        candidates = []
+        for i, box in enumerate(boxes):
+            for track in self.tracks:
+                iou = box_iou(box, track.box)
+                if iou >= self.min_iou:
+                    candidates.append((1.0 + iou, i, track))
+                    continue
+                diagonal = np.hypot(track.box[2] - track.box[0], track.box[3] - track.box[1])
+                if diagonal <= 0 or len(points[i]) != len(track.points):
+                    continue
+                distance = float(np.linalg.norm(points[i] - track.points, axis=1).mean()) / diagonal
+                if distance <= self.max_distance:
+                    # Always ranked below any overlap match
+                    candidates.append((1.0 - distance, i, track))
+
+        matches = {}
+        used_tracks = set()
+        for _, i, track in sorted(candidates, key=lambda c: c[0], reverse=True):
+            if i in matches or track.id in used_tracks:
+                continue
+            matches[i] = track
+            used_tracks.add(track.id)
+        return matches
+
+    def _check_moved(self, track):
+        """Drop a person's cached placements once they've moved past the threshold."""
+        h, w = self.frame_shape
+        movement = np.abs(track.points - track.reference_points) * (w, h)
+        if float(np.hypot(movement[:, 0], movement[:, 1]).mean()) > self.move_threshold:
+            track.reference_points = track.points
+            track.placements.clear()
+
+    def reset(self):
+        self.tracks = []
@@ -0,0 +1,157 @@
+import time
+import threading
+import traceback
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import cv2
+
+# Frames per second published to viewers, whatever the preview rate
+PREVIEW_STREAM_MAX_FPS = 15
+# Published frames are downscaled to at most this width
+PREVIEW_STREAM_WIDTH = 1280
+PREVIEW_STREAM_JPEG_QUALITY = 80
+
+MJPEG_BOUNDARY = 'yeehawframe'
+
+class PreviewTap:
+    """
+    Publishes the processed booth preview to other displays.
+    At most max_fps frames a second are taken from the GUI thread, each is encoded to
+    JPEG once on a background thread, and every MJPEG viewer reuses that result, so
+    extra viewers add no effect or encode work.
+    """
+
+    def __init__(self, max_fps=PREVIEW_STREAM_MAX_FPS, width=PREVIEW_STREAM_WIDTH, quality=PREVIEW_STREAM_JPEG_QUALITY):
+        self.interval = 1.0 / max_fps
+        self.width = width
+        self.quality = quality
+        self.last_publish = 0.0
+        self.pending = None
+        self.condition = threading.Condition()
+        self.running = True
+        # Latest encoded frame and its sequence number, shared by all viewers
+        self.jpeg = None
+        self.seq = 0
+        self.thread = threading.Thread(target=self._encode_loop, name='preview-tap', daemon=True)
+        self.thread.start()
+
+    def publish(self, frame):
+        """
+        Offer a processed preview frame. Cheap to call every frame: frames beyond the rate
+        cap are skipped, and a frame still waiting to be encoded is replaced, not queued.
+        The frame must not be modified afterwards.
+        """
+        now = time.perf_counter()
+        if now - self.last_publish < self.interval:
+            return
+        self.last_publish = now
+        with self.condition:
+            self.pending = frame
+            self.condition.notify_all()
+
+    def _encode_loop(self):
+        while True:
+            with self.condition:
+                while self.pending is None and self.running:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                frame = self.pending
+                self.pending = None
+            try:
+                h, w = frame.shape[:2]
+                if w > self.width:
+                    frame = cv2.resize(frame, (self.width, int(h * self.width / w)), interpolation=cv2.INTER_AREA)
+                ok, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+                if not ok:
+                    continue
+                with self.condition:
+                    self.jpeg = encoded.tobytes()
+                    self.seq += 1
+                    self.condition.notify_all()
+            except Exception as e:
+                print(f"Error publishing preview frame: {str(e)}")
+                print(traceback.format_exc())
+
+    def wait_for_frame(self, last_seq, timeout=5.0):
+        """Block until a frame newer than last_seq is encoded. Returns (seq, jpeg) or (last_seq, None)."""
+        with self.condition:
+            self.condition.wait_for(lambda: self.seq != last_seq or not self.running, timeout=timeout)
+            if self.seq == last_seq or not self.running:
+                return last_seq, None
+            return self.seq, self.jpeg
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+
+class PreviewStreamHandler(BaseHTTPRequestHandler):
+    server_version = 'YeehawBooth'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        tap = self.server.tap
+        path = self.path.split('?')[0]
+        if path == '/stream.mjpg':
+            self.send_stream(tap)
+        elif path == '/frame.jpg':
+            seq, jpeg = tap.wait_for_frame(-1)
+            if jpeg is None:
+                self.send_error(503)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'image/jpeg')
+            self.send_header('Content-Length', str(len(jpeg)))
+            self.send_header('Cache-Control', 'no-store')
+            self.end_headers()
+            self.wfile.write(jpeg)
+        elif path == '/':
+            body = b'<!DOCTYPE html><html><body style="margin:0;background:black">' \
+                   b'<img src="/stream.mjpg" style="width:100vw;height:100vh;object-fit:contain"></body></html>'
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.send_error(404)
+
+    def send_stream(self, tap):
+        self.send_response(200)
+        self.send_header('Content-Type', f'multipart/x-mixed-replace; boundary={MJPEG_BOUNDARY}')
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        seq = 0
+        try:
+            while tap.running:
+                seq, jpeg = tap.wait_for_frame(seq)
+                if jpeg is None:
+                    continue
+                # Slow viewers skip frames instead of queueing them
+                self.wfile.write(
+                    f'--{MJPEG_BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(jpeg)}\r\n\r\n'.encode('ascii'))
+                self.wfile.write(jpeg)
+                self.wfile.write(b'\r\n')
+        except (BrokenPipeError, ConnectionResetError):
+            # Viewer went away
+            pass
+
+class PreviewStreamServer:
+    """MJPEG endpoint for a PreviewTap: /stream.mjpg, /frame.jpg, and a full-screen page at /."""
+
+    def __init__(self, tap, port, host='0.0.0.0'):
+        self.httpd = ThreadingHTTPServer((host, port), PreviewStreamHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.tap = tap
+        self.port = port
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, name='preview-stream', daemon=True).start()
+        print(f"Preview stream at http://0.0.0.0:{self.port}/stream.mjpg")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
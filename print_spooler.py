@@ -0,0 +1,159 @@
+import os
+import time
+import threading
+import traceback
+from collections import deque
+import cv2
+from PyQt6.QtCore import QThread, pyqtSignal
+from booth_config import get_config
+from strip_layout import build_shared_sheet
+
+class PrintSpooler(QThread):
+    """
+    Single print worker shared by every booth in the process.
+    Each booth has its own queue, and jobs are taken round-robin across booths so a
+    busy booth can't starve the others. The printer comes from the startup
+    orchestrator, so jobs can be queued while it is still loading.
+    With print batching on, a shareable strip that arrives while the printer is busy
+    is held for a while to share its sheet with another session's strip.
+    """
+    # booth_id, job_id, success, print artifact path ('' if none was built)
+    job_finished = pyqtSignal(str, str, bool, str)
+
+    def __init__(self, startup):
+        super().__init__()
+        self.startup = startup
+        self.queues = {}
+        self.booth_order = []
+        self.next_booth = 0
+        self.condition = threading.Condition()
+        self.running = True
+        # Sheets taken off the queues and still being prepared or sent to the printer
+        self.active = 0
+
+    def submit(self, booth_id, job_id, path, prepared=False, image=None, shareable=False):
+        """
+        Queue a print job. job_finished is emitted when it is done.
+        Args:
+            booth_id (str): booth whose queue the job goes on
+            job_id (str): identifies the job in job_finished (the session timestamp)
+            path (str): strip image, or a cached print-ready PDF if prepared is True
+            prepared (bool): send path straight to the printer without building the PDF
+            image: the strip as a BGR array, so printing doesn't wait for it to be written to path
+            shareable (bool): with print batching on, the session may get one strip on a
+                sheet shared with another session instead of a sheet of its own
+        """
+        with self.condition:
+            if booth_id not in self.queues:
+                self.queues[booth_id] = deque()
+                self.booth_order.append(booth_id)
+            # Only strips queued while the printer is busy wait for a partner
+            busy = self.active > 0 or any(self.queues.values())
+            self.queues[booth_id].append((job_id, path, prepared, image, shareable and not prepared, busy))
+            self.condition.notify()
+
+    def queue_depth(self, booth_id=None):
+        """Number of jobs waiting, for one booth or for all of them."""
+        with self.condition:
+            if booth_id is not None:
+                return len(self.queues.get(booth_id, ()))
+            return sum(len(jobs) for jobs in self.queues.values())
+
+    def active_sheets(self):
+        """Number of sheets being prepared or sent to the printer right now (0 or 1)."""
+        with self.condition:
+            return self.active
+
+    def _next_job(self):
+        # Called with the condition held
+        for _ in range(len(self.booth_order)):
+            booth_id = self.booth_order[self.next_booth % len(self.booth_order)]
+            self.next_booth += 1
+            if self.queues[booth_id]:
+                return booth_id, self.queues[booth_id].popleft()
+        return None
+
+    def _take_partner(self):
+        # Called with the condition held: the oldest shareable job in any queue
+        for booth_id in self.booth_order:
+            for job in self.queues[booth_id]:
+                if job[4]:
+                    self.queues[booth_id].remove(job)
+                    return booth_id, job
+        return None
+
+    def _find_partner(self, job):
+        """
+        Called with the condition held. With batching on, find a second shareable job to
+        share a sheet with, waiting up to the hold time if the printer was busy.
+        """
+        settings = get_config().printing
+        _, (_, _, _, _, shareable, busy) = job
+        if not settings.batching or not shareable:
+            return None
+        partner = self._take_partner()
+        if partner is None and busy:
+            deadline = time.monotonic() + settings.batch_hold_seconds
+            while partner is None and self.running:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.condition.wait(timeout=remaining)
+                partner = self._take_partner()
+        return partner
+
+    def run(self):
+        while True:
+            with self.condition:
+                job = self._next_job()
+                while job is None and self.running:
+                    self.condition.wait()
+                    job = self._next_job()
+                if job is None:
+                    return
+                # Count the sheet before any batching hold, so back-pressure sees it while it waits
+                self.active = 1
+                partner = self._find_partner(job)
+
+            if partner is not None:
+                self._print_shared(job, partner)
+            else:
+                booth_id, (job_id, path, prepared, image, _, _) = job
+                printer = self.startup.wait('printer')
+                artifact_path = path if prepared else None
+                if printer is not None and not prepared:
+                    artifact_path = printer.prepare_strip(path, image)
+                success = printer is not None and artifact_path is not None and printer.print_prepared(artifact_path)
+                self.job_finished.emit(booth_id, job_id, success, artifact_path or '')
+            with self.condition:
+                self.active = 0
+
+    def _print_shared(self, job, partner):
+        """Print one strip of each of two sessions on one sheet."""
+        booth_id, (job_id, path, _, image, _, _) = job
+        partner_booth_id, (partner_job_id, partner_path, _, partner_image, _, _) = partner
+        print(f"Printing sessions {job_id} and {partner_job_id} on one sheet")
+        success = False
+        try:
+            image = image if image is not None else cv2.imread(path)
+            partner_image = partner_image if partner_image is not None else cv2.imread(partner_path)
+            if image is None or partner_image is None:
+                raise Exception("Could not read strip images")
+            sheet = build_shared_sheet(image, partner_image)
+            sheet_path = os.path.join(os.path.dirname(path), f"sheet_{job_id}_{partner_job_id}.jpg")
+            printer = self.startup.wait('printer')
+            artifact_path = printer.prepare_strip(sheet_path, sheet) if printer is not None else None
+            success = artifact_path is not None and printer.print_prepared(artifact_path)
+        except Exception as e:
+            print(f"Error printing shared sheet: {str(e)}")
+            print(traceback.format_exc())
+        # The sheet isn't either session's own print, so reprints rebuild from the strip
+        self.job_finished.emit(booth_id, job_id, success, '')
+        self.job_finished.emit(partner_booth_id, partner_job_id, success, '')
+
+    def stop(self):
+        """Stop once the queued jobs have been printed."""
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        self.wait()
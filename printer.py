@@ -3,7 +3,21 @@ import win32print
 import win32api
 from PIL import Image
 import traceback
-from printing_utils import print_photo_strip
+from printing_utils import print_photo_strip, prepare_print_artifact, print_with_gsprint
+from printer_monitor import PrinterStatus, PRINTER_READY, PRINTER_PRINTING, PRINTER_ERROR, PRINTER_OFFLINE
+
+# Windows printer status bits that mean the printer can't print, with what to tell staff.
+# The DNP driver reports ribbon and paper problems through these too.
+PRINTER_PROBLEMS = [
+    (win32print.PRINTER_STATUS_OFFLINE, PRINTER_OFFLINE, "Printer offline"),
+    (win32print.PRINTER_STATUS_NOT_AVAILABLE, PRINTER_OFFLINE, "Printer not available"),
+    (win32print.PRINTER_STATUS_PAPER_OUT, PRINTER_ERROR, "Out of media"),
+    (win32print.PRINTER_STATUS_PAPER_JAM, PRINTER_ERROR, "Media jam"),
+    (win32print.PRINTER_STATUS_PAPER_PROBLEM, PRINTER_ERROR, "Media or ribbon problem"),
+    (win32print.PRINTER_STATUS_DOOR_OPEN, PRINTER_ERROR, "Printer door open"),
+    (win32print.PRINTER_STATUS_USER_INTERVENTION, PRINTER_ERROR, "Printer needs attention"),
+    (win32print.PRINTER_STATUS_ERROR, PRINTER_ERROR, "Printer error"),
+]
 
 class DNPPrinter:
     def __init__(self):
@@ -50,4 +64,44 @@ class DNPPrinter:
             print(f"Error printing: {str(e)}")
             print("Detailed error:")
             print(traceback.format_exc())
-            return False 
\ No newline at end of file
+            return False 
+
+    def prepare_strip(self, image_path, image=None):
+        """
+        Build the print-ready PDF for a strip without printing it.
+        Returns the PDF path, or None on failure.
+        Args:
+            image_path (str): Path of the strip image
+            image: the strip as a BGR array if it is still in memory, so it isn't read back from disk
+        """
+        return prepare_print_artifact(image_path, self.printer_name, image)
+
+    def print_prepared(self, pdf_path):
+        """
+        Send a print-ready PDF from prepare_strip straight to the printer.
+        Args:
+            pdf_path (str): Path to the cached print artifact
+        """
+        try:
+            print(f"Printing cached artifact {pdf_path} using: {self.printer_name}")
+            if not print_with_gsprint(pdf_path, self.printer_name):
+                raise Exception("gsprint failed")
+            return True
+        except Exception as e:
+            print(f"Error printing: {str(e)}")
+            print(traceback.format_exc())
+            return False
+
+    def query_status(self):
+        """Poll the Windows spooler for the printer's state and the number of jobs in its queue."""
+        printer_handle = win32print.OpenPrinter(self.printer_name)
+        try:
+            info = win32print.GetPrinter(printer_handle, 2)
+        finally:
+            win32print.ClosePrinter(printer_handle)
+        for bit, state, message in PRINTER_PROBLEMS:
+            if info['Status'] & bit:
+                return PrinterStatus(state, info['cJobs'], message)
+        if info['Attributes'] & win32print.PRINTER_ATTRIBUTE_WORK_OFFLINE:
+            return PrinterStatus(PRINTER_OFFLINE, info['cJobs'], "Printer set to work offline")
+        return PrinterStatus(PRINTER_PRINTING if info['cJobs'] else PRINTER_READY, info['cJobs'])
@@ -0,0 +1,123 @@
+import time
+import threading
+import traceback
+from PyQt6.QtCore import QThread
+from booth_config import get_config
+
+# How often the printer is polled (seconds)
+PRINTER_POLL_INTERVAL = 2.0
+
+# Weight of the newest measurement in the running print time estimate
+THROUGHPUT_SMOOTHING = 0.3
+
+# Printer states
+PRINTER_READY = 'ready'
+PRINTER_PRINTING = 'printing'
+PRINTER_ERROR = 'error'
+PRINTER_OFFLINE = 'offline'
+PRINTER_UNKNOWN = 'unknown'
+
+class PrinterStatus:
+    """One poll of the printer: its state, jobs in its own queue, and any problem to show staff."""
+
+    def __init__(self, state=PRINTER_UNKNOWN, jobs=0, message=''):
+        self.state = state
+        self.jobs = jobs
+        self.message = message
+
+    @property
+    def needs_attention(self):
+        return self.state in (PRINTER_ERROR, PRINTER_OFFLINE)
+
+class PrinterMonitor(QThread):
+    """
+    Polls the printer in the background and turns what it sees into back-pressure.
+    The time per sheet is measured from jobs leaving the printer's queue while it is
+    busy, so wait estimates follow the real printer (and media) instead of a guess.
+    A sheet counts as pending from the moment a booth queues it on the spooler until
+    the printer has finished it; above the configured limit, new sessions are held off.
+    """
+
+    def __init__(self, startup, print_spooler, poll_interval=PRINTER_POLL_INTERVAL):
+        super().__init__()
+        self.startup = startup
+        self.print_spooler = print_spooler
+        self.poll_interval = poll_interval
+        self.lock = threading.Lock()
+        self.status = PrinterStatus()
+        self.sheet_seconds = None
+        self.last_jobs = 0
+        # When the sheet now printing started, as far as the polls can tell
+        self.sheet_started = None
+        self.stop_event = threading.Event()
+
+    def run(self):
+        printer = self.startup.wait('printer')
+        if printer is None:
+            return
+        while not self.stop_event.is_set():
+            try:
+                self.update(printer.query_status())
+            except Exception as e:
+                print(f"Error polling printer: {str(e)}")
+                print(traceback.format_exc())
+                self.update(PrinterStatus(PRINTER_UNKNOWN, self.last_jobs, str(e)))
+            self.stop_event.wait(self.poll_interval)
+
+    def update(self, status):
+        now = time.monotonic()
+        with self.lock:
+            finished = self.last_jobs - status.jobs
+            if finished > 0 and self.sheet_started is not None:
+                measured = (now - self.sheet_started) / finished
+                if self.sheet_seconds is None:
+                    self.sheet_seconds = measured
+                else:
+                    self.sheet_seconds += THROUGHPUT_SMOOTHING * (measured - self.sheet_seconds)
+            if status.jobs > 0 and (finished > 0 or self.last_jobs == 0):
+                # The next sheet has just started
+                self.sheet_started = now
+            elif status.jobs == 0:
+                self.sheet_started = None
+            self.last_jobs = status.jobs
+            changed = status.state != self.status.state or status.message != self.status.message
+            self.status = status
+        if changed:
+            print(f"Printer {status.state}{': ' + status.message if status.message else ''}")
+
+    def seconds_per_sheet(self):
+        """Measured time per sheet, or the configured estimate until a sheet has been timed."""
+        with self.lock:
+            if self.sheet_seconds is not None:
+                return self.sheet_seconds
+        return get_config().printing.sheet_seconds
+
+    def pending_sheets(self):
+        """Sheets queued on the spooler or still in the printer's own queue."""
+        with self.lock:
+            printer_jobs = self.status.jobs
+        return self.print_spooler.queue_depth() + self.print_spooler.active_sheets() + printer_jobs
+
+    def estimate_wait(self, extra_sheets=0):
+        """Seconds until the pending sheets, plus extra_sheets more, have printed."""
+        return (self.pending_sheets() + extra_sheets) * self.seconds_per_sheet()
+
+    def is_throttled(self):
+        """Whether new sessions should wait: the printer needs attention or too many sheets are pending."""
+        with self.lock:
+            if self.status.needs_attention:
+                return True
+        return self.pending_sheets() >= get_config().printing.max_pending_sheets
+
+    def seconds_until_unthrottled(self):
+        """Estimated seconds until enough sheets have printed for new sessions to start."""
+        excess = self.pending_sheets() - get_config().printing.max_pending_sheets + 1
+        return max(excess, 0) * self.seconds_per_sheet()
+
+    def current_status(self):
+        with self.lock:
+            return self.status
+
+    def stop(self):
+        self.stop_event.set()
+        self.wait()
@@ -3,7 +3,16 @@ import win32print
 import subprocess
 import traceback
 import img2pdf
+import cv2
 from PIL import Image, ImageDraw, ImageFont
+from booth_config import get_config
+
+# Directory of the booth's code and bundled images, whatever the working directory
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def resolve_app_path(path):
+    """A configured file path, taken relative to the app directory unless it is absolute."""
+    return path if os.path.isabs(path) else os.path.join(APP_DIR, path)
 
 def get_printer_media_size(printer_name):
     """Get the media size for a specific printer"""
@@ -28,28 +37,44 @@ def get_printer_media_size(printer_name):
         # Return default 4x6 inch size in mm
         return 101.6, 152.4
 
-def resize_image_for_printing(image_path, printer_name):
-    """Resize image to fit both strips on the printer's media size"""
+def resize_image_for_printing(image_path, printer_name, image=None):
+    """
+    Resize image to fit both strips on the printer's media size.
+    If the strip is still in memory, pass it as image (a BGR numpy array) to skip
+    reading image_path, which is then only used to name the output.
+    """
     try:
+        # One settings snapshot for the whole layout
+        settings = get_config().printing
+
         # Get printer media size
         media_width_mm, media_height_mm = get_printer_media_size(printer_name)
         print(f"Printer media size: {media_width_mm/10}mm x {media_height_mm/10}mm")
         
+        # Calculate target size in pixels at the print DPI
+        # We want the image to be a fraction (scale_factor) of the media size
+        scale_factor = settings.scale_factor
+        target_width = int((media_width_mm / 25.4) * settings.dpi * scale_factor)
+        target_height = int((media_height_mm / 25.4) * settings.dpi * scale_factor)
+        
+        print(f"Target size in pixels: {target_width}x{target_height}")
+        
         # Open the image
-        img = Image.open(image_path)
+        if image is not None:
+            print(f"Original image size: {(image.shape[1], image.shape[0])}")
+            # Shrink before converting, so large strips are never copied at full size
+            scale = min(target_width / image.shape[1], target_height / image.shape[0])
+            if scale < 1:
+                size = (max(1, round(image.shape[1] * scale)), max(1, round(image.shape[0] * scale)))
+                image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+            # OpenCV arrays are BGR
+            img = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+        else:
+            img = Image.open(image_path)
+            print(f"Original image size: {img.size}")
         if img.mode != 'RGB':
             img = img.convert('RGB')
             
-        print(f"Original image size: {img.size}")
-        
-        # Calculate target size in pixels at 600 DPI
-        # We want the image to be about 60% of the media size
-        scale_factor = 0.6
-        target_width = int((media_width_mm / 25.4) * 600 * scale_factor)
-        target_height = int((media_height_mm / 25.4) * 600 * scale_factor)
-        
-        print(f"Target size in pixels: {target_width}x{target_height}")
-        
         # Resize image maintaining aspect ratio
         img.thumbnail((target_width, target_height), Image.Resampling.LANCZOS)
         print(f"Resized image size: {img.size}")
@@ -64,69 +89,63 @@ def resize_image_for_printing(image_path, printer_name):
         # Paste the resized image onto the white background
         background.paste(img, (x, y))
         
+        strip_width = target_width // 2
+        draw = ImageDraw.Draw(background)
+        
+        # Try to load a font, fall back to default if not available
+        try:
+            font = ImageFont.truetype("arial.ttf", 72)  # Adjust size as needed
+        except:
+            font = ImageFont.load_default()
+        
+        # Footer text lines
+        lines = settings.footer_lines
+        
+        # Calculate text heights
+        line_heights = []
+        for line in lines:
+            line_bbox = draw.textbbox((0, 0), line, font=font)
+            line_heights.append(line_bbox[3] - line_bbox[1])
+        
+        # Calculate center coordinates for each strip
+        left_strip_center_x = strip_width // 2
+        right_strip_center_x = strip_width + (strip_width // 2)
+        
+        # Calculate vertical positions for the text lines
+        total_text_height = sum(line_heights) + 20 * max(len(lines) - 1, 0)  # 20 pixels spacing between lines
+        text_center_y = target_height - total_text_height // 2 - 80  # Increased offset to move text up
+        
+        # Draw text on both strips (centered)
+        line_y = text_center_y
+        for line, line_height in zip(lines, line_heights):
+            draw.text((left_strip_center_x, line_y), line, fill='black', font=font, anchor="mm")
+            draw.text((right_strip_center_x, line_y), line, fill='black', font=font, anchor="mm")
+            line_y += line_height + 20
+        
         # Load and resize QR code
-        qr_path = os.path.join(os.path.dirname(os.path.dirname(image_path)), "qr-code.png")
+        qr_path = resolve_app_path(settings.qr_code_path)
         if os.path.exists(qr_path):
             qr_img = Image.open(qr_path)
             if qr_img.mode != 'RGB':
                 qr_img = qr_img.convert('RGB')
             
             # Calculate QR code size (about 1/3 of strip width)
-            strip_width = target_width // 2
             qr_size = strip_width // 3
             
             # Resize QR code maintaining aspect ratio
             qr_img.thumbnail((qr_size, qr_size), Image.Resampling.LANCZOS)
             
-            # Add text at the bottom
-            draw = ImageDraw.Draw(background)
-            
-            # Try to load a font, fall back to default if not available
-            try:
-                font = ImageFont.truetype("arial.ttf", 72)  # Adjust size as needed
-            except:
-                font = ImageFont.load_default()
-            
-            # Text to add
-            text1 = "Law and Disorder"
-            text2 = "Big Stick 2025"
-            
-            # Calculate text positions for both strips
-            text1_bbox = draw.textbbox((0, 0), text1, font=font)
-            text2_bbox = draw.textbbox((0, 0), text2, font=font)
-            
-            text1_width = text1_bbox[2] - text1_bbox[0]
-            text2_width = text2_bbox[2] - text2_bbox[0]
-            text1_height = text1_bbox[3] - text1_bbox[1]
-            text2_height = text2_bbox[3] - text2_bbox[1]
-            
-            # Calculate strip widths
-            strip_width = target_width // 2
-            
-            # Calculate center coordinates for each strip
-            left_strip_center_x = strip_width // 2
-            right_strip_center_x = strip_width + (strip_width // 2)
-            
-            # Calculate vertical positions for both text lines
-            total_text_height = text1_height + text2_height + 20  # 20 pixels spacing between lines
-            text_center_y = target_height - total_text_height // 2 - 80  # Increased offset to move text up
-            
-            # Draw text on left strip (centered)
-            draw.text((left_strip_center_x, text_center_y), text1, fill='black', font=font, anchor="mm")
-            draw.text((left_strip_center_x, text_center_y + text1_height + 20), text2, fill='black', font=font, anchor="mm")
-            
             # Position QR code above text on left strip (centered)
             left_qr_x = (strip_width - qr_img.width) // 2
-            qr_y = text_center_y - text1_height // 2 - qr_img.height - 30  # Increased offset to move QR code up
+            first_line_height = line_heights[0] if line_heights else 0
+            qr_y = text_center_y - first_line_height // 2 - qr_img.height - 30  # Increased offset to move QR code up
             background.paste(qr_img, (left_qr_x, qr_y))
             
-            # Draw text on right strip (centered)
-            draw.text((right_strip_center_x, text_center_y), text1, fill='black', font=font, anchor="mm")
-            draw.text((right_strip_center_x, text_center_y + text1_height + 20), text2, fill='black', font=font, anchor="mm")
-            
             # Position QR code above text on right strip (centered)
             right_qr_x = strip_width + (strip_width - qr_img.width) // 2
             background.paste(qr_img, (right_qr_x, qr_y))
+        else:
+            print(f"Warning: QR code {qr_path} not found, printing the strip without it")
         
         # Save the resized image
         resized_path = os.path.splitext(image_path)[0] + '_resized.jpg'
@@ -167,9 +186,10 @@ def convert_to_pdf(image_path):
 def print_with_gsprint(pdf_path, printer_name=None):
     """Print a PDF file using gsprint with enhanced color settings"""
     try:
-        # Get the path to gsprint.exe
-        gsprint_path = r"C:\Program Files\Ghostgum\gsview\gsprint.exe"
-        gswin64_path = r"C:\Program Files\gs\gs10.05.1\bin\gswin64.exe"
+        # Get the paths to gsprint.exe and Ghostscript
+        settings = get_config().printing
+        gsprint_path = settings.gsprint_path
+        gswin64_path = settings.ghostscript_path
         
         if not os.path.exists(gsprint_path):
             print(f"Error: gsprint.exe not found at {gsprint_path}")
@@ -211,19 +231,22 @@ def print_with_gsprint(pdf_path, printer_name=None):
         print(traceback.format_exc())
         return False
 
-def print_photo_strip(image_path, printer_name):
+def print_artifact_path(image_path):
+    """Path of the print-ready PDF that prepare_print_artifact builds for an image"""
+    return os.path.splitext(image_path)[0] + '_resized.pdf'
+
+def prepare_print_artifact(image_path, printer_name, image=None):
     """
-    Complete photo strip printing workflow:
+    Build the print-ready PDF for a strip:
     1. Resize image for printer's media size
     2. Convert to PDF with proper layout
-    3. Print using gsprint with color settings
+    Returns the PDF path, or None on failure. The PDF can be sent to the printer again
+    with print_with_gsprint without repeating these steps.
+    image is the strip as a BGR array if it is still in memory (see resize_image_for_printing).
     """
     try:
-        print(f"Starting photo strip printing workflow for: {image_path}")
-        print(f"Using printer: {printer_name}")
-        
         # Step 1: Resize image using printer's media size
-        resized_path = resize_image_for_printing(image_path, printer_name)
+        resized_path = resize_image_for_printing(image_path, printer_name, image)
         if not resized_path:
             raise Exception("Failed to resize image for printing")
         
@@ -231,6 +254,28 @@ def print_photo_strip(image_path, printer_name):
         pdf_path = convert_to_pdf(resized_path)
         if not pdf_path:
             raise Exception("Failed to convert image to PDF")
+        return pdf_path
+        
+    except Exception as e:
+        print(f"Error preparing print artifact: {str(e)}")
+        print(traceback.format_exc())
+        return None
+
+def print_photo_strip(image_path, printer_name):
+    """
+    Complete photo strip printing workflow:
+    1. Resize image for printer's media size
+    2. Convert to PDF with proper layout
+    3. Print using gsprint with color settings
+    """
+    try:
+        print(f"Starting photo strip printing workflow for: {image_path}")
+        print(f"Using printer: {printer_name}")
+        
+        # Steps 1 and 2: Build the print-ready PDF
+        pdf_path = prepare_print_artifact(image_path, printer_name)
+        if not pdf_path:
+            raise Exception("Failed to prepare print artifact")
         
         # Step 3: Print using gsprint with enhanced settings
         success = print_with_gsprint(pdf_path, printer_name)
@@ -0,0 +1,163 @@
+import os
+import sys
+import time
+import datetime
+import threading
+import traceback
+import tracemalloc
+from collections import Counter
+
+# Time between stack samples (seconds); 100 Hz keeps the overhead to a few percent
+SAMPLE_INTERVAL = 0.01
+
+# Captures stop by themselves after this long (seconds) if nobody stops them first
+DEFAULT_PROFILE_SECONDS = 30.0
+
+# Frames of each allocation's traceback that tracemalloc records
+TRACEMALLOC_FRAMES = 10
+
+# Allocation sites listed in the tracemalloc summary
+TRACEMALLOC_TOP = 50
+
+# Profiles are written to this directory, next to the photos directory
+PROFILE_DIR_NAME = 'profiles'
+
+# Messages the effects engine sends its worker processes
+PROFILE_START = 'profile_start'
+PROFILE_STOP = 'profile_stop'
+
+_active = None
+_active_lock = threading.Lock()
+
+def profile_dir_for(photos_dir):
+    return os.path.join(os.path.dirname(os.path.abspath(photos_dir)), PROFILE_DIR_NAME)
+
+def profile_stamp():
+    return datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+
+def frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+def collapse_stack(frame, thread_name):
+    """One sample as a flamegraph.pl collapsed stack: root first, frames separated by semicolons."""
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    labels.append(f"thread {thread_name}")
+    # Semicolons separate frames, so keep them out of the labels
+    return ';'.join(label.replace(';', ':') for label in reversed(labels))
+
+class ProfileCapture:
+    """
+    Samples the Python stacks of every thread in this process (GUI, encoder, spooler,
+    inference threads...) and traces allocations with tracemalloc, for a fixed time or
+    until stopped. When it ends it writes, named <prefix>_<label>:
+    - .collapsed: collapsed stacks with sample counts, for flamegraph.pl or speedscope
+    - .tracemalloc.txt: the largest allocation sites still live, and the peak traced memory
+    - .tracemalloc: the raw snapshot, for tracemalloc.Snapshot.load
+    Sampling happens on its own thread, so the profiled threads are only paused for the
+    moment it takes to read their stacks. Only one capture runs per process at a time.
+    """
+
+    def __init__(self, output_dir, prefix, label, duration=DEFAULT_PROFILE_SECONDS, interval=SAMPLE_INTERVAL):
+        self.output_dir = output_dir
+        self.name = f"{prefix}_{label}"
+        self.duration = duration
+        self.interval = interval
+        self.samples = Counter()
+        self.sample_count = 0
+        self.started_tracing = False
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        """Start sampling. Returns False if another capture is already running in this process."""
+        global _active
+        with _active_lock:
+            if _active is not None:
+                return False
+            _active = self
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self.started_tracing = True
+        tracemalloc.reset_peak()
+        self.thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+        self.thread.start()
+        return True
+
+    def stop(self):
+        """End the capture early. The profiles are written in the background."""
+        self.stop_event.set()
+
+    def wait(self, timeout=None):
+        """Wait until the profiles have been written."""
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def _run(self):
+        global _active
+        deadline = time.perf_counter() + self.duration
+        try:
+            while not self.stop_event.wait(self.interval) and time.perf_counter() < deadline:
+                self._sample()
+            self._write()
+        except Exception as e:
+            print(f"Error profiling: {str(e)}")
+            print(traceback.format_exc())
+        finally:
+            if self.started_tracing:
+                tracemalloc.stop()
+            with _active_lock:
+                _active = None
+
+    def _sample(self):
+        own_id = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            self.samples[collapse_stack(frame, names.get(thread_id, thread_id))] += 1
+        self.sample_count += 1
+
+    def _write(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, self.name)
+
+        with open(base + '.collapsed', 'w', encoding='utf-8') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot.dump(base + '.tracemalloc')
+        statistics = snapshot.statistics('lineno')
+        with open(base + '.tracemalloc.txt', 'w', encoding='utf-8') as f:
+            f.write(f"{self.sample_count} stack samples every {self.interval * 1000:.0f} ms\n")
+            f.write(f"Peak traced memory: {peak / (1024 * 1024):.1f} MB\n")
+            f.write(f"Live at end: {sum(stat.size for stat in statistics) / (1024 * 1024):.1f} MB "
+                    f"in {sum(stat.count for stat in statistics)} blocks\n\n")
+            for stat in statistics[:TRACEMALLOC_TOP]:
+                f.write(f"{stat}\n")
+        print(f"Profile written to {base}.*")
+
+def handle_profile_request(request, label, capture):
+    """
+    Start or stop a capture in a worker process on a message from the effects engine.
+    Returns the capture now running, if any.
+    """
+    kind = request[0]
+    if capture is not None:
+        capture.stop()
+        capture.wait()
+        capture = None
+    if kind == PROFILE_START:
+        _, output_dir, prefix, duration = request
+        capture = ProfileCapture(output_dir, prefix, label, duration)
+        if not capture.start():
+            capture = None
+    return capture
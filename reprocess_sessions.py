@@ -0,0 +1,101 @@
+import os
+import sys
+import time
+import argparse
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import cv2
+from booth_config import get_config, set_config
+from session_archive import SessionArchive, load_session
+from strip_layout import build_strip_panel
+
+# Compositing effects, created once per worker process
+_effects = None
+
+def _init_worker(background_path, config):
+    """Create compositing-only effects (no models) once per worker process."""
+    global _effects
+    import photo_effects
+
+    # Render with the parent's settings snapshot
+    set_config(config)
+
+    background_effect = photo_effects.BackgroundReplacementEffect(load_model=False)
+    if background_path:
+        background_image = cv2.imread(background_path)
+        if background_image is None:
+            raise FileNotFoundError(f"{background_path} not found")
+        background_effect.background_image = background_image
+        background_effect.scaled_backgrounds = {}
+
+    _effects = [
+        background_effect,
+        photo_effects.MustacheEffect(load_model=False),
+        photo_effects.BoloTieEffect(load_model=False),
+        photo_effects.CowboyHatEffect(load_model=False),
+    ]
+
+def render_session(archive_path, output_dir, copies):
+    """Re-render one archived session from its cached masks and poses. Returns the strip path."""
+    session = load_session(archive_path)
+    rendered = []
+    for frame, mask, poses in zip(session['frames'], session['masks'], session['poses']):
+        for effect in _effects:
+            if hasattr(effect, 'apply_with_mask'):
+                if mask is not None:
+                    frame = effect.apply_with_mask(frame, mask)
+            elif poses is not None:
+                frame = effect.apply_with_poses(frame, poses)
+        rendered.append(frame)
+
+    panel = build_strip_panel(rendered, copies=copies)
+    strip_path = os.path.join(output_dir, f"strip_{session['metadata']['session_id']}.jpg")
+    if not cv2.imwrite(strip_path, panel):
+        raise Exception(f"Could not write {strip_path}")
+    return strip_path
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Re-render archived booth sessions with new backgrounds, sprites or layout. "
+                    "Uses the masks and poses cached at capture time, so no models are run."
+    )
+    parser.add_argument('sessions', nargs='*', help="session .npz files (default: every session in --photos-dir)")
+    parser.add_argument('--photos-dir', default="photos", help="photos directory the sessions were archived in")
+    parser.add_argument('--output-dir', default=os.path.join("photos", "reprocessed"), help="where to write the new strips")
+    parser.add_argument('--background', help="replacement background image")
+    parser.add_argument('--copies', type=int, default=2, help="strips side by side on each panel")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="number of worker processes")
+    for name in ('background', 'mustache', 'bolo_tie', 'cowboy_hat'):
+        parser.add_argument(f"--no-{name.replace('_', '-')}", dest=name, action='store_false',
+                            help=f"disable the {name.replace('_', ' ')} effect")
+    args = parser.parse_args()
+
+    sessions = args.sessions or SessionArchive(args.photos_dir).list_sessions()
+    if not sessions:
+        print("No archived sessions found.")
+        return 1
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    config = get_config().with_changes(
+        'effects', **{name: getattr(args, name) for name in ('background', 'mustache', 'bolo_tie', 'cowboy_hat')})
+    start = time.perf_counter()
+    failures = 0
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        initializer=_init_worker,
+        initargs=(args.background, config)
+    ) as executor:
+        futures = {executor.submit(render_session, path, args.output_dir, args.copies): path for path in sessions}
+        for future in as_completed(futures):
+            try:
+                print(f"Rendered {futures[future]} -> {future.result()}")
+            except Exception as e:
+                failures += 1
+                print(f"Error rendering {futures[future]}: {str(e)}")
+                print(traceback.format_exc())
+
+    print(f"Re-rendered {len(sessions) - failures}/{len(sessions)} sessions in {time.perf_counter() - start:.2f}s")
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,116 @@
+import os
+import json
+import traceback
+import numpy as np
+import cv2
+
+# Sessions are archived under <photos_dir>/sessions/<timestamp>.npz
+SESSIONS_DIR_NAME = 'sessions'
+
+# Raw frames are stored as high quality JPEG to keep archives compact
+ARCHIVE_JPEG_QUALITY = 95
+
+# Values stored per landmark: x, y, z, visibility
+LANDMARK_FIELDS = 4
+
+def poses_to_array(poses):
+    """Pack per-person landmark lists into a float32 array of shape (people, landmarks, 4)."""
+    if not poses:
+        return np.zeros((0, 0, LANDMARK_FIELDS), dtype=np.float32)
+    return np.array(
+        [[(lm.x, lm.y, lm.z, lm.visibility) for lm in pose_landmarks] for pose_landmarks in poses],
+        dtype=np.float32
+    )
+
+def array_to_poses(array):
+    """Unpack a landmark array into lists of Landmark tuples usable by the body effects."""
+    from effects_engine import Landmark
+    return [[Landmark(*map(float, lm)) for lm in pose_landmarks] for pose_landmarks in array]
+
+class SessionArchive:
+    """
+    Archives the raw captured frames of each session together with the person masks and
+    poses that were detected, so sessions can be re-rendered without rerunning the models.
+    Each session is one compressed .npz file holding JPEG-encoded frames, confidence masks,
+    landmark arrays and a JSON metadata record.
+    """
+
+    def __init__(self, photos_dir):
+        self.sessions_dir = os.path.join(photos_dir, SESSIONS_DIR_NAME)
+
+    def session_path(self, session_id):
+        return os.path.join(self.sessions_dir, f"{session_id}.npz")
+
+    def list_sessions(self):
+        """Paths of every archived session, oldest first."""
+        if not os.path.exists(self.sessions_dir):
+            return []
+        return sorted(
+            os.path.join(self.sessions_dir, name)
+            for name in os.listdir(self.sessions_dir)
+            if name.endswith('.npz')
+        )
+
+    def save_session(self, session_id, frames, masks, poses, metadata=None):
+        """
+        Archive a session.
+        Args:
+            session_id (str): session timestamp, used as the file name
+            frames (list): raw BGR frames, before effects
+            masks (list): uint8 person confidence mask per frame, or None where segmentation didn't run
+            poses (list): per-frame list of per-person landmarks, or None where pose detection didn't run
+            metadata (dict): JSON-serializable extra information (strip path, effect settings...)
+        Returns the archive path, or None on failure.
+        """
+        try:
+            os.makedirs(self.sessions_dir, exist_ok=True)
+            arrays = {}
+            for i, frame in enumerate(frames):
+                ok, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, ARCHIVE_JPEG_QUALITY])
+                if not ok:
+                    raise Exception(f"Could not encode frame {i}")
+                arrays[f'frame_{i}'] = encoded
+                if masks[i] is not None:
+                    arrays[f'confidence_{i}'] = np.asarray(masks[i], dtype=np.uint8)
+                if poses[i] is not None:
+                    arrays[f'poses_{i}'] = poses_to_array(poses[i])
+
+            record = dict(metadata or {})
+            record['session_id'] = session_id
+            record['frame_count'] = len(frames)
+            arrays['metadata'] = np.array(json.dumps(record))
+
+            # Write to a temporary file first so a crash never leaves a half-written archive
+            path = self.session_path(session_id)
+            temp_path = path + '.tmp'
+            with open(temp_path, 'wb') as f:
+                np.savez_compressed(f, **arrays)
+            os.replace(temp_path, path)
+            print(f"Archived session to: {path}")
+            return path
+        except Exception as e:
+            print(f"Error archiving session {session_id}: {str(e)}")
+            print(traceback.format_exc())
+            return None
+
+def load_session(path):
+    """
+    Load an archived session.
+    Returns a dict with 'metadata', 'frames', 'masks' and 'poses' (None entries where not stored).
+    """
+    with np.load(path) as archive:
+        metadata = json.loads(str(archive['metadata']))
+        frames, masks, poses = [], [], []
+        for i in range(metadata['frame_count']):
+            frames.append(cv2.imdecode(archive[f'frame_{i}'], cv2.IMREAD_COLOR))
+            if f'confidence_{i}' in archive:
+                masks.append(archive[f'confidence_{i}'])
+            elif f'mask_{i}' in archive:
+                # Boolean masks, bit-packed, from archives written before confidence masks
+                shape = tuple(archive[f'mask_shape_{i}'])
+                bits = np.unpackbits(archive[f'mask_{i}'], count=int(np.prod(shape)))
+                masks.append(bits.reshape(shape).astype(bool))
+            else:
+                masks.append(None)
+            poses.append(array_to_poses(archive[f'poses_{i}']) if f'poses_{i}' in archive else None)
+    return {'metadata': metadata, 'frames': frames, 'masks': masks, 'poses': poses}
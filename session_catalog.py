@@ -0,0 +1,156 @@
+import os
+import re
+import sqlite3
+import datetime
+import threading
+import traceback
+import cv2
+
+# Catalog database and thumbnail cache live in the photos directory
+CATALOG_FILENAME = 'catalog.sqlite3'
+THUMBNAILS_DIR_NAME = 'thumbnails'
+
+# Height of cached strip thumbnails in pixels
+THUMBNAIL_HEIGHT = 320
+
+# Print status values
+PRINT_PENDING = 'pending'
+PRINT_PRINTED = 'printed'
+PRINT_FAILED = 'failed'
+# Strips indexed by backfill(), whose print outcome was never recorded
+PRINT_UNKNOWN = 'unknown'
+
+STRIP_FILENAME_PATTERN = re.compile(r'^strip_(\d{8}_\d{6})\.jpg$')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    booth_id TEXT,
+    created_at TEXT NOT NULL,
+    frame_count INTEGER NOT NULL DEFAULT 0,
+    strip_path TEXT,
+    archive_path TEXT,
+    thumbnail_path TEXT,
+    print_artifact_path TEXT,
+    print_status TEXT NOT NULL DEFAULT 'pending',
+    print_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_created_at ON sessions (created_at);
+CREATE INDEX IF NOT EXISTS sessions_print_status ON sessions (print_status);
+"""
+
+def _now():
+    return datetime.datetime.now().isoformat(timespec='seconds')
+
+def write_thumbnail(image, thumbnail_path, height=THUMBNAIL_HEIGHT):
+    """Scale a BGR image down to a small JPEG for browsing."""
+    h, w = image.shape[:2]
+    width = max(1, int(w * height / h))
+    thumbnail = cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+    os.makedirs(os.path.dirname(thumbnail_path), exist_ok=True)
+    return cv2.imwrite(thumbnail_path, thumbnail)
+
+class SessionCatalog:
+    """
+    SQLite index of every session in a photos directory: timestamp, frames, strip,
+    session archive, cached thumbnail, cached print-ready artifact and print status.
+    Safe to use from the GUI thread and background threads.
+    """
+
+    def __init__(self, photos_dir):
+        self.photos_dir = photos_dir
+        self.thumbnails_dir = os.path.join(photos_dir, THUMBNAILS_DIR_NAME)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(os.path.join(photos_dir, CATALOG_FILENAME), check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        with self.lock, self.connection:
+            self.connection.executescript(SCHEMA)
+
+    def thumbnail_path(self, session_id):
+        return os.path.join(self.thumbnails_dir, f"strip_{session_id}.jpg")
+
+    def _execute(self, sql, params=()):
+        with self.lock, self.connection:
+            return self.connection.execute(sql, params).fetchall()
+
+    def add_session(self, session_id, booth_id=None, frame_count=0, strip_path=None,
+                    archive_path=None, thumbnail_path=None):
+        """Insert a session, or fill in the given fields if it is already indexed."""
+        created_at = datetime.datetime.strptime(session_id, "%Y%m%d_%H%M%S").isoformat()
+        self._execute(
+            """
+            INSERT INTO sessions (session_id, booth_id, created_at, frame_count, strip_path,
+                                  archive_path, thumbnail_path, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (session_id) DO UPDATE SET
+                booth_id = COALESCE(excluded.booth_id, booth_id),
+                frame_count = MAX(excluded.frame_count, frame_count),
+                strip_path = COALESCE(excluded.strip_path, strip_path),
+                archive_path = COALESCE(excluded.archive_path, archive_path),
+                thumbnail_path = COALESCE(excluded.thumbnail_path, thumbnail_path),
+                updated_at = excluded.updated_at
+            """,
+            (session_id, booth_id, created_at, frame_count, strip_path, archive_path, thumbnail_path, _now())
+        )
+
+    def update_print_status(self, session_id, status, artifact_path=None):
+        """
+        Record the outcome of a print job, and the print-ready artifact it used.
+        A session that has printed stays printed: a failed reprint doesn't take back the
+        strips the guests already have.
+        """
+        self._execute(
+            """
+            UPDATE sessions SET
+                print_status = CASE WHEN print_count > 0 THEN ? ELSE ? END,
+                print_artifact_path = COALESCE(?, print_artifact_path),
+                print_count = print_count + ?,
+                updated_at = ?
+            WHERE session_id = ?
+            """,
+            (PRINT_PRINTED, status, artifact_path or None, 1 if status == PRINT_PRINTED else 0, _now(), session_id)
+        )
+
+    def get_session(self, session_id):
+        rows = self._execute("SELECT * FROM sessions WHERE session_id = ?", (session_id,))
+        return dict(rows[0]) if rows else None
+
+    def list_sessions(self, limit=100, offset=0, print_status=None):
+        """Sessions newest first, optionally only those with a given print status."""
+        if print_status is None:
+            rows = self._execute(
+                "SELECT * FROM sessions ORDER BY created_at DESC LIMIT ? OFFSET ?", (limit, offset))
+        else:
+            rows = self._execute(
+                "SELECT * FROM sessions WHERE print_status = ? ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                (print_status, limit, offset))
+        return [dict(row) for row in rows]
+
+    def backfill(self):
+        """Index strips saved before the catalog existed, generating their thumbnails once."""
+        if not os.path.exists(self.photos_dir):
+            return 0
+        known = {row['session_id'] for row in self._execute("SELECT session_id FROM sessions")}
+        added = 0
+        for name in sorted(os.listdir(self.photos_dir)):
+            match = STRIP_FILENAME_PATTERN.match(name)
+            if not match or match.group(1) in known:
+                continue
+            session_id = match.group(1)
+            strip_path = os.path.join(self.photos_dir, name)
+            try:
+                # Decoding at reduced size is enough for a thumbnail
+                image = cv2.imread(strip_path, cv2.IMREAD_REDUCED_COLOR_4)
+                thumbnail_path = self.thumbnail_path(session_id)
+                if image is None or not write_thumbnail(image, thumbnail_path):
+                    thumbnail_path = None
+                self.add_session(session_id, strip_path=strip_path, thumbnail_path=thumbnail_path)
+                self.update_print_status(session_id, PRINT_UNKNOWN)
+                added += 1
+            except Exception as e:
+                print(f"Error indexing {strip_path}: {str(e)}")
+                print(traceback.format_exc())
+        if added:
+            print(f"Indexed {added} existing sessions in {self.photos_dir}")
+        return added
@@ -0,0 +1,125 @@
+import threading
+import numpy as np
+import cv2
+from strip_layout import STRIP_LENGTH
+
+# Idle panels kept around for reuse by later sessions
+ARENA_POOL_SIZE = 2
+
+class SessionPanel:
+    """
+    One session's panel, on loan from a SessionFrameStore. Everything that keeps using
+    the panel (or a photo in it) after the session moves on takes a hold with retain()
+    and calls the returned release function when done; once the last hold is released
+    the panel goes back to the store's pool.
+    """
+
+    def __init__(self, store, array):
+        self.store = store
+        self.array = array
+        # The store's own hold, released when it starts the next session
+        self.holders = 1
+
+    def retain(self):
+        """Take a hold on the panel. Returns the function to call (once or more) when done with it."""
+        with self.store.lock:
+            if self.holders <= 0:
+                raise RuntimeError("Panel already returned to the pool")
+            self.holders += 1
+        released = threading.Event()
+
+        def release():
+            if not released.is_set():
+                released.set()
+                self._release()
+        return release
+
+    def _release(self):
+        with self.store.lock:
+            self.holders -= 1
+            if self.holders == 0:
+                self.store._recycle(self.array)
+
+class SessionFrameStore:
+    """
+    Holds a session's photos directly in the panel they will be printed on, so a session
+    costs one panel of memory instead of its photos plus a panel built from them.
+    Photo i is a view into row i of the first strip; finish() copies that strip into the
+    others in place and returns the panel.
+    Panels are only reused once every hold on them (see SessionPanel.retain) has been
+    released, so a session's photos are never overwritten while the encoder, spooler,
+    share server or journal still reads them.
+    """
+
+    def __init__(self, length=STRIP_LENGTH, copies=2, pool_size=ARENA_POOL_SIZE):
+        self.length = length
+        self.copies = copies
+        self.pool_size = pool_size
+        self.lock = threading.Lock()
+        self.idle = []
+        self.session_panel = None
+        self.frames = []
+
+    @property
+    def count(self):
+        return len(self.frames)
+
+    def begin(self):
+        """Start a new session, releasing the store's hold on the previous session's panel."""
+        if self.session_panel is not None:
+            self.session_panel._release()
+        self.session_panel = None
+        self.frames = []
+
+    def retain(self):
+        """Take a hold on the current session's panel (see SessionPanel.retain)."""
+        return self.session_panel.retain()
+
+    def _recycle(self, array):
+        # Called with the lock held
+        if len(self.idle) < self.pool_size:
+            self.idle.append(array)
+
+    def _acquire(self, frame_shape):
+        h, w = frame_shape[:2]
+        shape = (h * self.length, w * self.copies, 3)
+        with self.lock:
+            for i, array in enumerate(self.idle):
+                if array.shape == shape:
+                    return SessionPanel(self, self.idle.pop(i))
+        return SessionPanel(self, np.empty(shape, dtype=np.uint8))
+
+    def next_slot(self, frame_shape):
+        """The view the next photo is composited into."""
+        if self.count >= self.length:
+            raise ValueError(f"Session already has {self.length} photos")
+        if self.session_panel is None:
+            self.session_panel = self._acquire(frame_shape)
+        panel = self.session_panel.array
+        h = panel.shape[0] // self.length
+        w = panel.shape[1] // self.copies
+        return panel[h * self.count:h * (self.count + 1), :w]
+
+    def add(self, frame):
+        """
+        Store a photo and return its view in the panel. Pass the slot from next_slot
+        to store a photo composited there in place; anything else is copied in (and
+        scaled to the session's photo size if it differs).
+        """
+        slot = self.next_slot(frame.shape)
+        if frame is not slot:
+            if frame.shape != slot.shape:
+                frame = cv2.resize(frame, (slot.shape[1], slot.shape[0]), interpolation=cv2.INTER_AREA)
+            np.copyto(slot, frame)
+        self.frames.append(slot)
+        return slot
+
+    def finish(self):
+        """Fill in the repeated strips and return the panel (see build_strip_panel)."""
+        if self.count < self.length:
+            raise ValueError(f"Session has {self.count} of {self.length} photos")
+        panel = self.session_panel.array
+        w = panel.shape[1] // self.copies
+        for copy in range(1, self.copies):
+            panel[:, w * copy:w * (copy + 1)] = panel[:, :w]
+        return panel
@@ -0,0 +1,84 @@
+from PyQt6.QtWidgets import QDialog, QListWidget, QListWidgetItem, QPushButton, QVBoxLayout, QHBoxLayout, QLabel
+from PyQt6.QtCore import Qt, QSize
+from PyQt6.QtGui import QPixmap, QIcon
+from session_catalog import THUMBNAIL_HEIGHT
+
+# Sessions loaded per page
+GALLERY_PAGE_SIZE = 60
+
+class SessionGallery(QDialog):
+    """
+    Dev mode gallery of catalogued sessions. Shows only the cached thumbnails,
+    never the full-size strips, and reprints the selected session.
+    """
+
+    def __init__(self, catalog, reprint_callback, parent=None):
+        """
+        Args:
+            catalog (SessionCatalog): sessions to browse
+            reprint_callback: called with a session_id when Reprint is pressed
+        """
+        super().__init__(parent)
+        self.setWindowTitle("Sessions")
+        self.catalog = catalog
+        self.reprint_callback = reprint_callback
+        self.offset = 0
+
+        layout = QVBoxLayout(self)
+
+        self.session_list = QListWidget(self)
+        self.session_list.setViewMode(QListWidget.ViewMode.IconMode)
+        self.session_list.setIconSize(QSize(THUMBNAIL_HEIGHT // 2, THUMBNAIL_HEIGHT))
+        self.session_list.setResizeMode(QListWidget.ResizeMode.Adjust)
+        self.session_list.currentItemChanged.connect(self.update_details)
+        layout.addWidget(self.session_list)
+
+        self.details_label = QLabel("", self)
+        layout.addWidget(self.details_label)
+
+        button_layout = QHBoxLayout()
+        self.more_button = QPushButton("Load More", self)
+        self.more_button.clicked.connect(self.load_page)
+        button_layout.addWidget(self.more_button)
+
+        self.reprint_button = QPushButton("Reprint", self)
+        self.reprint_button.clicked.connect(self.reprint_selected)
+        self.reprint_button.setEnabled(False)
+        button_layout.addWidget(self.reprint_button)
+
+        close_button = QPushButton("Close", self)
+        close_button.clicked.connect(self.close)
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+
+        self.resize(1200, 800)
+        self.load_page()
+
+    def load_page(self):
+        """Append the next page of sessions, newest first."""
+        sessions = self.catalog.list_sessions(limit=GALLERY_PAGE_SIZE, offset=self.offset)
+        self.offset += len(sessions)
+        self.more_button.setEnabled(len(sessions) == GALLERY_PAGE_SIZE)
+        for session in sessions:
+            item = QListWidgetItem(session['session_id'])
+            if session['thumbnail_path']:
+                item.setIcon(QIcon(QPixmap(session['thumbnail_path'])))
+            item.setData(Qt.ItemDataRole.UserRole, session['session_id'])
+            self.session_list.addItem(item)
+
+    def update_details(self, current, previous=None):
+        if current is None:
+            self.details_label.setText("")
+            self.reprint_button.setEnabled(False)
+            return
+        session = self.catalog.get_session(current.data(Qt.ItemDataRole.UserRole))
+        self.details_label.setText(
+            f"{session['session_id']}  |  {session['frame_count']} frames  |  "
+            f"print: {session['print_status']} ({session['print_count']} printed)  |  {session['strip_path']}"
+        )
+        self.reprint_button.setEnabled(bool(session['strip_path'] or session['print_artifact_path']))
+
+    def reprint_selected(self):
+        item = self.session_list.currentItem()
+        if item is not None:
+            self.reprint_callback(item.data(Qt.ItemDataRole.UserRole))
@@ -0,0 +1,218 @@
+import os
+import json
+import queue
+import shutil
+import datetime
+import threading
+import traceback
+import cv2
+from encoder_pool import write_file_atomic
+from strip_layout import STRIP_LENGTH
+
+# The journal lives under <photos_dir>/journal: an append-only log plus the frames of open sessions
+JOURNAL_DIR_NAME = 'journal'
+JOURNAL_LOG_NAME = 'journal.log'
+
+JOURNAL_JPEG_QUALITY = 95
+
+# Journal events, in the order a session goes through them
+SESSION_STARTED = 'session_started'
+FRAME_CAPTURED = 'frame_captured'
+STRIP_COMPLETED = 'strip_completed'
+PRINT_QUEUED = 'print_queued'
+PRINT_FINISHED = 'print_finished'
+# Written by recovery for sessions that ended too early to make a strip
+SESSION_ABANDONED = 'session_abandoned'
+
+class JournalSession:
+    """What the journal says about one session, as replayed by read_journal."""
+
+    def __init__(self, session_id, booth_id=None):
+        self.session_id = session_id
+        self.booth_id = booth_id
+        self.frame_paths = {}
+        self.strip_path = None
+        self.print_queued = False
+        self.finished = False
+
+    @property
+    def frames_complete(self):
+        return len(self.frame_paths) >= STRIP_LENGTH
+
+def read_journal(paths):
+    """
+    Replay journal logs, oldest first, into JournalSessions in the order the sessions
+    started. A torn final line from a crash mid-append is ignored.
+    """
+    sessions = {}
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                session_id = record.get('session_id')
+                event = record.get('event')
+                session = sessions.get(session_id)
+                if event == SESSION_STARTED and session is None:
+                    session = sessions[session_id] = JournalSession(session_id, record.get('booth_id'))
+                if session is None:
+                    continue
+                if event == FRAME_CAPTURED:
+                    session.frame_paths[record['index']] = record['path']
+                elif event == STRIP_COMPLETED:
+                    session.strip_path = record['strip_path']
+                elif event == PRINT_QUEUED:
+                    session.print_queued = True
+                elif event in (PRINT_FINISHED, SESSION_ABANDONED):
+                    session.finished = True
+    return list(sessions.values())
+
+class SessionJournal:
+    """
+    Append-only, crash-safe record of each session: captured frames, strip completion
+    and print job state. Every record is fsynced before the next, and captured frames
+    are written (and fsynced) before the record that points to them, all on a
+    background thread so capturing never waits for the disk.
+    After a crash, recover() finds the sessions that never finished printing and
+    rebuilds or reprints them.
+    """
+
+    def __init__(self, photos_dir):
+        self.journal_dir = os.path.join(photos_dir, JOURNAL_DIR_NAME)
+        os.makedirs(self.journal_dir, exist_ok=True)
+        self.log_path = os.path.join(self.journal_dir, JOURNAL_LOG_NAME)
+
+        # Set aside the previous run's log for recovery; this run appends to a fresh one.
+        # Logs from a run that crashed during its own recovery are still waiting too.
+        if os.path.exists(self.log_path) and os.path.getsize(self.log_path) > 0:
+            stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            os.replace(self.log_path, os.path.join(self.journal_dir, f"journal_{stamp}.recovering"))
+        self.recovery_paths = sorted(
+            os.path.join(self.journal_dir, name)
+            for name in os.listdir(self.journal_dir)
+            if name.endswith('.recovering')
+        )
+        self.log = open(self.log_path, 'a', encoding='utf-8')
+
+        self.jobs = queue.Queue()
+        self.thread = threading.Thread(target=self._write_loop, name='session-journal', daemon=True)
+        self.thread.start()
+
+    def session_dir(self, session_id):
+        return os.path.join(self.journal_dir, session_id)
+
+    def _write_loop(self):
+        while True:
+            job = self.jobs.get()
+            try:
+                job()
+            except Exception as e:
+                print(f"Error writing session journal: {str(e)}")
+                print(traceback.format_exc())
+            finally:
+                self.jobs.task_done()
+
+    def _append(self, event, session_id, **fields):
+        # Writer thread only
+        record = {'event': event, 'session_id': session_id, 'time': datetime.datetime.now().isoformat()}
+        record.update(fields)
+        self.log.write(json.dumps(record) + '\n')
+        self.log.flush()
+        os.fsync(self.log.fileno())
+
+    def _write_frame(self, session_id, index, frame):
+        ok, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, JOURNAL_JPEG_QUALITY])
+        if not ok:
+            raise Exception(f"Could not encode frame {index} of session {session_id}")
+        os.makedirs(self.session_dir(session_id), exist_ok=True)
+        path = os.path.join(self.session_dir(session_id), f"frame_{index}.jpg")
+        write_file_atomic(path, encoded.tobytes())
+        self._append(FRAME_CAPTURED, session_id, index=index, path=path)
+
+    def _finish(self, event, session_id, **fields):
+        self._append(event, session_id, **fields)
+        # The strip (or nothing) is all that is left to keep
+        shutil.rmtree(self.session_dir(session_id), ignore_errors=True)
+
+    def session_started(self, session_id, booth_id):
+        self.jobs.put(lambda: self._append(SESSION_STARTED, session_id, booth_id=booth_id))
+
+    def frame_captured(self, session_id, index, frame, on_written=None):
+        """
+        Journal a captured frame. The frame must not be modified until it is written;
+        on_written, if given, is called once the journal is done with it.
+        """
+        def write():
+            try:
+                self._write_frame(session_id, index, frame)
+            finally:
+                if on_written is not None:
+                    on_written()
+        self.jobs.put(write)
+
+    def strip_completed(self, session_id, strip_path):
+        """Record that the session's strip is safely on disk."""
+        self.jobs.put(lambda: self._append(STRIP_COMPLETED, session_id, strip_path=strip_path))
+
+    def print_queued(self, session_id):
+        self.jobs.put(lambda: self._append(PRINT_QUEUED, session_id))
+
+    def print_finished(self, session_id, success):
+        self.jobs.put(lambda: self._finish(PRINT_FINISHED, session_id, success=success))
+
+    def recover(self, rebuild_strip, requeue_print):
+        """
+        Finish what the previous run left undone. Run in a background thread.
+        Args:
+            rebuild_strip: function(session_id, frames) -> strip path or None, for sessions
+                that captured every frame but crashed before the strip was saved
+            requeue_print: function(session_id, strip_path), for strips that never printed
+        Returns the number of sessions recovered.
+        """
+        if not self.recovery_paths:
+            return 0
+        recovered = 0
+        for session in read_journal(self.recovery_paths):
+            if session.finished:
+                continue
+            try:
+                strip_path = session.strip_path
+                if strip_path is None or not os.path.exists(strip_path):
+                    if not session.frames_complete:
+                        # Too few photos for a strip; the frames stay in the journal for staff
+                        print(f"Recovery: session {session.session_id} ended after {len(session.frame_paths)} photos")
+                        self.session_started(session.session_id, session.booth_id)
+                        self.jobs.put(lambda session_id=session.session_id: self._append(SESSION_ABANDONED, session_id))
+                        continue
+                    frames = [cv2.imread(session.frame_paths[i]) for i in sorted(session.frame_paths)[:STRIP_LENGTH]]
+                    if any(frame is None for frame in frames):
+                        raise Exception("missing journal frames")
+                    strip_path = rebuild_strip(session.session_id, frames)
+                    if strip_path is None:
+                        raise Exception("could not rebuild strip")
+
+                # Carry the session into this run's journal before reprinting it
+                print(f"Recovery: reprinting session {session.session_id}")
+                self.session_started(session.session_id, session.booth_id)
+                self.strip_completed(session.session_id, strip_path)
+                self.print_queued(session.session_id)
+                requeue_print(session.session_id, strip_path)
+                recovered += 1
+            except Exception as e:
+                print(f"Recovery of session {session.session_id} failed: {str(e)}")
+                print(traceback.format_exc())
+
+        # Everything unfinished is now in this run's journal
+        for path in self.recovery_paths:
+            self.jobs.put(lambda path=path: os.remove(path))
+        self.recovery_paths = []
+        return recovered
+
+    def flush(self):
+        """
+        Wait until everything journaled so far is on disk. The journal keeps accepting
+        records afterwards, so print jobs finishing during shutdown are still recorded.
+        """
+        self.jobs.join()
@@ -0,0 +1,298 @@
+import os
+import re
+import html
+import socket
+import io
+import secrets
+import threading
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import cv2
+from encoder_pool import write_file_atomic
+
+try:
+    import qrcode
+except ImportError:
+    # Optional: without it sessions are shared without a QR code
+    qrcode = None
+
+# Renditions are stored under <photos_dir>/share/<token>/
+SHARE_DIR_NAME = 'share'
+
+# Rendition name -> (max height in pixels or None for full size, JPEG quality)
+RENDITIONS = {
+    'thumb.jpg': (320, 80),
+    'web.jpg': (1600, 85),
+    'full.jpg': (None, 92),
+}
+QR_FILENAME = 'qr.png'
+SESSION_FILENAME = 'session.txt'
+
+CONTENT_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.png': 'image/png',
+}
+
+# Renditions never change once written, so phones can cache them indefinitely
+CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Memory used to keep recently requested renditions
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Worker threads encoding renditions
+RENDITION_WORKERS = 2
+
+TOKEN_PATTERN = re.compile(r'^[A-Za-z0-9_-]+$')
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+SESSION_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>Yeehaw Booth</title>
+<style>body {{ margin: 0; background: #222; color: white; font-family: sans-serif; text-align: center; }}
+img {{ max-width: 100%; max-height: 80vh; margin-top: 16px; }} a {{ color: #4CAF50; font-size: 1.4em; }}</style>
+</head>
+<body>
+<img src="web.jpg" alt="Photo strip {session_id}">
+<p><a href="full.jpg" download="strip_{session_id}.jpg">Download full size</a></p>
+</body>
+</html>
+"""
+
+def get_lan_address():
+    """Best guess at this machine's address on the booth LAN/hotspot."""
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            # No packets are sent; this just picks the interface with a route
+            s.connect(('10.255.255.255', 1))
+            return s.getsockname()[0]
+    except Exception:
+        return '127.0.0.1'
+
+def etag_matches(if_none_match, etag):
+    """Whether an If-None-Match header lists etag, comparing weakly as RFC 9110 asks."""
+    if if_none_match is None:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in tags or etag in (tag[2:] if tag.startswith('W/') else tag for tag in tags)
+
+class RenditionCache:
+    """Keeps recently served files in memory, bounded by total size."""
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def get(self, path):
+        """Return (data, etag) for a file, reading it from disk only if it isn't cached."""
+        stat = os.stat(path)
+        etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is not None and entry[1] == etag:
+                self.entries.move_to_end(path)
+                return entry
+        with open(path, 'rb') as f:
+            data = f.read()
+        with self.lock:
+            if path in self.entries:
+                self.size -= len(self.entries.pop(path)[0])
+            self.entries[path] = (data, etag)
+            self.size += len(data)
+            while self.size > self.max_bytes and len(self.entries) > 1:
+                _, (old_data, _) = self.entries.popitem(last=False)
+                self.size -= len(old_data)
+        return data, etag
+
+class ShareRequestHandler(BaseHTTPRequestHandler):
+    server_version = 'YeehawBooth'
+
+    def log_message(self, format, *args):
+        # Keep the booth console quiet; errors are still printed by the server
+        pass
+
+    def do_HEAD(self):
+        self.handle_request(send_body=False)
+
+    def do_GET(self):
+        self.handle_request(send_body=True)
+
+    def handle_request(self, send_body):
+        parts = [part for part in self.path.split('?')[0].split('/') if part]
+        if len(parts) < 2 or parts[0] != 's' or not TOKEN_PATTERN.match(parts[1]):
+            self.send_error(404)
+            return
+        share = self.server.share
+        session_dir = os.path.join(share.share_dir, parts[1])
+        if not os.path.isdir(session_dir):
+            self.send_error(404)
+            return
+
+        if len(parts) == 2:
+            self.send_session_page(session_dir, send_body)
+            return
+        filename = parts[2]
+        if len(parts) != 3 or filename not in share.served_files:
+            self.send_error(404)
+            return
+        path = os.path.join(session_dir, filename)
+        if not os.path.exists(path):
+            # Renditions are still being encoded
+            self.send_response(503)
+            self.send_header('Retry-After', '2')
+            self.end_headers()
+            return
+        self.send_file(path, send_body)
+
+    def send_session_page(self, session_dir, send_body):
+        session_path = os.path.join(session_dir, SESSION_FILENAME)
+        if not os.path.exists(session_path):
+            self.send_response(503)
+            self.send_header('Retry-After', '2')
+            self.end_headers()
+            return
+        with open(session_path, 'r') as f:
+            session_id = f.read().strip()
+        body = SESSION_PAGE.format(session_id=html.escape(session_id)).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def send_file(self, path, send_body):
+        data, etag = self.server.share.cache.get(path)
+        if etag_matches(self.headers.get('If-None-Match'), etag):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', CACHE_CONTROL)
+            self.end_headers()
+            return
+
+        start, end = 0, len(data) - 1
+        status = 200
+        range_header = self.headers.get('Range')
+        # Only honour the range if it is for this version of the file
+        if range_header and self.headers.get('If-Range', etag) == etag:
+            match = RANGE_PATTERN.match(range_header.strip())
+            if match is None or match.group(1) == match.group(2) == '':
+                self.send_error(416)
+                return
+            if match.group(1) == '':
+                # Suffix range: the last N bytes
+                start = max(0, len(data) - int(match.group(2)))
+            else:
+                start = int(match.group(1))
+                if match.group(2) != '':
+                    end = min(end, int(match.group(2)))
+            if start > end:
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{len(data)}')
+                self.end_headers()
+                return
+            status = 206
+
+        self.send_response(status)
+        self.send_header('Content-Type', CONTENT_TYPES[os.path.splitext(path)[1]])
+        self.send_header('Content-Length', str(end - start + 1))
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', CACHE_CONTROL)
+        if status == 206:
+            self.send_header('Content-Range', f'bytes {start}-{end}/{len(data)}')
+        self.end_headers()
+        if send_body:
+            self.wfile.write(data[start:end + 1])
+
+def make_qr_png(url):
+    """A QR code for url as PNG bytes, or None without the qrcode package."""
+    if qrcode is None:
+        return None
+    buffer = io.BytesIO()
+    qrcode.make(url).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+class ShareServer:
+    """
+    Optional HTTP server on the booth's LAN/hotspot that lets guests download their strip.
+    When a session is published its renditions (thumbnail, web size, full size and a QR
+    code pointing at the session page) are encoded once in a background thread pool;
+    requests are then served from those files with cache headers, ETags and range support.
+    """
+
+    def __init__(self, photos_dir, port=8080, host='0.0.0.0'):
+        self.share_dir = os.path.join(photos_dir, SHARE_DIR_NAME)
+        os.makedirs(self.share_dir, exist_ok=True)
+        self.port = port
+        self.base_url = f"http://{get_lan_address()}:{port}"
+        self.served_files = set(RENDITIONS)
+        if qrcode is not None:
+            self.served_files.add(QR_FILENAME)
+        else:
+            print("qrcode is not installed, sessions will be shared without QR codes")
+        self.cache = RenditionCache()
+        self.executor = ThreadPoolExecutor(max_workers=RENDITION_WORKERS, thread_name_prefix='share-rendition')
+        self.httpd = ThreadingHTTPServer((host, port), ShareRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.share = self
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='share-server', daemon=True)
+        self.thread.start()
+        print(f"Share server listening on {self.base_url}")
+        return self
+
+    def session_url(self, token):
+        return f"{self.base_url}/s/{token}"
+
+    def publish(self, session_id, panel, on_done=None):
+        """
+        Make a session downloadable. Renditions are encoded in the background.
+        The panel must not be modified until on_done, if given, is called.
+        Returns the session's URL.
+        """
+        token = secrets.token_urlsafe(6)
+        self.executor.submit(self._write_renditions, token, session_id, panel, on_done)
+        return self.session_url(token)
+
+    def _write_renditions(self, token, session_id, panel, on_done=None):
+        try:
+            session_dir = os.path.join(self.share_dir, token)
+            os.makedirs(session_dir, exist_ok=True)
+            write_file_atomic(os.path.join(session_dir, SESSION_FILENAME), session_id.encode())
+
+            # Guests get a single strip, not the two identical strips of the print panel
+            strip = panel[:, :panel.shape[1] // 2]
+            for filename, (max_height, quality) in RENDITIONS.items():
+                image = strip
+                if max_height is not None and strip.shape[0] > max_height:
+                    width = max(1, int(strip.shape[1] * max_height / strip.shape[0]))
+                    image = cv2.resize(strip, (width, max_height), interpolation=cv2.INTER_AREA)
+                ok, encoded = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+                if not ok:
+                    raise Exception(f"Could not encode {filename}")
+                write_file_atomic(os.path.join(session_dir, filename), encoded.tobytes())
+
+            qr_png = make_qr_png(self.session_url(token))
+            if qr_png is not None:
+                write_file_atomic(os.path.join(session_dir, QR_FILENAME), qr_png)
+            print(f"Shared session {session_id} at {self.session_url(token)}")
+        except Exception as e:
+            print(f"Error sharing session {session_id}: {str(e)}")
+            print(traceback.format_exc())
+        finally:
+            if on_done is not None:
+                on_done()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.executor.shutdown(wait=False)
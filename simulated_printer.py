@@ -0,0 +1,73 @@
+import os
+import time
+import threading
+import cv2
+from printer_monitor import PrinterStatus, PRINTER_READY, PRINTER_PRINTING, PRINTER_ERROR
+
+# Time the simulated printer takes per sheet (seconds), about a DNP DS-RX1 4x6
+SIMULATED_SHEET_SECONDS = 13.0
+
+# Sheets in a fresh simulated media roll
+SIMULATED_MEDIA_SHEETS = 700
+
+class SimulatedPrinter:
+    """
+    Stand-in for DNPPrinter with the same interface, for running the booth without a
+    Windows printer. Jobs sit in a queue and take sheet_seconds each to "print", the
+    media runs out, and query_status reports it all like the real printer would.
+    """
+
+    def __init__(self, sheet_seconds=SIMULATED_SHEET_SECONDS, media_sheets=SIMULATED_MEDIA_SHEETS):
+        self.printer_name = 'Simulated printer'
+        self.sheet_seconds = sheet_seconds
+        self.media_remaining = media_sheets
+        self.lock = threading.Lock()
+        # Print-ready paths waiting in the printer's queue, the first one printing
+        self.jobs = []
+        self.sheet_started = None
+        print(f"Using {self.printer_name} ({sheet_seconds:.0f}s per sheet)")
+
+    def _advance(self):
+        # Called with the lock held: finish every sheet whose print time has passed
+        now = time.monotonic()
+        while self.jobs and self.media_remaining > 0:
+            if self.sheet_started is None:
+                self.sheet_started = now
+            if now - self.sheet_started < self.sheet_seconds:
+                return
+            print(f"Simulated printer finished {self.jobs.pop(0)}")
+            self.media_remaining -= 1
+            self.sheet_started += self.sheet_seconds
+        if not self.jobs:
+            self.sheet_started = None
+
+    def prepare_strip(self, image_path, image=None):
+        """Write the strip as the simulated print artifact. Returns its path, or None on failure."""
+        artifact_path = os.path.splitext(image_path)[0] + '_simulated.jpg'
+        if image is None:
+            image = cv2.imread(image_path)
+        if image is None or not cv2.imwrite(artifact_path, image):
+            print(f"Simulated printer could not prepare {image_path}")
+            return None
+        return artifact_path
+
+    def print_prepared(self, artifact_path):
+        with self.lock:
+            self._advance()
+            self.jobs.append(artifact_path)
+        return True
+
+    def print_strip(self, image_path):
+        artifact_path = self.prepare_strip(image_path)
+        return artifact_path is not None and self.print_prepared(artifact_path)
+
+    def load_media(self, sheets=SIMULATED_MEDIA_SHEETS):
+        with self.lock:
+            self.media_remaining = sheets
+
+    def query_status(self):
+        with self.lock:
+            self._advance()
+            if self.media_remaining <= 0:
+                return PrinterStatus(PRINTER_ERROR, len(self.jobs), "Out of media")
+            return PrinterStatus(PRINTER_PRINTING if self.jobs else PRINTER_READY, len(self.jobs))
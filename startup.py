@@ -0,0 +1,135 @@
+import threading
+import time
+import traceback
+
+# Readiness states for startup components
+PENDING = 'pending'
+LOADING = 'loading'
+WARMING_UP = 'warming_up'
+READY = 'ready'
+FAILED = 'failed'
+
+
+class StartupComponent:
+    def __init__(self, name, loader, warm_up=None):
+        self.name = name
+        self.loader = loader
+        self.warm_up = warm_up
+        self.state = PENDING
+        self.value = None
+        self.error = None
+        self.load_time = None
+        self.warm_up_time = None
+        self.done_event = threading.Event()
+
+
+class StartupOrchestrator:
+    """
+    Loads slow booth components (models, printer backend) in parallel background
+    threads so the camera feed can be shown immediately.
+    Each component has a loader and an optional warm-up step, and moves through
+    PENDING -> LOADING -> WARMING_UP -> READY (or FAILED).
+    """
+
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.components = {}
+        self.first_frame_time = None
+        self.ready_time = None
+        self._lock = threading.Lock()
+
+    def add_component(self, name, loader, warm_up=None):
+        """Register a component. loader() returns the component, warm_up(component) primes it."""
+        self.components[name] = StartupComponent(name, loader, warm_up)
+
+    def start(self):
+        """Start loading every registered component in its own thread."""
+        for component in self.components.values():
+            thread = threading.Thread(
+                target=self._load_component,
+                args=(component,),
+                name=f"startup-{component.name}",
+                daemon=True
+            )
+            thread.start()
+
+    def _load_component(self, component):
+        try:
+            component.state = LOADING
+            load_start = time.perf_counter()
+            component.value = component.loader()
+            component.load_time = time.perf_counter() - load_start
+
+            if component.warm_up is not None:
+                component.state = WARMING_UP
+                warm_up_start = time.perf_counter()
+                component.warm_up(component.value)
+                component.warm_up_time = time.perf_counter() - warm_up_start
+
+            component.state = READY
+            warm_up_text = f", warm-up {component.warm_up_time:.2f}s" if component.warm_up_time is not None else ""
+            print(f"Startup: {component.name} ready (load {component.load_time:.2f}s{warm_up_text})")
+        except Exception as e:
+            component.state = FAILED
+            component.error = e
+            print(f"Startup: failed to load {component.name}: {str(e)}")
+            print(traceback.format_exc())
+        finally:
+            component.done_event.set()
+            self._check_finished()
+
+    def _check_finished(self):
+        with self._lock:
+            if self.ready_time is not None or not self.is_finished():
+                return
+            self.ready_time = time.perf_counter() - self.start_time
+        print(f"Startup: time-to-ready {self.ready_time:.2f}s")
+
+    def state(self, name):
+        return self.components[name].state
+
+    def is_ready(self, name):
+        return self.components[name].state == READY
+
+    def all_ready(self):
+        return all(component.state == READY for component in self.components.values())
+
+    def is_finished(self):
+        """True once every component is either ready or has failed."""
+        return all(component.done_event.is_set() for component in self.components.values())
+
+    def get(self, name):
+        """Return the loaded component, or None if it is not ready yet."""
+        component = self.components[name]
+        return component.value if component.state == READY else None
+
+    def wait(self, name, timeout=None):
+        """Block until a component has finished loading and return it (None on failure or timeout)."""
+        component = self.components[name]
+        component.done_event.wait(timeout)
+        return self.get(name)
+
+    def pending_names(self):
+        return [name for name, component in self.components.items() if not component.done_event.is_set()]
+
+    def mark_first_frame(self):
+        """Record time-to-first-frame the first time the camera feed is displayed."""
+        if self.first_frame_time is not None:
+            return
+        self.first_frame_time = time.perf_counter() - self.start_time
+        print(f"Startup: time-to-first-frame {self.first_frame_time:.2f}s")
+
+    def report(self):
+        """Return startup timings as a dict."""
+        return {
+            'time_to_first_frame': self.first_frame_time,
+            'time_to_ready': self.ready_time,
+            'components': {
+                name: {
+                    'state': component.state,
+                    'load_time': component.load_time,
+                    'warm_up_time': component.warm_up_time,
+                }
+                for name, component in self.components.items()
+            }
+        }
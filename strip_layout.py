@@ -0,0 +1,37 @@
+import numpy as np
+import cv2
+
+# Photos per strip
+STRIP_LENGTH = 4
+
+def build_strip_panel(frames, copies=2):
+    """
+    Stack the photos into a vertical strip and repeat it side by side.
+    The default is the 4x6 panel of two identical 2x6 strips that the DNP cuts in half.
+    Assumes all frames are the same size.
+    """
+    h, w = frames[0].shape[:2]
+
+    # Create a panel that's 4 photos tall and `copies` photos wide
+    panel = np.zeros((h * len(frames), w * copies, 3), dtype=np.uint8)
+    for copy in range(copies):
+        for i, frame in enumerate(frames):
+            panel[h * i:h * (i + 1), w * copy:w * (copy + 1)] = frame
+    return panel
+
+def build_shared_sheet(panel_a, panel_b):
+    """
+    Put the first strip of two sessions' panels side by side on one sheet, so each
+    session gets one of the two strips the DNP cuts the 4x6 into.
+    The second strip is scaled to the first if the sessions were shot at different sizes.
+    """
+    h, w = panel_a.shape[:2]
+    strip_width = w // 2
+    strip_b = panel_b[:, :panel_b.shape[1] // 2]
+    if strip_b.shape[:2] != (h, strip_width):
+        strip_b = cv2.resize(strip_b, (strip_width, h), interpolation=cv2.INTER_AREA)
+    sheet = np.zeros((h, strip_width * 2, 3), dtype=np.uint8)
+    # Each strip fills exactly one side of the cut line down the middle
+    sheet[:, :strip_width] = panel_a[:, :strip_width]
+    sheet[:, strip_width:] = strip_b
+    return sheet